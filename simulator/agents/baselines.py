@@ -5,14 +5,154 @@ Heuristic dispatch policies for MCI response to serve as baselines for RL agent.
 """
 
 import random
-from typing import Dict, List
+import numpy as np
+from typing import Dict, List, NamedTuple, Tuple
 import sys
 import os
 
 # Add project root to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-from simulator.environment.routing import euclidean_distance
+from simulator.environment.routing import distance_matrix
+
+
+# Triage priority (lower = more urgent)
+TRIAGE_PRIORITY = {'RED': 0, 'YELLOW': 1, 'GREEN': 2, 'BLACK': 3}
+
+
+class DispatchArrays(NamedTuple):
+    """
+    Struct-of-arrays view of the state a dispatch decision needs.
+
+    Only idle ambulances and waiting, alive casualties are included, in
+    state order. Built once per policy call by dispatch_arrays().
+    """
+    ambulance_ids: List[int]
+    ambulance_lats: np.ndarray
+    ambulance_lons: np.ndarray
+    casualty_ids: List[int]
+    casualty_triage: List[str]
+    casualty_priorities: np.ndarray
+    casualty_lats: np.ndarray
+    casualty_lons: np.ndarray
+    hospital_ids: List[str]
+    hospital_lats: np.ndarray
+    hospital_lons: np.ndarray
+    matching_masks: Dict[str, np.ndarray]
+
+
+# (hospital list, arrays) for the last hospital list seen; the simulation engine
+# passes the same list on every tick, so these are built once per episode. The
+# pair is replaced in one assignment so concurrent simulations (backend threads)
+# never see one list's arrays paired with another list
+_hospital_arrays_cache = (None, None)
+
+
+def _trauma_matching_masks(trauma_levels: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Build per-triage masks of appropriate hospitals.
+
+    - RED → Level I/II hospitals (trauma_level 1 or 2)
+    - YELLOW → Level II/III hospitals (trauma_level 2 or 3)
+    - GREEN/BLACK → Any hospital
+    Falls back to all hospitals when no hospital matches.
+    """
+    any_hospital = np.ones(len(trauma_levels), dtype=bool)
+
+    masks = {}
+    for triage, levels in (('RED', [1, 2]), ('YELLOW', [2, 3])):
+        mask = np.isin(trauma_levels, levels)
+        masks[triage] = mask if mask.any() else any_hospital
+
+    masks['GREEN'] = masks['BLACK'] = any_hospital
+    return masks
+
+
+def _hospital_arrays(hospitals: List[Dict]) -> Tuple[List[str], np.ndarray, np.ndarray, Dict[str, np.ndarray]]:
+    """Hospital ids, coordinates and trauma matching masks (cached per hospital list)."""
+    global _hospital_arrays_cache
+
+    cached_hospitals, arrays = _hospital_arrays_cache
+    if cached_hospitals is not hospitals:
+        arrays = (
+            [h['id'] for h in hospitals],
+            np.array([h['lat'] for h in hospitals], dtype=np.float64),
+            np.array([h['lon'] for h in hospitals], dtype=np.float64),
+            _trauma_matching_masks(np.array([h.get('trauma_level', 5) for h in hospitals])),
+        )
+        _hospital_arrays_cache = (hospitals, arrays)
+    return arrays
+
+
+def dispatch_arrays(state: Dict) -> DispatchArrays:
+    """
+    Convert a simulation state dict to struct-of-arrays form.
+
+    Args:
+        state: Simulation state dict
+
+    Returns:
+        DispatchArrays for the idle ambulances and waiting casualties
+    """
+    # Engine states index the idle ambulances; otherwise filter them here
+    ambulances = state['ambulances']
+    if 'idle_ambulance_indices' in state:
+        idle_ambulances = [ambulances[index] for index in state['idle_ambulance_indices']]
+    else:
+        idle_ambulances = [a for a in ambulances if a['status'] == 'IDLE']
+
+    idle = [(a['id'], a['lat'], a['lon']) for a in idle_ambulances]
+    waiting = [(c['id'], c['triage'], c['lat'], c['lon']) for c in state['casualties']
+               if c['status'] == 'WAITING' and c['is_alive']]
+
+    ambulance_ids, ambulance_lats, ambulance_lons = zip(*idle) if idle else ((), (), ())
+    casualty_ids, casualty_triage, casualty_lats, casualty_lons = zip(*waiting) if waiting else ((), (), (), ())
+
+    return DispatchArrays(
+        list(ambulance_ids),
+        np.array(ambulance_lats, dtype=np.float64),
+        np.array(ambulance_lons, dtype=np.float64),
+        list(casualty_ids),
+        list(casualty_triage),
+        np.array([TRIAGE_PRIORITY.get(t, 99) for t in casualty_triage], dtype=np.int64),
+        np.array(casualty_lats, dtype=np.float64),
+        np.array(casualty_lons, dtype=np.float64),
+        *_hospital_arrays(state['hospitals']),
+    )
+
+
+def _dispatch_distances(arrays: DispatchArrays) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Compute all distances a dispatch decision needs, once per policy call.
+
+    Returns:
+        (ambulance x casualty, casualty x hospital) distance matrices in km
+    """
+    return (
+        distance_matrix(arrays.ambulance_lats, arrays.ambulance_lons,
+                        arrays.casualty_lats, arrays.casualty_lons),
+        distance_matrix(arrays.casualty_lats, arrays.casualty_lons,
+                        arrays.hospital_lats, arrays.hospital_lons)
+    )
+
+
+def _highest_priority_nearest(
+    distances: np.ndarray,
+    priorities: np.ndarray,
+    available: np.ndarray
+) -> int:
+    """Index of the available casualty with best triage priority, then shortest distance."""
+    candidates = available & (priorities == priorities[available].min())
+    return int(np.argmin(np.where(candidates, distances, np.inf)))
+
+
+def _dispatch_action(casualty_id: str, hospital_id: str) -> Dict:
+    """Action dict dispatching an ambulance to a casualty, then a hospital."""
+    return {
+        'action_type': 'DISPATCH_TO_CASUALTY',
+        'casualty_id': casualty_id,
+        'hospital_id': hospital_id
+    }
 
 
 def random_policy(state: Dict) -> Dict:
@@ -29,38 +169,29 @@ def random_policy(state: Dict) -> Dict:
     """
     actions = {}
 
-    # Get idle ambulances and waiting casualties
-    idle_ambulances = [a for a in state['ambulances'] if a['status'] == 'IDLE']
-    waiting_casualties = [c for c in state['casualties']
-                          if c['status'] == 'WAITING' and c['is_alive']]
+    arrays = dispatch_arrays(state)
 
-    if not waiting_casualties:
+    if not arrays.casualty_ids:
         return actions
 
-    for ambulance in idle_ambulances:
-        if not waiting_casualties:
+    cas_to_hosp = distance_matrix(arrays.casualty_lats, arrays.casualty_lons,
+                                  arrays.hospital_lats, arrays.hospital_lons)
+    available = list(range(len(arrays.casualty_ids)))
+
+    for ambulance_id in arrays.ambulance_ids:
+        if not available:
             break
 
         # Randomly pick a waiting casualty
-        casualty = random.choice(waiting_casualties)
+        index = random.choice(available)
 
         # Find nearest hospital to casualty
-        nearest_hospital = min(
-            state['hospitals'],
-            key=lambda h: euclidean_distance(
-                casualty['lat'], casualty['lon'],
-                h['lat'], h['lon']
-            )
-        )
+        nearest_hospital = arrays.hospital_ids[int(np.argmin(cas_to_hosp[index]))]
 
-        actions[ambulance['id']] = {
-            'action_type': 'DISPATCH_TO_CASUALTY',
-            'casualty_id': casualty['id'],
-            'hospital_id': nearest_hospital['id']
-        }
+        actions[ambulance_id] = _dispatch_action(arrays.casualty_ids[index], nearest_hospital)
 
         # Remove from available casualties
-        waiting_casualties.remove(casualty)
+        available.remove(index)
 
     return actions
 
@@ -81,40 +212,25 @@ def nearest_hospital_policy(state: Dict) -> Dict:
     """
     actions = {}
 
-    idle_ambulances = [a for a in state['ambulances'] if a['status'] == 'IDLE']
-    waiting_casualties = [c for c in state['casualties']
-                          if c['status'] == 'WAITING' and c['is_alive']]
+    arrays = dispatch_arrays(state)
 
-    for ambulance in idle_ambulances:
-        if not waiting_casualties:
-            break
+    if not arrays.ambulance_ids or not arrays.casualty_ids:
+        return actions
+
+    amb_to_cas, cas_to_hosp = _dispatch_distances(arrays)
+    available = np.ones(len(arrays.casualty_ids), dtype=bool)
 
+    for i, ambulance_id in enumerate(arrays.ambulance_ids[:len(arrays.casualty_ids)]):
         # Find nearest waiting casualty to this ambulance
-        nearest_casualty = min(
-            waiting_casualties,
-            key=lambda c: euclidean_distance(
-                ambulance['lat'], ambulance['lon'],
-                c['lat'], c['lon']
-            )
-        )
+        index = int(np.argmin(np.where(available, amb_to_cas[i], np.inf)))
 
         # Find nearest hospital to the casualty
-        nearest_hospital = min(
-            state['hospitals'],
-            key=lambda h: euclidean_distance(
-                nearest_casualty['lat'], nearest_casualty['lon'],
-                h['lat'], h['lon']
-            )
-        )
+        nearest_hospital = arrays.hospital_ids[int(np.argmin(cas_to_hosp[index]))]
 
-        actions[ambulance['id']] = {
-            'action_type': 'DISPATCH_TO_CASUALTY',
-            'casualty_id': nearest_casualty['id'],
-            'hospital_id': nearest_hospital['id']
-        }
+        actions[ambulance_id] = _dispatch_action(arrays.casualty_ids[index], nearest_hospital)
 
         # Remove from available casualties
-        waiting_casualties.remove(nearest_casualty)
+        available[index] = False
 
     return actions
 
@@ -135,48 +251,24 @@ def triage_priority_policy(state: Dict) -> Dict:
     """
     actions = {}
 
-    idle_ambulances = [a for a in state['ambulances'] if a['status'] == 'IDLE']
-    waiting_casualties = [c for c in state['casualties']
-                          if c['status'] == 'WAITING' and c['is_alive']]
+    arrays = dispatch_arrays(state)
 
-    # Define triage priority
-    triage_priority = {'RED': 0, 'YELLOW': 1, 'GREEN': 2, 'BLACK': 3}
-
-    for ambulance in idle_ambulances:
-        if not waiting_casualties:
-            break
+    if not arrays.ambulance_ids or not arrays.casualty_ids:
+        return actions
 
-        # Sort casualties by triage priority, then by distance to ambulance
-        sorted_casualties = sorted(
-            waiting_casualties,
-            key=lambda c: (
-                triage_priority.get(c['triage'], 99),
-                euclidean_distance(
-                    ambulance['lat'], ambulance['lon'],
-                    c['lat'], c['lon']
-                )
-            )
-        )
+    amb_to_cas, cas_to_hosp = _dispatch_distances(arrays)
+    available = np.ones(len(arrays.casualty_ids), dtype=bool)
 
-        # Pick highest priority casualty
-        casualty = sorted_casualties[0]
+    for i, ambulance_id in enumerate(arrays.ambulance_ids[:len(arrays.casualty_ids)]):
+        # Pick highest priority casualty, closest to ambulance within same triage level
+        index = _highest_priority_nearest(amb_to_cas[i], arrays.casualty_priorities, available)
 
         # Find nearest hospital
-        nearest_hospital = min(
-            state['hospitals'],
-            key=lambda h: euclidean_distance(
-                casualty['lat'], casualty['lon'],
-                h['lat'], h['lon']
-            )
-        )
+        nearest_hospital = arrays.hospital_ids[int(np.argmin(cas_to_hosp[index]))]
 
-        actions[ambulance['id']] = {
-            'action_type': 'DISPATCH_TO_CASUALTY',
-            'casualty_id': casualty['id'],
-            'hospital_id': nearest_hospital['id']
-        }
+        actions[ambulance_id] = _dispatch_action(arrays.casualty_ids[index], nearest_hospital)
 
-        waiting_casualties.remove(casualty)
+        available[index] = False
 
     return actions
 
@@ -199,64 +291,25 @@ def trauma_matching_policy(state: Dict) -> Dict:
     """
     actions = {}
 
-    idle_ambulances = [a for a in state['ambulances'] if a['status'] == 'IDLE']
-    waiting_casualties = [c for c in state['casualties']
-                          if c['status'] == 'WAITING' and c['is_alive']]
+    arrays = dispatch_arrays(state)
 
-    # Triage priority
-    triage_priority = {'RED': 0, 'YELLOW': 1, 'GREEN': 2, 'BLACK': 3}
+    if not arrays.ambulance_ids or not arrays.casualty_ids:
+        return actions
 
-    for ambulance in idle_ambulances:
-        if not waiting_casualties:
-            break
+    amb_to_cas, cas_to_hosp = _dispatch_distances(arrays)
+    available = np.ones(len(arrays.casualty_ids), dtype=bool)
 
+    for i, ambulance_id in enumerate(arrays.ambulance_ids[:len(arrays.casualty_ids)]):
         # Sort by triage priority, then distance
-        sorted_casualties = sorted(
-            waiting_casualties,
-            key=lambda c: (
-                triage_priority.get(c['triage'], 99),
-                euclidean_distance(
-                    ambulance['lat'], ambulance['lon'],
-                    c['lat'], c['lon']
-                )
-            )
-        )
+        index = _highest_priority_nearest(amb_to_cas[i], arrays.casualty_priorities, available)
 
-        casualty = sorted_casualties[0]
-
-        # Find appropriate hospital based on triage level
-        if casualty['triage'] == 'RED':
-            # Prefer Level I/II trauma centers
-            matching_hospitals = [h for h in state['hospitals']
-                                   if h.get('trauma_level', 5) in [1, 2]]
-        elif casualty['triage'] == 'YELLOW':
-            # Prefer Level II/III trauma centers
-            matching_hospitals = [h for h in state['hospitals']
-                                   if h.get('trauma_level', 5) in [2, 3]]
-        else:
-            # GREEN or BLACK - any hospital
-            matching_hospitals = state['hospitals']
-
-        # If no matching hospitals, fall back to all hospitals
-        if not matching_hospitals:
-            matching_hospitals = state['hospitals']
-
-        # Select nearest matching hospital
-        nearest_hospital = min(
-            matching_hospitals,
-            key=lambda h: euclidean_distance(
-                casualty['lat'], casualty['lon'],
-                h['lat'], h['lon']
-            )
-        )
+        # Select nearest hospital appropriate for the triage level
+        matching = arrays.matching_masks[arrays.casualty_triage[index]]
+        nearest_hospital = arrays.hospital_ids[int(np.argmin(np.where(matching, cas_to_hosp[index], np.inf)))]
 
-        actions[ambulance['id']] = {
-            'action_type': 'DISPATCH_TO_CASUALTY',
-            'casualty_id': casualty['id'],
-            'hospital_id': nearest_hospital['id']
-        }
+        actions[ambulance_id] = _dispatch_action(arrays.casualty_ids[index], nearest_hospital)
 
-        waiting_casualties.remove(casualty)
+        available[index] = False
 
     return actions
 
@@ -276,84 +329,33 @@ def load_balancing_policy(state: Dict) -> Dict:
     """
     actions = {}
 
-    idle_ambulances = [a for a in state['ambulances'] if a['status'] == 'IDLE']
-    waiting_casualties = [c for c in state['casualties']
-                          if c['status'] == 'WAITING' and c['is_alive']]
-
-    # Calculate current hospital load (count delivered + enroute casualties)
-    hospital_load = {h['id']: 0 for h in state['hospitals']}
+    arrays = dispatch_arrays(state)
 
-    for casualty in state['casualties']:
-        if casualty['status'] in ['ENROUTE', 'DELIVERED']:
-            # Find which hospital this casualty is going to/at
-            # We need to track this through ambulances
-            pass  # Load tracking happens through assignments
+    if not arrays.ambulance_ids or not arrays.casualty_ids:
+        return actions
 
-    # Track assignments in this policy run
-    current_assignments = {}
+    amb_to_cas, cas_to_hosp = _dispatch_distances(arrays)
+    available = np.ones(len(arrays.casualty_ids), dtype=bool)
 
-    # Triage priority
-    triage_priority = {'RED': 0, 'YELLOW': 1, 'GREEN': 2, 'BLACK': 3}
-
-    for ambulance in idle_ambulances:
-        if not waiting_casualties:
-            break
+    # Effective hospital load: assignments made in this policy run
+    # (load tracking happens through assignments)
+    hospital_load = np.zeros(len(arrays.hospital_ids), dtype=np.int64)
 
+    for i, ambulance_id in enumerate(arrays.ambulance_ids[:len(arrays.casualty_ids)]):
         # Sort by triage priority, then distance
-        sorted_casualties = sorted(
-            waiting_casualties,
-            key=lambda c: (
-                triage_priority.get(c['triage'], 99),
-                euclidean_distance(
-                    ambulance['lat'], ambulance['lon'],
-                    c['lat'], c['lon']
-                )
-            )
-        )
+        index = _highest_priority_nearest(amb_to_cas[i], arrays.casualty_priorities, available)
 
-        casualty = sorted_casualties[0]
-
-        # Find appropriate hospitals based on triage
-        if casualty['triage'] == 'RED':
-            matching_hospitals = [h for h in state['hospitals']
-                                   if h.get('trauma_level', 5) in [1, 2]]
-        elif casualty['triage'] == 'YELLOW':
-            matching_hospitals = [h for h in state['hospitals']
-                                   if h.get('trauma_level', 5) in [2, 3]]
-        else:
-            matching_hospitals = state['hospitals']
-
-        if not matching_hospitals:
-            matching_hospitals = state['hospitals']
-
-        # Select least-loaded matching hospital
-        # Factor in both existing load and current assignments
-        def get_effective_load(hospital):
-            base_load = hospital_load.get(hospital['id'], 0)
-            current_load = current_assignments.get(hospital['id'], 0)
-            return base_load + current_load
-
-        selected_hospital = min(
-            matching_hospitals,
-            key=lambda h: (
-                get_effective_load(h),
-                euclidean_distance(
-                    casualty['lat'], casualty['lon'],
-                    h['lat'], h['lon']
-                )
-            )
-        )
+        # Select least-loaded matching hospital, nearest among equally loaded
+        matching = arrays.matching_masks[arrays.casualty_triage[index]]
+        least_loaded = matching & (hospital_load == hospital_load[matching].min())
+        hospital_index = int(np.argmin(np.where(least_loaded, cas_to_hosp[index], np.inf)))
 
-        actions[ambulance['id']] = {
-            'action_type': 'DISPATCH_TO_CASUALTY',
-            'casualty_id': casualty['id'],
-            'hospital_id': selected_hospital['id']
-        }
+        actions[ambulance_id] = _dispatch_action(arrays.casualty_ids[index], arrays.hospital_ids[hospital_index])
 
         # Track assignment for load balancing
-        current_assignments[selected_hospital['id']] = current_assignments.get(selected_hospital['id'], 0) + 1
+        hospital_load[hospital_index] += 1
 
-        waiting_casualties.remove(casualty)
+        available[index] = False
 
     return actions
 
@@ -5,7 +5,9 @@ Loads hospital data from CSV and provides filtering capabilities.
 """
 
 import csv
-from typing import List, Dict, Optional
+import functools
+import os
+from typing import List, Dict, Optional, Tuple
 
 
 def load_hospitals(region: Optional[str] = None) -> List[Dict]:
@@ -26,9 +28,17 @@ def load_hospitals(region: Optional[str] = None) -> List[Dict]:
                         4=Level IV, 5=Not Available)
         - helipad: Boolean (True if helipad available)
     """
-    hospitals = []
     csv_path = 'datasets/us_hospital_locations.csv'
 
+    # Parsed once per file and region; callers get their own dicts to modify
+    return [dict(hospital) for hospital in _read_hospitals(os.path.abspath(csv_path), region)]
+
+
+@functools.lru_cache(maxsize=None)
+def _read_hospitals(csv_path: str, region: Optional[str]) -> Tuple[Dict, ...]:
+    """Parse hospitals for a region from the CSV (cached; see load_hospitals)."""
+    hospitals = []
+
     # Trauma level mapping
     trauma_mapping = {
         'LEVEL I': 1,
@@ -79,7 +89,7 @@ def load_hospitals(region: Optional[str] = None) -> List[Dict]:
 
             hospitals.append(hospital)
 
-    return hospitals
+    return tuple(hospitals)
 
 
 def get_hospital_by_id(hospitals: List[Dict], hospital_id: str) -> Optional[Dict]:
@@ -13,7 +13,14 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspa
 
 from simulator.environment.scenario_generator import ScenarioGenerator
 from simulator.environment.hospital_loader import load_hospitals
-from simulator.simulation_engine import SimulationEngine
+from simulator.environment.patient_model import Triage
+from simulator.simulation_engine import SimulationEngine, CasualtyStatus, AmbulanceStatus
+
+
+# Observation encodings indexed by integer code
+TRIAGE_ENCODING = np.array([0.0, 0.33, 0.67, 1.0], dtype=np.float32)                  # Triage
+CASUALTY_STATUS_ENCODING = np.array([0.0, 0.25, 0.5, 0.75, 1.0], dtype=np.float32)    # CasualtyStatus
+AMBULANCE_STATUS_ENCODING = np.array([0.0, 0.25, 0.5, 0.75, 1.0], dtype=np.float32)   # AmbulanceStatus
 
 
 class MCIResponseEnv(gym.Env):
@@ -30,7 +37,8 @@ class MCIResponseEnv(gym.Env):
         ambulances_per_hospital=2,
         ambulances_per_hospital_variation=1,
         field_ambulances=5,
-        field_ambulance_radius_km=10.0
+        field_ambulance_radius_km=10.0,
+        hospitals=None
     ):
         super().__init__()
 
@@ -49,20 +57,42 @@ class MCIResponseEnv(gym.Env):
             'seed': None
         }
 
-        self.hospitals = load_hospitals(region=region)
+        # Preloaded hospitals (read-only, so environments of a training run can share
+        # one list instead of each loading the dataset); loaded for the region otherwise
+        self.hospitals = list(hospitals) if hospitals is not None else load_hospitals(region=region)
         if len(self.hospitals) > max_hospitals:
             self.hospitals = self.hospitals[:max_hospitals]
 
         self.region_bounds = self._get_region_bounds()
 
+        # Normalization scalars for lat/lon observations (None range = degenerate region)
+        lat_min, lat_max, lon_min, lon_max = self.region_bounds
+        self._lat_min = lat_min
+        self._lon_min = lon_min
+        self._lat_range_inv = 1.0 / (lat_max - lat_min) if lat_max > lat_min else None
+        self._lon_range_inv = 1.0 / (lon_max - lon_min) if lon_max > lon_min else None
+
         self.scenario_generator = ScenarioGenerator(self.hospitals, self.region_bounds)
         self.simulation_engine: Optional[SimulationEngine] = None
         self.scenario: Optional[Dict] = None
         self._pending_actions: Dict = {}
-        self._previous_metrics: Dict = {}
+        self._prev_deaths = 0
+        self._prev_transported = 0
+
+        # Last observation and the part of its reward that persists while the
+        # engine reports no state change (see SimulationEngine.dirty)
+        self._last_observation: Optional[Dict[str, np.ndarray]] = None
+        self._standing_reward: Optional[float] = None
+
+        # Optional preallocated arrays that observations are written into in place
+        # (set by VecMCIEnv so each sub-env fills its row of the batch directly)
+        self._observation_buffer: Optional[Dict[str, np.ndarray]] = None
 
         self._define_spaces()
 
+        # Hospitals never move, so their observation block is built once
+        self._hospitals_obs_static = self._build_hospitals_obs()
+
     def _get_region_bounds(self) -> Tuple[float, float, float, float]:
         if not self.hospitals:
             return (33.0, 34.5, -119.0, -117.0)
@@ -71,6 +101,28 @@ class MCIResponseEnv(gym.Env):
         lons = [h['lon'] for h in self.hospitals]
         return (min(lats), max(lats), min(lons), max(lons))
 
+    def _normalize_lat(self, lat):
+        return (lat - self._lat_min) * self._lat_range_inv if self._lat_range_inv is not None else 0.5
+
+    def _normalize_lon(self, lon):
+        return (lon - self._lon_min) * self._lon_range_inv if self._lon_range_inv is not None else 0.5
+
+    def _build_hospitals_obs(self) -> np.ndarray:
+        hospitals_obs = np.zeros((self.max_hospitals, 5), dtype=np.float32)
+
+        hospitals = self.hospitals[:self.max_hospitals]
+        if not hospitals:
+            return hospitals_obs
+
+        num_hospitals = len(hospitals)
+        hospitals_obs[:num_hospitals, 0] = self._normalize_lat(np.array([h['lat'] for h in hospitals]))
+        hospitals_obs[:num_hospitals, 1] = self._normalize_lon(np.array([h['lon'] for h in hospitals]))
+        hospitals_obs[:num_hospitals, 2] = np.array([h['trauma_level'] for h in hospitals]) / 5.0
+        hospitals_obs[:num_hospitals, 3] = np.minimum(np.array([h['beds'] for h in hospitals]) / 500.0, 1.0)
+        hospitals_obs[:num_hospitals, 4] = [1.0 if h.get('helipad', False) else 0.0 for h in hospitals]
+
+        return hospitals_obs
+
     def _define_spaces(self):
         self.observation_space = spaces.Dict({
             'casualties': spaces.Box(
@@ -116,12 +168,15 @@ class MCIResponseEnv(gym.Env):
             with open(options['scenario_file'], 'r') as f:
                 self.scenario = json.load(f)
         else:
-            num_casualties = self.np_random.integers(
-                self.num_casualties_range[0],
-                self.num_casualties_range[1] + 1
-            )
+            # Draw everything the episode needs in one call:
+            # casualty count, ambulance spawn seed, scenario layout seed
+            num_casualties, ambulance_seed, scenario_seed = self.np_random.integers(
+                low=[self.num_casualties_range[0], 0, 0],
+                high=[self.num_casualties_range[1] + 1, 1_000_000, 1_000_000]
+            ).tolist()
 
-            self.ambulance_config['seed'] = int(seed) if seed is not None else int(self.np_random.integers(0, 1_000_000))
+            self.ambulance_config['seed'] = int(seed) if seed is not None else ambulance_seed
+            self.scenario_generator.rng = np.random.default_rng(scenario_seed)
 
             self.scenario = self.scenario_generator.generate_scenario(
                 num_casualties=num_casualties,
@@ -129,7 +184,8 @@ class MCIResponseEnv(gym.Env):
                 ambulances_per_hospital_variation=self.ambulance_config['ambulances_per_hospital_variation'],
                 field_ambulances=self.ambulance_config['field_ambulances'],
                 field_ambulance_radius_km=self.ambulance_config['field_ambulance_radius_km'],
-                seed=self.ambulance_config['seed']
+                seed=self.ambulance_config['seed'],
+                lazy_records=True
             )
 
         # Create internal policy that applies RL actions
@@ -138,96 +194,117 @@ class MCIResponseEnv(gym.Env):
 
         assert self.scenario is not None
         self.simulation_engine = SimulationEngine(self.scenario, rl_policy)
-        self._previous_metrics = self.simulation_engine.get_metrics().copy()
+        self._prev_deaths = self.simulation_engine.metrics['deaths']
+        self._prev_transported = self.simulation_engine.metrics['transported']
+        self._cache_episode_obs()
 
         observation = self._get_observation()
         info = self._get_info()
 
+        self._last_observation = observation
+        self._standing_reward = None
+        self.simulation_engine.dirty = False
+
         return observation, info
 
     def step(self, action: np.ndarray) -> Tuple[Dict, float, bool, bool, Dict]:
         assert self.simulation_engine is not None, "Must call reset() before step()"
 
+        engine = self.simulation_engine
+
         # Parse RL action into ambulance actions
         parsed_actions = self._parse_action(action)
         self._pending_actions = parsed_actions
 
         # Execute one simulation step
-        self.simulation_engine.step()
+        engine.step()
 
-        # Calculate reward based on state change
-        current_metrics = self.simulation_engine.get_metrics()
-        reward = self._calculate_reward(self._previous_metrics, current_metrics)
-        self._previous_metrics = current_metrics.copy()
+        if engine.dirty or self._standing_reward is None:
+            # Calculate reward based on state change
+            reward = self._calculate_reward()
+
+            # Get new observation
+            observation = self._get_observation()
+            self._last_observation = observation
+            engine.dirty = False
+        else:
+            # Nothing observable changed: no deltas, same standing penalties
+            reward = self._standing_reward
+            observation = self._last_observation
+            if self._observation_buffer is None:
+                # New dict with a fresh current_time, so observations returned earlier
+                # stay unchanged (the other arrays are shared but never written again)
+                current_time = np.full_like(observation['current_time'], engine.current_time / self.max_time_minutes)
+                observation = {**observation, 'current_time': current_time}
+            else:
+                # Vectorized envs own the buffer rows and overwrite them every step
+                observation['current_time'][0] = engine.current_time / self.max_time_minutes
 
-        # Get new observation
-        observation = self._get_observation()
         info = self._get_info()
 
         # Check termination conditions
-        terminated = self.simulation_engine.is_done()
-        truncated = self.simulation_engine.current_time >= self.max_time_minutes
+        terminated = engine.is_done()
+        truncated = engine.current_time >= self.max_time_minutes
 
         return observation, reward, terminated, truncated, info
 
     def _parse_action(self, action: np.ndarray) -> Dict:
         assert self.simulation_engine is not None
 
+        engine = self.simulation_engine
+        ambulances = engine.ambulances
+        hospitals = engine.hospitals
+        num_casualties = len(engine.casualties)
+        num_hospitals = len(hospitals)
+        is_alive = engine.patients.is_alive
+        casualty_status = engine.casualty_status
+
         actions = {}
         action_pairs = action.reshape(-1, 2)
 
-        idle_ambulances = [
-            amb for amb in self.simulation_engine.ambulances
-            if amb['status'] == 'IDLE'
-        ]
+        idle_indices = np.flatnonzero(engine.ambulance_status == AmbulanceStatus.IDLE)
+        idle_indices = idle_indices[:len(action_pairs)]
+        action_pairs = action_pairs[:len(idle_indices)]
 
-        for idx, amb in enumerate(idle_ambulances):
-            if idx >= len(action_pairs):
-                break
+        # Casualty index 0 means WAIT; the rest are casualty IDs offset by one
+        casualty_ids = action_pairs[:, 0] - 1
+        hospital_indices = action_pairs[:, 1]
 
-            casualty_idx, hospital_idx = action_pairs[idx]
+        # Validate actions: in range, casualty alive and still waiting
+        valid = (casualty_ids >= 0) & (casualty_ids < num_casualties) & (hospital_indices < num_hospitals)
+        targets = casualty_ids[valid]
+        valid[valid] = is_alive[targets] & (casualty_status[targets] == CasualtyStatus.WAITING)
 
-            # 0 means WAIT
-            if casualty_idx == 0:
-                continue
-
-            casualty_id = casualty_idx - 1
-
-            # Validate action
-            if casualty_id >= len(self.simulation_engine.casualties):
-                continue
-            if hospital_idx >= len(self.simulation_engine.hospitals):
-                continue
-
-            casualty = self.simulation_engine.casualties[casualty_id]
-
-            # Check if action is valid
-            if not casualty['patient'].is_alive:
-                continue
-            if casualty['status'] != 'WAITING':
-                continue
-
-            hospital_id = self.simulation_engine.hospitals[hospital_idx]['id']
-
-            actions[amb['id']] = {
+        for amb_idx, casualty_id, hospital_idx in zip(
+            idle_indices[valid].tolist(), casualty_ids[valid].tolist(), hospital_indices[valid].tolist()
+        ):
+            actions[ambulances[amb_idx].id] = {
                 'action_type': 'DISPATCH_TO_CASUALTY',
                 'casualty_id': casualty_id,
-                'hospital_id': hospital_id
+                'hospital_id': hospitals[hospital_idx]['id']
             }
 
         return actions
 
-    def _calculate_reward(self, prev_metrics: Dict, curr_metrics: Dict) -> float:
+    def _calculate_reward(self) -> float:
         assert self.simulation_engine is not None
-
-        reward = 0.0
+        engine = self.simulation_engine
+        metrics = engine.metrics
 
         # Primary objectives
-        deaths_delta = curr_metrics['deaths'] - prev_metrics['deaths']
-        deliveries_delta = curr_metrics['transported'] - prev_metrics['transported']
+        deaths = metrics['deaths']
+        transported = metrics['transported']
+
+        deaths_delta = deaths - self._prev_deaths
+        deliveries_delta = transported - self._prev_transported
+        self._prev_deaths = deaths
+        self._prev_transported = transported
 
-        reward += -1000 * deaths_delta
-        reward += 500 * deliveries_delta
+        delta_reward = -1000 * deaths_delta + 500 * deliveries_delta
+
+        # Remaining terms only depend on current state, so they repeat
+        # unchanged on steps where nothing happens
+        reward = 0.0
 
         # Secondary objectives
         trauma_matches = self._count_trauma_matches()
@@ -237,39 +314,38 @@ class MCIResponseEnv(gym.Env):
         reward += 100 * golden_hour_compliance
 
         # Tertiary objectives
-        red_waiting = sum(
-            1 for c in self.simulation_engine.casualties
-            if c['patient'].is_alive and c['status'] == 'WAITING' and c['triage'] == 'RED'
-        )
+        waiting = engine.patients.is_alive & (engine.casualty_status == CasualtyStatus.WAITING)
+
+        red_waiting = np.count_nonzero(waiting & (engine.casualty_triage == Triage.RED))
         reward += -100 * red_waiting
 
-        casualties_waiting = sum(
-            1 for c in self.simulation_engine.casualties
-            if c['patient'].is_alive and c['status'] == 'WAITING'
-        )
+        casualties_waiting = np.count_nonzero(waiting)
         reward += -10 * casualties_waiting
 
-        idle_ambulances = sum(
-            1 for a in self.simulation_engine.ambulances
-            if a['status'] == 'IDLE' and casualties_waiting > 0
-        )
-        reward += -5 * idle_ambulances
+        if casualties_waiting > 0:
+            idle_ambulances = np.count_nonzero(engine.ambulance_status == AmbulanceStatus.IDLE)
+            reward += -5 * idle_ambulances
 
-        return reward
+        self._standing_reward = reward
+
+        return delta_reward + reward
 
     def _count_trauma_matches(self) -> int:
         assert self.simulation_engine is not None
 
+        casualties = self.simulation_engine.casualties
+        hospitals = self.simulation_engine.hospitals
+
         count = 0
         for event in self.simulation_engine.event_log[-10:]:
             if event['type'] == 'delivery':
                 casualty_id = event['casualty_id']
                 hospital_id = event['hospital_id']
 
-                casualty = self.simulation_engine.casualties[casualty_id]
-                hospital = next((h for h in self.simulation_engine.hospitals if h['id'] == hospital_id), None)
+                casualty = casualties[casualty_id]
+                hospital = next((h for h in hospitals if h['id'] == hospital_id), None)
 
-                if hospital and casualty['triage'] == 'RED' and hospital['trauma_level'] in [1, 2]:
+                if hospital and casualty.triage == 'RED' and hospital['trauma_level'] in [1, 2]:
                     count += 1
 
         return count
@@ -277,116 +353,107 @@ class MCIResponseEnv(gym.Env):
     def _count_golden_hour_compliance(self) -> int:
         assert self.simulation_engine is not None
 
+        casualties = self.simulation_engine.casualties
+
         count = 0
         for event in self.simulation_engine.event_log[-10:]:
             if event['type'] == 'pickup':
                 casualty_id = event['casualty_id']
-                casualty = self.simulation_engine.casualties[casualty_id]
+                casualty = casualties[casualty_id]
 
-                if casualty['triage'] == 'RED' and casualty['patient'].time_since_injury <= 60:
+                if casualty.triage == 'RED' and casualty.patient.time_since_injury <= 60:
                     count += 1
 
         return count
 
+    def _cache_episode_obs(self) -> None:
+        """Precompute observation columns that stay fixed for the whole episode."""
+        assert self.simulation_engine is not None
+        engine = self.simulation_engine
+
+        # Casualties never move
+        casualties = engine.casualties[:self.max_casualties]
+        self._casualty_position_obs = np.empty((len(casualties), 2))
+        self._casualty_position_obs[:, 0] = self._normalize_lat(np.array([c.lat for c in casualties]))
+        self._casualty_position_obs[:, 1] = self._normalize_lon(np.array([c.lon for c in casualties]))
+
+        # Ambulance type and base hospital never change
+        hospital_index: Dict[Any, int] = {}
+        for idx, h in enumerate(engine.hospitals):
+            hospital_index.setdefault(h['id'], idx)
+
+        ambulances = engine.ambulances[:self.max_ambulances]
+        self._ambulance_type_obs = np.array([self._encode_ambulance_type(a.type) for a in ambulances])
+        self._ambulance_base_obs = np.array([
+            (hospital_index[a.base_hospital_id] + 1) / self.max_hospitals
+            if a.base_hospital_id in hospital_index else 0.0
+            for a in ambulances
+        ])
+
     def _get_observation(self) -> Dict:
         assert self.simulation_engine is not None
         assert self.scenario is not None
 
-        casualties_obs = np.zeros((self.max_casualties, 6), dtype=np.float32)
-        ambulances_obs = np.zeros((self.max_ambulances, 7), dtype=np.float32)
-        hospitals_obs = np.zeros((self.max_hospitals, 5), dtype=np.float32)
-
-        # Normalize lat/lon
-        lat_min, lat_max, lon_min, lon_max = self.region_bounds
+        # Every entry is written below (padding rows explicitly zeroed), so no zero-fill first
+        observation = self._observation_buffer
+        if observation is None:
+            observation = {
+                key: np.empty(space.shape, dtype=space.dtype)
+                for key, space in self.observation_space.spaces.items()
+            }
 
-        def norm_lat(lat):
-            return (lat - lat_min) / (lat_max - lat_min) if lat_max > lat_min else 0.5
+        casualties_obs = observation['casualties']
+        ambulances_obs = observation['ambulances']
 
-        def norm_lon(lon):
-            return (lon - lon_min) / (lon_max - lon_min) if lon_max > lon_min else 0.5
+        engine = self.simulation_engine
 
         # Encode casualties
-        for i, cas in enumerate(self.simulation_engine.casualties[:self.max_casualties]):
-            casualties_obs[i] = [
-                norm_lat(cas['lat']),
-                norm_lon(cas['lon']),
-                self._encode_triage(cas['triage']),
-                cas['patient'].health,
-                1.0 if cas['patient'].is_alive else 0.0,
-                self._encode_casualty_status(cas['status'])
-            ]
+        num_casualties = len(self._casualty_position_obs)
+        casualties_obs[:num_casualties, 0:2] = self._casualty_position_obs
+        casualties_obs[:num_casualties, 2] = TRIAGE_ENCODING[engine.casualty_triage[:num_casualties]]
+        casualties_obs[:num_casualties, 3] = engine.patients.health[:num_casualties]
+        casualties_obs[:num_casualties, 4] = engine.patients.is_alive[:num_casualties]
+        casualties_obs[:num_casualties, 5] = CASUALTY_STATUS_ENCODING[engine.casualty_status[:num_casualties]]
+        casualties_obs[num_casualties:] = 0.0
 
         # Encode ambulances
-        for i, amb in enumerate(self.simulation_engine.ambulances[:self.max_ambulances]):
-            base_hospital_id = amb.get('base_hospital_id', -1)
-            base_hospital_idx = -1
-
-            if base_hospital_id != -1:
-                for idx, h in enumerate(self.simulation_engine.hospitals):
-                    if h['id'] == base_hospital_id:
-                        base_hospital_idx = idx
-                        break
-
-            ambulances_obs[i] = [
-                norm_lat(amb['lat']),
-                norm_lon(amb['lon']),
-                self._encode_ambulance_status(amb['status']),
-                self._encode_ambulance_type(amb['type']),
-                1.0 if amb['patient_onboard'] is not None else 0.0,
-                (base_hospital_idx + 1) / self.max_hospitals if base_hospital_idx >= 0 else 0.0,
-                min(amb['time_to_target'] / 180.0, 1.0) if amb['time_to_target'] else 0.0
-            ]
-
-        # Encode hospitals
-        for i, hosp in enumerate(self.hospitals[:self.max_hospitals]):
-            hospitals_obs[i] = [
-                norm_lat(hosp['lat']),
-                norm_lon(hosp['lon']),
-                hosp['trauma_level'] / 5.0,
-                min(hosp['beds'] / 500.0, 1.0),
-                1.0 if hosp.get('helipad', False) else 0.0
-            ]
+        ambulances = engine.ambulances[:self.max_ambulances]
+        num_ambulances = len(ambulances)
+
+        ambulances_obs[:num_ambulances, 0] = self._normalize_lat(np.array([a.lat for a in ambulances]))
+        ambulances_obs[:num_ambulances, 1] = self._normalize_lon(np.array([a.lon for a in ambulances]))
+        ambulances_obs[:num_ambulances, 2] = AMBULANCE_STATUS_ENCODING[engine.ambulance_status[:num_ambulances]]
+        ambulances_obs[:num_ambulances, 3] = self._ambulance_type_obs
+        ambulances_obs[:num_ambulances, 4] = [a.patient_onboard is not None for a in ambulances]
+        ambulances_obs[:num_ambulances, 5] = self._ambulance_base_obs
+        ambulances_obs[:num_ambulances, 6] = np.minimum(
+            engine.ambulance_time_to_target[:num_ambulances] / 180.0, 1.0
+        )
+        ambulances_obs[num_ambulances:] = 0.0
+
+        # Hospitals are static
+        observation['hospitals'][:] = self._hospitals_obs_static
 
         incident_lat, incident_lon = self.scenario['incident_location']
 
-        return {
-            'casualties': casualties_obs,
-            'ambulances': ambulances_obs,
-            'hospitals': hospitals_obs,
-            'incident_location': np.array([norm_lat(incident_lat), norm_lon(incident_lon)], dtype=np.float32),
-            'current_time': np.array([self.simulation_engine.current_time / self.max_time_minutes], dtype=np.float32)
-        }
+        observation['incident_location'][:] = [self._normalize_lat(incident_lat), self._normalize_lon(incident_lon)]
+        observation['current_time'][0] = engine.current_time / self.max_time_minutes
 
-    def _encode_triage(self, triage: str) -> float:
-        mapping = {'RED': 0.0, 'YELLOW': 0.33, 'GREEN': 0.67, 'BLACK': 1.0}
-        return mapping.get(triage, 0.5)
-
-    def _encode_casualty_status(self, status: str) -> float:
-        mapping = {'WAITING': 0.0, 'ASSIGNED': 0.25, 'ENROUTE': 0.5, 'DELIVERED': 0.75, 'DECEASED': 1.0}
-        return mapping.get(status, 0.0)
-
-    def _encode_ambulance_status(self, status: str) -> float:
-        mapping = {
-            'IDLE': 0.0,
-            'MOVING_TO_CASUALTY': 0.25,
-            'MOVING_TO_HOSPITAL': 0.5,
-            'MOVING_TO_LOCATION': 0.75,
-            'RETURNING_TO_BASE': 1.0
-        }
-        return mapping.get(status, 0.0)
+        return observation
 
     def _encode_ambulance_type(self, amb_type: str) -> float:
         return 0.0 if amb_type == 'HOSPITAL_BASED' else 1.0
 
     def _get_info(self) -> Dict:
         assert self.simulation_engine is not None
+        engine = self.simulation_engine
 
         info = {
-            'metrics': self.simulation_engine.get_metrics(),
-            'current_time': self.simulation_engine.current_time,
-            'num_casualties': len(self.simulation_engine.casualties),
-            'num_ambulances': len(self.simulation_engine.ambulances),
-            'num_hospitals': len(self.simulation_engine.hospitals),
+            'metrics': engine.get_metrics(),
+            'current_time': engine.current_time,
+            'num_casualties': len(engine.casualties),
+            'num_ambulances': len(engine.ambulances),
+            'num_hospitals': len(engine.hospitals),
             'action_mask': self._get_action_mask()
         }
         return info
@@ -394,54 +461,41 @@ class MCIResponseEnv(gym.Env):
     def _get_action_mask(self) -> Dict:
         """Generate mask for valid actions per ambulance"""
         assert self.simulation_engine is not None
+        engine = self.simulation_engine
 
-        casualty_masks = []
-        hospital_masks = []
+        # Rows for idle ambulances share the same mask; rows beyond have no valid actions
+        num_idle = min(np.count_nonzero(engine.ambulance_status == AmbulanceStatus.IDLE), self.max_ambulances)
+        num_casualties = min(len(engine.casualties), self.max_casualties)
 
-        idle_ambulances = [amb for amb in self.simulation_engine.ambulances if amb['status'] == 'IDLE']
-
-        for amb_idx in range(self.max_ambulances):
-            if amb_idx < len(idle_ambulances):
-                # Valid casualty selections
-                casualty_mask = [True]  # WAIT always valid
-
-                for cas_idx, casualty in enumerate(self.simulation_engine.casualties):
-                    if cas_idx >= self.max_casualties:
-                        break
-                    valid = casualty['patient'].is_alive and casualty['status'] == 'WAITING'
-                    casualty_mask.append(valid)
-
-                # Pad to max
-                while len(casualty_mask) < self.max_casualties + 1:
-                    casualty_mask.append(False)
-
-                # All hospitals valid for dispatch
-                hospital_mask = [True] * len(self.simulation_engine.hospitals)
-                while len(hospital_mask) < self.max_hospitals:
-                    hospital_mask.append(False)
-            else:
-                # No valid actions for non-existent ambulances
-                casualty_mask = [False] * (self.max_casualties + 1)
-                hospital_mask = [False] * self.max_hospitals
+        casualty_masks = np.zeros((self.max_ambulances, self.max_casualties + 1), dtype=bool)
+        casualty_masks[:num_idle, 0] = True  # WAIT always valid
+        casualty_masks[:num_idle, 1:num_casualties + 1] = (
+            engine.patients.is_alive[:num_casualties]
+            & (engine.casualty_status[:num_casualties] == CasualtyStatus.WAITING)
+        )
 
-            casualty_masks.append(casualty_mask)
-            hospital_masks.append(hospital_mask)
+        # All hospitals valid for dispatch
+        hospital_masks = np.zeros((self.max_ambulances, self.max_hospitals), dtype=bool)
+        hospital_masks[:num_idle, :len(engine.hospitals)] = True
 
         return {
-            'casualty_masks': np.array(casualty_masks, dtype=bool),
-            'hospital_masks': np.array(hospital_masks, dtype=bool)
+            'casualty_masks': casualty_masks,
+            'hospital_masks': hospital_masks
         }
 
     def render(self):
         if self.simulation_engine is None:
             return
 
-        print(f"\nTime: {self.simulation_engine.current_time} min")
-        print(f"Casualties - Alive: {sum(1 for c in self.simulation_engine.casualties if c['patient'].is_alive)}, "
-              f"Waiting: {sum(1 for c in self.simulation_engine.casualties if c['status'] == 'WAITING')}, "
-              f"Deaths: {self.simulation_engine.metrics['deaths']}")
-        print(f"Ambulances - Idle: {sum(1 for a in self.simulation_engine.ambulances if a['status'] == 'IDLE')}, "
-              f"Busy: {sum(1 for a in self.simulation_engine.ambulances if a['status'] != 'IDLE')}")
+        engine = self.simulation_engine
+        num_idle = np.count_nonzero(engine.ambulance_status == AmbulanceStatus.IDLE)
+
+        print(f"\nTime: {engine.current_time} min")
+        print(f"Casualties - Alive: {np.count_nonzero(engine.patients.is_alive)}, "
+              f"Waiting: {np.count_nonzero(engine.casualty_status == CasualtyStatus.WAITING)}, "
+              f"Deaths: {engine.metrics['deaths']}")
+        print(f"Ambulances - Idle: {num_idle}, "
+              f"Busy: {len(engine.ambulances) - num_idle}")
 
 
 if __name__ == '__main__':
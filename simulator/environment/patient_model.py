@@ -4,6 +4,37 @@ Patient Deterioration Model - Step 1.3
 Implements Markov deterioration model for MCI casualties based on START triage system.
 """
 
+from enum import IntEnum
+from typing import Sequence
+
+import numpy as np
+
+
+class Triage(IntEnum):
+    """START triage levels as integer codes."""
+    RED = 0
+    YELLOW = 1
+    GREEN = 2
+    BLACK = 3
+
+
+class TreatmentStatus(IntEnum):
+    """Patient treatment states as integer codes."""
+    WAITING = 0
+    ENROUTE = 1
+    DELIVERED = 2
+
+
+# Deterioration rate per minute, indexed by [triage code, treatment code].
+# Mirrors the branches in PatientModel.update().
+DETERIORATION_RATES = np.array([
+    # WAITING  ENROUTE  DELIVERED
+    [0.05, 0.02, 0.0],     # RED
+    [0.002, 0.001, 0.0],   # YELLOW
+    [0.0, 0.0, 0.0],       # GREEN
+    [0.0, 0.0, 0.0],       # BLACK
+])
+
 
 class PatientModel:
     """
@@ -163,6 +194,133 @@ class PatientModel:
         }
 
 
+class PatientBatch:
+    """
+    Structure-of-arrays store for a whole casualty population.
+
+    Holds the same state as one PatientModel per casualty, but advances every
+    patient with a single vectorized update per time step. Individual patients
+    are exposed as PatientView objects so callers keep the PatientModel API.
+
+    Attributes:
+        triage: Triage codes (Triage)
+        health: Current health per patient
+        time_since_injury: Minutes elapsed since injury per patient
+        is_alive: Alive flag per patient
+        treatment_status: Treatment codes (TreatmentStatus)
+        deteriorated: Whether the last update() changed any patient's health
+    """
+
+    def __init__(self, triage_levels: Sequence[str]):
+        """
+        Initialize patients with given triage levels.
+
+        Args:
+            triage_levels: One of 'RED', 'YELLOW', 'GREEN', 'BLACK' per patient
+        """
+        num_patients = len(triage_levels)
+
+        self.triage = np.array(
+            [Triage[level.upper()] for level in triage_levels], dtype=np.int8
+        )
+        self.treatment_status = np.full(num_patients, TreatmentStatus.WAITING, dtype=np.int8)
+        self.time_since_injury = np.zeros(num_patients)
+
+        # BLACK patients start deceased with zero health
+        self.is_alive = self.triage != Triage.BLACK
+        self.health = self.is_alive.astype(np.float64)
+        self.deteriorated = False
+
+        # Per-patient deterioration rate, looked up again only after a triage
+        # or treatment change (see _refresh_rates)
+        self._rates = None
+
+        self._views = [PatientView(self, index) for index in range(num_patients)]
+
+    def __len__(self) -> int:
+        return len(self._views)
+
+    def __getitem__(self, index: int) -> 'PatientView':
+        return self._views[index]
+
+    def update(self, delta_time_minutes: float) -> np.ndarray:
+        """
+        Update all patients, equivalent to PatientModel.update() on each one.
+
+        Args:
+            delta_time_minutes: Time increment in minutes
+
+        Returns:
+            Indices of patients that died during this update
+        """
+        # Masks are applied arithmetically rather than by fancy indexing, so
+        # every patient takes the same path (inactive ones get a zero step)
+        alive = self.is_alive
+        self.time_since_injury += alive * delta_time_minutes
+
+        # Hospital delivery stops deterioration
+        active = alive & (self.treatment_status != TreatmentStatus.DELIVERED)
+        if self._rates is None:
+            self._refresh_rates()
+        decrease = self._rates * (active * delta_time_minutes)
+        self.health -= decrease
+        self.deteriorated = bool(np.any(decrease))
+
+        # YELLOW deteriorates to RED if health drops below 0.5
+        worsened = active & (self.triage == Triage.YELLOW) & (self.health < 0.5)
+        if worsened.any():
+            np.copyto(self.triage, Triage.RED, where=worsened)
+            self._rates = None
+
+        # Check for death
+        died = active & (self.health <= 0.0)
+        np.copyto(self.health, 0.0, where=died)
+        self.is_alive &= ~died
+
+        return np.flatnonzero(died)
+
+    def _refresh_rates(self) -> None:
+        """Look up every patient's deterioration rate from DETERIORATION_RATES."""
+        self._rates = DETERIORATION_RATES[self.triage, self.treatment_status]
+
+
+def _batch_field(column: str, codes: type = None) -> property:
+    """Build a property reading/writing one PatientBatch column for a PatientView."""
+    names = tuple(code.name for code in codes) if codes else None
+
+    def fget(self):
+        value = getattr(self._batch, column)[self._index]
+        return names[value] if codes else value.item()
+
+    def fset(self, value):
+        getattr(self._batch, column)[self._index] = codes[value] if codes else value
+        if codes:
+            # Triage or treatment changed: deterioration rates are stale
+            self._batch._rates = None
+
+    return property(fget, fset)
+
+
+class PatientView(PatientModel):
+    """
+    PatientModel interface onto one row of a PatientBatch.
+
+    Reads and writes go straight to the batch arrays, so scalar methods
+    (apply_treatment, get_survival_probability, get_state) behave exactly as
+    on a standalone PatientModel.
+    """
+
+    triage = _batch_field('triage', Triage)
+    health = _batch_field('health')
+    time_since_injury = _batch_field('time_since_injury')
+    is_alive = _batch_field('is_alive')
+    treatment_status = _batch_field('treatment_status', TreatmentStatus)
+
+    def __init__(self, batch: PatientBatch, index: int):
+        self._batch = batch
+        self._index = index
+
+
 if __name__ == '__main__':
     # Test patient deterioration model
     print("Testing Patient Deterioration Model...")
@@ -282,5 +440,27 @@ if __name__ == '__main__':
     else:
         print("   ✗ FAIL: BLACK patient state incorrect")
 
+    # Test 8: Vectorized batch matches scalar model
+    print("\n8. Testing PatientBatch against PatientModel...")
+    levels = ['RED', 'YELLOW', 'GREEN', 'BLACK', 'RED', 'YELLOW']
+    scalar_patients = [PatientModel(level) for level in levels]
+    batch = PatientBatch(levels)
+
+    for minute in range(300):
+        if minute == 10:
+            scalar_patients[4].apply_treatment('PICKUP')
+            batch[4].apply_treatment('PICKUP')
+        if minute == 40:
+            scalar_patients[5].apply_treatment('HOSPITAL')
+            batch[5].apply_treatment('HOSPITAL')
+        for patient in scalar_patients:
+            patient.update(1)
+        batch.update(1)
+
+    if all(p.get_state() == batch[i].get_state() for i, p in enumerate(scalar_patients)):
+        print("   ✓ PASS: Batch update matches scalar update")
+    else:
+        print("   ✗ FAIL: Batch update diverged from scalar update")
+
     print("\n" + "=" * 60)
     print("✓ All patient deterioration tests completed!")
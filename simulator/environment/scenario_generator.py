@@ -4,9 +4,78 @@ Scenario Generator - Step 1.2
 Generates random MCI scenarios with casualties and ambulances.
 """
 
-import json
 import numpy as np
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Tuple, Optional, Sequence, Union
+import sys
+import os
+import threading
+import hashlib
+import functools
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from simulator.environment.routing import build_hospital_index, nearest_hospital
+from simulator.environment.patient_model import Triage
+from simulator.utils.json_utils import dumps, loads, dump_json, load_json
+
+
+# Triage names indexed by integer code (Triage), and the reverse lookup
+TRIAGE_NAMES = np.array([level.name for level in Triage])
+TRIAGE_CODES = {level.name: int(level) for level in Triage}
+
+# Number of ambulance spawn seeds whose initial RNG state is kept for reuse
+RNG_CACHE_SIZE = 256
+
+# Hospital lists by content key, so saved scenarios can reference a shared list
+# instead of embedding every hospital (see save_scenario(include_hospitals=False))
+HOSPITAL_REGISTRY: Dict[str, List[Dict]] = {}
+
+
+def register_hospitals(hospitals: List[Dict]) -> str:
+    """
+    Register a hospital list in HOSPITAL_REGISTRY.
+
+    The key is derived from hospital ids and coordinates, so the same list
+    gets the same key in every process that loads it.
+
+    Args:
+        hospitals: List of hospital dictionaries
+
+    Returns:
+        Registry key for the list
+    """
+    fingerprint = dumps([[h['id'], h['lat'], h['lon']] for h in hospitals])
+    key = hashlib.sha1(fingerprint).hexdigest()[:16]
+    HOSPITAL_REGISTRY.setdefault(key, hospitals)
+    return key
+
+
+@functools.lru_cache(maxsize=128)
+def _casualty_template(num_casualties: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Shape-only casualty columns (ids and initial health) for a casualty count.
+
+    These never depend on the random draws, so they are built once per count
+    (training draws counts from a small range) and returned read-only.
+    """
+    ids = np.arange(num_casualties)
+    initial_health = np.ones(num_casualties)  # All start at full health
+    ids.setflags(write=False)
+    initial_health.setflags(write=False)
+    return ids, initial_health
+
+
+def _attach_hospitals(scenario: Dict) -> Dict:
+    """Re-attach a registered hospital list to a scenario saved without one."""
+    if 'hospitals' not in scenario and 'hospital_set' in scenario:
+        key = scenario['hospital_set']
+        if key not in HOSPITAL_REGISTRY:
+            raise ValueError(
+                f"Scenario references hospital set '{key}', which is not registered; "
+                "create a ScenarioGenerator with the same hospitals first"
+            )
+        scenario['hospitals'] = HOSPITAL_REGISTRY[key]
+    return scenario
 
 
 class ScenarioGenerator:
@@ -29,12 +98,36 @@ class ScenarioGenerator:
             seed: Random seed for reproducibility
         """
         self.hospitals = hospitals
+        self.hospital_set = register_hospitals(hospitals)
         self.region_bounds = region_bounds
         self.rng = np.random.default_rng(seed)
 
         # Triage distribution based on START system
         self.triage_levels = ['RED', 'YELLOW', 'GREEN', 'BLACK']
         self.triage_probabilities = [0.25, 0.40, 0.30, 0.05]  # 25% Red, 40% Yellow, 30% Green, 5% Black
+        self.triage_codes = np.array([Triage[level] for level in self.triage_levels], dtype=np.int8)
+
+        # Normalized cumulative probabilities for inverse-CDF triage sampling
+        self._triage_cdf = np.cumsum(self.triage_probabilities)
+        self._triage_cdf /= self._triage_cdf[-1]
+
+        # Initial bit generator states per spawn seed, restored into a reusable per-thread
+        # generator (cheaper than seeding a new default_rng each time a scenario is spawned)
+        self._rng_cache: Dict[int, Dict] = {}
+        self._rng_cache_lock = threading.Lock()
+        self._thread_local = threading.local()
+
+    def set_region_bounds(self, region_bounds: Tuple[float, float, float, float]) -> None:
+        """
+        Change the region incident locations are drawn from.
+
+        Lets one generator (and its hospital caches) serve several locations
+        that share a hospital list.
+
+        Args:
+            region_bounds: (min_lat, max_lat, min_lon, max_lon)
+        """
+        self.region_bounds = region_bounds
 
     def generate_scenario(
         self,
@@ -46,7 +139,8 @@ class ScenarioGenerator:
         seed: Optional[int] = None,
         incident_location: Optional[Tuple[float, float]] = None,
         manual_ambulances: Optional[List[Dict]] = None,
-        casualty_distribution_radius: float = 0.5
+        casualty_distribution_radius: float = 0.5,
+        lazy_records: bool = False
     ) -> Dict:
         """
         Generate a random MCI scenario configuration.
@@ -63,6 +157,9 @@ class ScenarioGenerator:
             seed: Optional seed for ambulance spawning reproducibility (uses scenario RNG if None)
             incident_location: Optional manual incident location (lat, lon) - if None, generates random
             manual_ambulances: Optional list of manually placed ambulances [{'lat': x, 'lon': y}, ...]
+            casualty_distribution_radius: Std. deviation of casualty positions in km
+            lazy_records: Return 'casualties' as a CasualtyRecords view that builds each
+                casualty dict only when accessed (for in-process consumers such as training)
 
         Returns:
             Scenario dictionary with structure:
@@ -81,7 +178,8 @@ class ScenarioGenerator:
                     'manual': bool  # True if using manual ambulances
                 },
                 'manual_ambulances': [...] (optional, if manual_ambulances provided),
-                'hospitals': [...],  # From hospital loader
+                'hospitals': [...],  # From hospital loader (shared, not copied)
+                'hospital_set': str,  # HOSPITAL_REGISTRY key for the hospitals
                 'timestamp': 0,
                 'num_casualties': int
             }
@@ -92,18 +190,29 @@ class ScenarioGenerator:
         if incident_location:
             incident_lat, incident_lon = incident_location
             incident_location = [incident_lat, incident_lon]
+            triage_uniforms = None
         else:
-            incident_lat = self.rng.uniform(min_lat, max_lat)
-            incident_lon = self.rng.uniform(min_lon, max_lon)
+            # One draw covers the incident location and every casualty's triage
+            # (same values, in the same stream order, as separate uniform/choice calls)
+            uniforms = self.rng.random(2 + num_casualties)
+            low = np.array([min_lat, min_lon])
+            high = np.array([max_lat, max_lon])
+            incident_lat, incident_lon = (low + (high - low) * uniforms[:2]).tolist()
             incident_location = [incident_lat, incident_lon]
+            triage_uniforms = uniforms[2:]
 
         # Generate casualties around incident location
-        casualties = self._generate_casualties(
-            num_casualties, 
-            incident_lat, 
-            incident_lon, 
-            radius_km=casualty_distribution_radius
+        columns = self.generate_casualty_columns(
+            num_casualties,
+            incident_lat,
+            incident_lon,
+            radius_km=casualty_distribution_radius,
+            triage_uniforms=triage_uniforms
         )
+        if lazy_records:
+            casualties = CasualtyRecords(columns)
+        else:
+            casualties = to_records({**columns, 'triage': TRIAGE_NAMES[columns['triage']]})
 
         # Store ambulance configuration
         # If manual ambulances provided, store them; otherwise store generation config
@@ -130,6 +239,7 @@ class ScenarioGenerator:
             'casualties': casualties,
             'ambulance_config': ambulance_config,
             'hospitals': self.hospitals,
+            'hospital_set': self.hospital_set,
             'timestamp': 0,
             'num_casualties': num_casualties
         }
@@ -140,6 +250,94 @@ class ScenarioGenerator:
 
         return scenario
 
+    def generate_scenarios_batch(
+        self,
+        num_casualties: List[int],
+        ambulances_per_hospital: int = 2,
+        ambulances_per_hospital_variation: int = 1,
+        field_ambulances: int = 3,
+        field_ambulance_radius_km: float = 10.0,
+        seeds: Optional[List[int]] = None,
+        casualty_distribution_radius: float = 0.5
+    ) -> List[Dict]:
+        """
+        Generate several random MCI scenarios with one batch of RNG calls.
+
+        Incident locations, triage levels and casualty positions for all scenarios
+        are drawn together and sliced per scenario, instead of a handful of small
+        draws per generate_scenario() call. Scenarios have the same structure as
+        generate_scenario(), but a different random stream, so they do not match
+        scenarios generated one at a time from the same seed.
+
+        Args:
+            num_casualties: Number of casualties for each scenario (one entry per scenario)
+            ambulances_per_hospital: Base number of ambulances stationed at each hospital
+            ambulances_per_hospital_variation: Random variation (+/-) in ambulances per hospital
+            field_ambulances: Number of ambulances randomly placed near incident (first responders)
+            field_ambulance_radius_km: Radius in km for field ambulance placement around incident
+            seeds: Optional ambulance spawning seed for each scenario (drawn from scenario RNG if None)
+            casualty_distribution_radius: Std. deviation of casualty positions in km
+
+        Returns:
+            List of scenario dictionaries (see generate_scenario)
+        """
+        counts = np.asarray(num_casualties, dtype=np.int64)
+        num_scenarios = len(counts)
+        total = int(counts.sum())
+        offsets = np.concatenate([[0], np.cumsum(counts)])
+
+        min_lat, max_lat, min_lon, max_lon = self.region_bounds
+
+        # All incident locations and all casualty triage levels from one uniform draw
+        uniforms = self.rng.random(2 * num_scenarios + total)
+        low = np.array([min_lat, min_lon])
+        high = np.array([max_lat, max_lon])
+        incidents = low + (high - low) * uniforms[:2 * num_scenarios].reshape(num_scenarios, 2)
+        triage = self._triage_from_uniforms(uniforms[2 * num_scenarios:])
+
+        # Gaussian offsets around each casualty's own incident (sigma in degrees, 1 degree ≈ 111 km)
+        sigma = casualty_distribution_radius / 111.0
+        positions = self.rng.normal(scale=sigma, size=(total, 2))
+        positions += np.repeat(incidents, counts, axis=0)
+        lats, lons = positions.T.copy()
+
+        if seeds is None:
+            seeds = self.rng.integers(0, 2**31, size=num_scenarios).tolist()
+
+        triage_names = TRIAGE_NAMES[triage]
+
+        scenarios = []
+        for i in range(num_scenarios):
+            start, end = offsets[i], offsets[i + 1]
+            ids, initial_health = _casualty_template(int(counts[i]))
+            columns = {
+                'id': ids,
+                'lat': lats[start:end],
+                'lon': lons[start:end],
+                'triage': triage[start:end],
+                'initial_health': initial_health,
+            }
+            casualties = to_records({**columns, 'triage': triage_names[start:end]})
+
+            scenarios.append({
+                'incident_location': incidents[i].tolist(),
+                'casualties': casualties,
+                'ambulance_config': {
+                    'manual': False,
+                    'ambulances_per_hospital': ambulances_per_hospital,
+                    'ambulances_per_hospital_variation': ambulances_per_hospital_variation,
+                    'field_ambulances': field_ambulances,
+                    'field_ambulance_radius_km': field_ambulance_radius_km,
+                    'seed': seeds[i]
+                },
+                'hospitals': self.hospitals,
+                'hospital_set': self.hospital_set,
+                'timestamp': 0,
+                'num_casualties': int(counts[i])
+            })
+
+        return scenarios
+
     def _generate_casualties(self, num_casualties: int, center_lat: float, center_lon: float, radius_km: float = 0.5) -> List[Dict]:
         """
         Generate casualties clustered around incident location using Gaussian distribution.
@@ -153,8 +351,33 @@ class ScenarioGenerator:
         Returns:
             List of casualty dictionaries
         """
-        casualties = []
+        columns = self.generate_casualty_columns(num_casualties, center_lat, center_lon, radius_km)
+        columns['triage'] = TRIAGE_NAMES[columns['triage']]  # Names only at the record boundary
+        return to_records(columns)
 
+    def generate_casualty_columns(
+        self,
+        num_casualties: int,
+        center_lat: float,
+        center_lon: float,
+        radius_km: float = 0.5,
+        triage_uniforms: Optional[np.ndarray] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        Generate casualties as columns (one array per field) instead of records.
+
+        Args:
+            num_casualties: Number of casualties to generate
+            center_lat: Incident center latitude
+            center_lon: Incident center longitude
+            radius_km: Approximate radius of casualty distribution (standard deviation)
+            triage_uniforms: Optional pre-drawn uniforms in [0, 1), one per casualty,
+                to assign triage from (drawn from the scenario RNG if None)
+
+        Returns:
+            Dict with 'id', 'lat', 'lon', 'triage' (Triage codes) and 'initial_health' arrays
+            ('id' and 'initial_health' are read-only arrays shared between calls)
+        """
         # Standard deviation for Gaussian distribution
         # Using approximate conversion: 1 degree latitude ≈ 111 km
         # radius_km is treated as sigma (standard deviation)
@@ -162,28 +385,39 @@ class ScenarioGenerator:
         sigma_lon = radius_km / 111.0
 
         # Generate triage levels for all casualties
-        triage_assignments = self.rng.choice(
-            self.triage_levels,
-            size=num_casualties,
-            p=self.triage_probabilities
+        if triage_uniforms is None:
+            triage_uniforms = self.rng.random(num_casualties)
+        triage_assignments = self._triage_from_uniforms(triage_uniforms)
+
+        # Generate all positions using Gaussian distribution around incident in one call
+        # (row-major (lat, lon) pairs consume the stream in the same order as per-casualty draws)
+        positions = self.rng.normal(
+            loc=[center_lat, center_lon],
+            scale=[sigma_lat, sigma_lon],
+            size=(num_casualties, 2)
         )
 
-        for i in range(num_casualties):
-            # Generate position using Gaussian distribution around incident
-            casualty_lat = self.rng.normal(center_lat, sigma_lat)
-            casualty_lon = self.rng.normal(center_lon, sigma_lon)
-
-            casualty = {
-                'id': i,
-                'lat': casualty_lat,
-                'lon': casualty_lon,
-                'triage': triage_assignments[i],
-                'initial_health': 1.0,  # All start at full health
-            }
+        # One transposed copy gives contiguous lat/lon columns (not strided views)
+        lats, lons = positions.T.copy()
 
-            casualties.append(casualty)
+        ids, initial_health = _casualty_template(num_casualties)
 
-        return casualties
+        return {
+            'id': ids,
+            'lat': lats,
+            'lon': lons,
+            'triage': triage_assignments,
+            'initial_health': initial_health,  # Read-only, shared per casualty count
+        }
+
+    def _triage_from_uniforms(self, uniforms: np.ndarray) -> np.ndarray:
+        """
+        Map uniforms in [0, 1) to triage codes with the START probabilities.
+
+        Same inverse-CDF lookup rng.choice(p=...) applies to its own uniform
+        draws, so the result matches it without re-validating the probabilities.
+        """
+        return self.triage_codes[np.searchsorted(self._triage_cdf, uniforms, side='right')]
 
     def spawn_ambulances(
         self,
@@ -210,87 +444,330 @@ class ScenarioGenerator:
         Returns:
             List of ambulance dictionaries with 'base_hospital_id' field
         """
-        # Create RNG with config seed for reproducibility
-        rng = np.random.default_rng(ambulance_config['seed'])
+        return to_records(self.spawn_ambulance_columns(incident_location, ambulance_config, hospitals))
+
+    def spawn_ambulance_columns(
+        self,
+        incident_location: List[float],
+        ambulance_config: Dict,
+        hospitals: List[Dict]
+    ) -> Dict[str, np.ndarray]:
+        """
+        Spawn ambulances as columns (one array per field) instead of records.
+
+        Args:
+            incident_location: [lat, lon] of incident
+            ambulance_config: Configuration dict (see spawn_ambulances)
+            hospitals: List of hospital dictionaries
 
-        ambulances = []
-        ambulance_id = 0
+        Returns:
+            Dict with 'id', 'lat', 'lon', 'status', 'base_hospital_id' and 'type' arrays
+        """
+        # RNG positioned at the start of the config seed's stream for reproducibility
+        rng = self._seeded_rng(ambulance_config['seed'])
 
         incident_lat, incident_lon = incident_location
 
         # 1. Generate hospital-based ambulances
+        # Counts are drawn per hospital in order so the RNG stream matches earlier releases
+        counts = []
         for hospital in hospitals:
             # Calculate number of ambulances for this hospital with variation
             variation_range = ambulance_config['ambulances_per_hospital_variation']
             if variation_range > 0:
                 variation = rng.integers(-variation_range, variation_range + 1)
-                num_hospital_ambulances = max(0, ambulance_config['ambulances_per_hospital'] + variation)
+                counts.append(max(0, ambulance_config['ambulances_per_hospital'] + variation))
             else:
-                num_hospital_ambulances = ambulance_config['ambulances_per_hospital']
-
-            # Create ambulances stationed at this hospital
-            for _ in range(num_hospital_ambulances):
-                ambulance = {
-                    'id': ambulance_id,
-                    'lat': hospital['lat'],
-                    'lon': hospital['lon'],
-                    'status': 'IDLE',
-                    'base_hospital_id': hospital['id'],
-                    'type': 'HOSPITAL_BASED'
-                }
-                ambulances.append(ambulance)
-                ambulance_id += 1
+                counts.append(ambulance_config['ambulances_per_hospital'])
+
+        # Ambulances are stationed at their hospital
+        hospital_lats = np.array([h['lat'] for h in hospitals], dtype=np.float64)
+        hospital_lons = np.array([h['lon'] for h in hospitals], dtype=np.float64)
+        hospital_ids = np.empty(len(hospitals), dtype=object)
+        hospital_ids[:] = [h['id'] for h in hospitals]
+
+        counts = np.array(counts, dtype=np.int64)
+        num_hospital_ambulances = int(counts.sum())
 
         # 2. Generate field ambulances (first responders near incident)
         # Convert km radius to degrees (approximately 1 degree ≈ 111 km)
         radius_deg = ambulance_config['field_ambulance_radius_km'] / 111.0
 
-        for _ in range(ambulance_config['field_ambulances']):
-            # Generate random position within radius using uniform distribution in polar coordinates
-            # Use sqrt for uniform spatial distribution (avoids clustering at center)
-            r = radius_deg * np.sqrt(rng.uniform(0, 1))
-            theta = rng.uniform(0, 2 * np.pi)
-
-            ambulance_lat = incident_lat + r * np.cos(theta)
-            ambulance_lon = incident_lon + r * np.sin(theta)
-
-            ambulance = {
-                'id': ambulance_id,
-                'lat': ambulance_lat,
-                'lon': ambulance_lon,
-                'status': 'IDLE',
-                'base_hospital_id': None,
-                'type': 'FIELD_UNIT'
-            }
-            ambulances.append(ambulance)
-            ambulance_id += 1
+        num_field = ambulance_config['field_ambulances']
+
+        # Generate random positions within radius using uniform distribution in polar coordinates
+        # (one (u, theta) row per unit, drawn in the same stream order as per-unit calls)
+        polar = rng.uniform([0, 0], [1, 2 * np.pi], size=(num_field, 2))
+
+        # Use sqrt for uniform spatial distribution (avoids clustering at center)
+        r = radius_deg * np.sqrt(polar[:, 0])
+        theta = polar[:, 1]
+
+        field_lats = incident_lat + r * np.cos(theta)
+        field_lons = incident_lon + r * np.sin(theta)
+
+        num_ambulances = num_hospital_ambulances + num_field
 
-        return ambulances
+        base_hospital_ids = np.full(num_ambulances, None, dtype=object)
+        base_hospital_ids[:num_hospital_ambulances] = np.repeat(hospital_ids, counts)
 
-    def save_scenario(self, scenario: Dict, filename: str) -> None:
+        ambulance_types = np.full(num_ambulances, 'FIELD_UNIT', dtype=object)
+        ambulance_types[:num_hospital_ambulances] = 'HOSPITAL_BASED'
+
+        return {
+            'id': np.arange(num_ambulances),
+            'lat': np.concatenate([np.repeat(hospital_lats, counts), field_lats]),
+            'lon': np.concatenate([np.repeat(hospital_lons, counts), field_lons]),
+            'status': np.full(num_ambulances, 'IDLE', dtype=object),
+            'base_hospital_id': base_hospital_ids,
+            'type': ambulance_types
+        }
+
+    def _seeded_rng(self, seed: Optional[int]) -> np.random.Generator:
+        """
+        Get a generator at the start of the stream for the given seed.
+
+        Equivalent to np.random.default_rng(seed), but repeated seeds restore a
+        cached initial state instead of re-running the seeding sequence.
+        The returned generator is reused per thread and only valid until the
+        next call from the same thread.
+
+        Args:
+            seed: Seed value (None for fresh OS entropy, never cached)
+
+        Returns:
+            NumPy random generator
+        """
+        if seed is None:
+            return np.random.default_rng()
+
+        state = self._rng_cache.get(seed)
+        if state is None:
+            state = np.random.default_rng(seed).bit_generator.state
+            with self._rng_cache_lock:
+                if len(self._rng_cache) >= RNG_CACHE_SIZE:
+                    self._rng_cache.pop(next(iter(self._rng_cache)))  # Evict oldest
+                self._rng_cache[seed] = state
+
+        rng = getattr(self._thread_local, 'rng', None)
+        if rng is None:
+            rng = self._thread_local.rng = np.random.default_rng()
+
+        rng.bit_generator.state = state
+        return rng
+
+    @functools.cached_property
+    def hospital_index(self):
+        """Spatial index for nearest-hospital lookups, built on first use (None without hospitals)."""
+        return build_hospital_index(self.hospitals) if self.hospitals else None
+
+    def nearest_hospital(self, lat: float, lon: float) -> Tuple[Dict, float]:
+        """
+        Find the hospital closest to a point.
+
+        Args:
+            lat: Latitude of the point in degrees
+            lon: Longitude of the point in degrees
+
+        Returns:
+            (hospital dict, distance in km)
+        """
+        if self.hospital_index is None:
+            raise ValueError("Hospital list is empty")
+
+        hospital_idx, distance_km = nearest_hospital(self.hospital_index, lat, lon)
+        return self.hospitals[hospital_idx], distance_km
+
+    def save_scenario(
+        self,
+        scenario: Dict,
+        filename: str,
+        include_hospitals: bool = True,
+        indent: bool = False
+    ) -> None:
         """
         Save scenario to JSON file.
 
         Args:
             scenario: Scenario dictionary from generate_scenario()
-            filename: Output filename (e.g., 'scenario_001.json')
+            filename: Output filename (e.g., 'scenario_001.json'); a '.json.zst' or
+                      '.json.gz' name writes a compressed file
+            include_hospitals: If False, store only the 'hospital_set' key; the
+                               file can then only be loaded with load_scenario()
+                               in a process where that hospital set is registered
+            indent: Pretty-print with 2-space indentation for files meant to be read
+                    by people (default compact, which is smaller and faster to write)
         """
-        with open(filename, 'w') as f:
-            json.dump(scenario, f, indent=2)
+        dump_json(self._scenario_for_saving(scenario, include_hospitals), filename, indent=indent)
 
-    def load_scenario(self, filename: str) -> Dict:
+    @staticmethod
+    def _scenario_for_saving(scenario: Dict, include_hospitals: bool) -> Dict:
+        """
+        Drop the embedded hospital list if requested and the scenario can
+        reference it. Lazy casualty records are materialized as a list.
+        """
+        skip = set()
+        if not include_hospitals and 'hospital_set' in scenario:
+            skip.add('hospitals')
+        saved = {key: value for key, value in scenario.items() if key not in skip}
+        if isinstance(saved['casualties'], CasualtyRecords):
+            saved['casualties'] = saved['casualties'].to_list()
+        return saved
+
+    @staticmethod
+    def load_scenario(filename: str) -> Dict:
         """
         Load scenario from JSON file.
 
         Args:
-            filename: Input filename
+            filename: Input filename (compressed '.json.zst'/'.json.gz' files are
+                      decompressed)
 
         Returns:
             Scenario dictionary
         """
-        with open(filename, 'r') as f:
-            scenario = json.load(f)
-        return scenario
+        return _attach_hospitals(load_json(filename))
+
+    def save_scenario_npz(self, scenario: Dict, filename: str, include_hospitals: bool = True) -> None:
+        """
+        Save scenario to a compressed binary NumPy archive.
+
+        Casualties are stored as packed columns; everything else (hospitals,
+        ambulance config, ...) goes into a JSON metadata string. Much smaller
+        and faster to load than JSON for large casualty counts.
+
+        Args:
+            scenario: Scenario dictionary from generate_scenario()
+            filename: Output filename (e.g., 'scenario_001.npz')
+            include_hospitals: If False, store only the 'hospital_set' key (see save_scenario)
+        """
+        scenario = self._scenario_for_saving(scenario, include_hospitals)
+        casualties = scenario['casualties']
+        meta = {key: value for key, value in scenario.items() if key not in ('casualties', 'incident_location')}
+
+        np.savez_compressed(
+            filename,
+            id=np.array([c['id'] for c in casualties], dtype=np.int64),
+            lat=np.array([c['lat'] for c in casualties], dtype=np.float64),
+            lon=np.array([c['lon'] for c in casualties], dtype=np.float64),
+            triage=np.array([Triage[c['triage']] for c in casualties], dtype=np.int8),
+            initial_health=np.array([c['initial_health'] for c in casualties], dtype=np.float64),
+            incident_location=np.asarray(scenario['incident_location'], dtype=np.float64),
+            meta=np.array(dumps(meta).decode('utf-8'))
+        )
+
+    @staticmethod
+    def load_scenario_npz(filename: str) -> Dict:
+        """
+        Load scenario saved by save_scenario_npz().
+
+        Args:
+            filename: Input filename
+
+        Returns:
+            Scenario dictionary (same structure as load_scenario())
+        """
+        with np.load(filename, allow_pickle=False) as archive:
+            scenario = loads(archive['meta'].item())
+            scenario['incident_location'] = archive['incident_location'].tolist()
+            columns = {key: archive[key] for key in ('id', 'lat', 'lon', 'triage', 'initial_health')}
+            columns['triage'] = TRIAGE_NAMES[columns['triage']]
+            scenario['casualties'] = to_records(columns)
+
+        return _attach_hospitals(scenario)
+
+
+def _casualty_arrays_from_columns(columns: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Structure-of-arrays casualty view of casualty columns (see casualty_arrays)."""
+    return {
+        'lat': columns['lat'].astype(np.float32),
+        'lon': columns['lon'].astype(np.float32),
+        'triage': columns['triage'].astype(np.int8, copy=False),
+        'health': columns['initial_health'].astype(np.float32),
+    }
+
+
+def casualty_arrays(scenario: Dict) -> Dict[str, np.ndarray]:
+    """
+    Get a scenario's casualties as arrays (structure of arrays).
+
+    Built on demand rather than stored on the scenario, so scenario dicts
+    stay JSON-serializable. Lazy casualty records (CasualtyRecords) are
+    converted from their columns; plain records are read field by field.
+
+    Args:
+        scenario: Scenario dictionary
+
+    Returns:
+        Dict with 'lat', 'lon', 'health' (float32) and 'triage' (int8 Triage
+        codes) arrays, one entry per casualty. float32 keeps coordinates to
+        well under a metre; the records keep full float64 precision.
+    """
+    casualties = scenario['casualties']
+    if isinstance(casualties, CasualtyRecords):
+        return _casualty_arrays_from_columns(casualties.columns)
+
+    return {
+        'lat': np.array([c['lat'] for c in casualties], dtype=np.float32),
+        'lon': np.array([c['lon'] for c in casualties], dtype=np.float32),
+        'triage': np.array([TRIAGE_CODES[c['triage']] for c in casualties], dtype=np.int8),
+        'health': np.array([c.get('initial_health', 1.0) for c in casualties], dtype=np.float32),
+    }
+
+
+def to_records(columns: Dict[str, np.ndarray]) -> List[Dict]:
+    """
+    Convert column arrays into a list of per-entity dicts (e.g. for JSON).
+
+    Args:
+        columns: Dict mapping field name to an array with one entry per entity
+
+    Returns:
+        List of dicts with native Python values, one per entity
+    """
+    keys = list(columns)
+    values = [np.asarray(column).tolist() for column in columns.values()]
+    return [dict(zip(keys, row)) for row in zip(*values)]
+
+
+class CasualtyRecords(Sequence):
+    """
+    Read-only sequence of casualty dicts backed by casualty columns.
+
+    Behaves like the list of casualty records from generate_scenario(), but
+    each dict is only built when accessed. Consumers that can read arrays use
+    the columns directly and skip the dicts entirely.
+
+    Attributes:
+        columns: Dict with 'id', 'lat', 'lon', 'triage' (Triage codes) and 'initial_health' arrays
+    """
+
+    def __init__(self, columns: Dict[str, np.ndarray]):
+        self.columns = columns
+
+    def __len__(self) -> int:
+        return len(self.columns['id'])
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Dict, List[Dict]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        columns = self.columns
+        return {
+            'id': columns['id'][index].item(),
+            'lat': columns['lat'][index].item(),
+            'lon': columns['lon'][index].item(),
+            'triage': str(TRIAGE_NAMES[columns['triage'][index]]),
+            'initial_health': columns['initial_health'][index].item(),
+        }
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (CasualtyRecords, list)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def to_list(self) -> List[Dict]:
+        """Materialize every casualty dict (e.g. for JSON)."""
+        return to_records({**self.columns, 'triage': TRIAGE_NAMES[self.columns['triage']]})
 
 
 def calculate_region_bounds(hospitals: List[Dict], padding: float = 0.1) -> Tuple[float, float, float, float]:
@@ -307,13 +784,14 @@ def calculate_region_bounds(hospitals: List[Dict], padding: float = 0.1) -> Tupl
     if not hospitals:
         raise ValueError("Hospital list is empty")
 
-    lats = [h['lat'] for h in hospitals]
-    lons = [h['lon'] for h in hospitals]
-
-    min_lat = min(lats) - padding
-    max_lat = max(lats) + padding
-    min_lon = min(lons) - padding
-    max_lon = max(lons) + padding
+    # Fill one (H, 2) buffer directly (no intermediate list of tuples)
+    coords = np.fromiter(
+        (value for h in hospitals for value in (h['lat'], h['lon'])),
+        dtype=np.float64,
+        count=2 * len(hospitals)
+    ).reshape(-1, 2)
+    min_lat, min_lon = (coords.min(axis=0) - padding).tolist()
+    max_lat, max_lon = (coords.max(axis=0) + padding).tolist()
 
     return (min_lat, max_lat, min_lon, max_lon)
 
@@ -348,7 +826,7 @@ if __name__ == '__main__':
 
     for i in range(10):
         scenario = generator.generate_scenario(
-            num_casualties=np.random.randint(50, 81),
+            num_casualties=generator.rng.integers(50, 80, endpoint=True),
             ambulances_per_hospital=2,
             ambulances_per_hospital_variation=1,
             field_ambulances=3,
@@ -385,15 +863,40 @@ if __name__ == '__main__':
         field_ambulance_radius_km=10.0,
         seed=123
     )
-    generator.save_scenario(test_scenario, 'test_scenario.json')
+    generator.save_scenario(test_scenario, 'test_scenario.json', indent=True)
     loaded_scenario = generator.load_scenario('test_scenario.json')
 
     assert test_scenario['num_casualties'] == loaded_scenario['num_casualties']
     assert test_scenario['ambulance_config'] == loaded_scenario['ambulance_config']
     assert len(test_scenario['casualties']) == len(loaded_scenario['casualties'])
     print("   Save/load test: PASS")
+
+    generator.save_scenario_npz(test_scenario, 'test_scenario.npz')
+    loaded_npz = generator.load_scenario_npz('test_scenario.npz')
+    assert loaded_npz['casualties'] == loaded_scenario['casualties']
+    assert loaded_npz['hospitals'] == loaded_scenario['hospitals']
+    assert loaded_npz['incident_location'] == loaded_scenario['incident_location']
+    print("   NPZ save/load test: PASS")
+
+    generator.save_scenario(test_scenario, 'test_scenario.json', include_hospitals=False)
+    loaded_ref = generator.load_scenario('test_scenario.json')
+    assert loaded_ref['hospitals'] is generator.hospitals
+    loaded_arrays = casualty_arrays(loaded_ref)
+    for key, column in casualty_arrays(test_scenario).items():
+        assert np.array_equal(loaded_arrays[key], column) and loaded_arrays[key].dtype == column.dtype
+    print(f"   Shared hospital set save/load test: PASS "
+          f"({os.path.getsize('test_scenario.json') / 1024:.1f} KB without embedded hospitals)")
     print(f"   Scenario JSON file size reduced (no ambulances stored)")
 
+    # Scenario bundles (run_simulation.py --dump-scenarios / --scenario-file)
+    from simulator.run_simulation import save_scenarios, load_scenarios
+    save_scenarios([test_scenario], 'test_scenario.json')
+    replayed = load_scenarios('test_scenario.json')[0]
+    assert set(replayed) == set(test_scenario) and replayed['casualties'] == test_scenario['casualties']
+    for key, column in casualty_arrays(test_scenario).items():
+        assert np.array_equal(casualty_arrays(replayed)[key], column)
+    print("   Scenario bundle dump/replay test: PASS")
+
     # Show sample scenario structure
     print("\n7. Sample scenario structure (lazy ambulance spawning):")
     print(f"   Incident location: {test_scenario['incident_location']}")
@@ -431,5 +934,30 @@ if __name__ == '__main__':
     assert spawned_ambulances[0] == spawned_ambulances_2[0]
     print("   Reproducibility test: PASS (same seed → same ambulances)")
 
+    # Test lazy casualty records
+    lazy_generator = ScenarioGenerator(hospitals, region_bounds, seed=7)
+    eager_generator = ScenarioGenerator(hospitals, region_bounds, seed=7)
+    lazy = lazy_generator.generate_scenario(num_casualties=40, seed=5, lazy_records=True)
+    eager = eager_generator.generate_scenario(num_casualties=40, seed=5)
+    assert isinstance(lazy['casualties'], CasualtyRecords)
+    assert lazy['casualties'] == eager['casualties'] and lazy['casualties'][-1] == eager['casualties'][-1]
+    lazy_arrays, eager_arrays = casualty_arrays(lazy), casualty_arrays(eager)
+    assert all(np.array_equal(lazy_arrays[key], eager_arrays[key]) for key in eager_arrays)
+    generator.save_scenario(lazy, 'test_scenario.json')
+    assert generator.load_scenario('test_scenario.json')['casualties'] == eager['casualties']
+    print("   Lazy casualty records test: PASS")
+
+    # Test batched scenario generation
+    print("\n9. Testing batched scenario generation...")
+    batch = generator.generate_scenarios_batch([55, 70, 62], field_ambulances=5, seeds=[0, 1, 2])
+    assert [s['num_casualties'] for s in batch] == [55, 70, 62]
+    assert [len(s['casualties']) for s in batch] == [55, 70, 62]
+    assert [s['ambulance_config']['seed'] for s in batch] == [0, 1, 2]
+    assert set(batch[0]) == set(test_scenario)
+    for s in batch:
+        spread = np.array([[c['lat'], c['lon']] for c in s['casualties']]) - s['incident_location']
+        assert np.abs(spread).max() < 0.1  # Casualties cluster around their own incident
+    print(f"   Batch of {len(batch)} scenarios: PASS")
+
     print("\n" + "=" * 60)
     print("✓ All tests passed!")
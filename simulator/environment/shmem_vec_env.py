@@ -0,0 +1,190 @@
+"""
+Shared-Memory Vectorized Environment
+
+SubprocVecEnv variant for Stable-Baselines3 whose worker processes write
+observations into shared memory instead of pickling them through pipes.
+"""
+
+import multiprocessing as mp
+from typing import Any, Callable, Dict, List, Optional
+
+import gymnasium as gym
+import numpy as np
+from gymnasium import spaces
+from stable_baselines3.common.vec_env import SubprocVecEnv, VecEnv
+from stable_baselines3.common.vec_env.base_vec_env import CloudpickleWrapper, VecEnvObs, VecEnvStepReturn
+from stable_baselines3.common.vec_env.patch_gym import _patch_env
+
+
+def _subspaces(observation_space: spaces.Space) -> Dict[Optional[str], spaces.Space]:
+    """Observation sub-spaces by key (a single None key for non-Dict spaces)."""
+    if isinstance(observation_space, spaces.Dict):
+        return dict(observation_space.spaces)
+    return {None: observation_space}
+
+
+def _shared_arrays(raw_buffers: Dict, observation_space: spaces.Space, num_envs: int) -> Dict:
+    """NumPy views (num_envs, *shape) onto the shared observation buffers."""
+    return {
+        key: np.frombuffer(raw_buffers[key], dtype=space.dtype).reshape((num_envs, *space.shape))
+        for key, space in _subspaces(observation_space).items()
+    }
+
+
+def _worker(
+    remote,
+    parent_remote,
+    env_fn_wrapper: CloudpickleWrapper,
+    raw_buffers: Dict,
+    observation_space: spaces.Space,
+    num_envs: int,
+    index: int
+) -> None:
+    """Worker loop of SubprocVecEnv, with observations written to row `index` of the shared arrays."""
+    # Import here to avoid a circular import
+    from stable_baselines3.common.env_util import is_wrapped
+
+    parent_remote.close()
+    env = _patch_env(env_fn_wrapper.var())
+    rows = {key: array[index] for key, array in _shared_arrays(raw_buffers, observation_space, num_envs).items()}
+
+    # MCIResponseEnv can write observations straight into the shared row;
+    # other environments are copied into it
+    in_place = isinstance(observation_space, spaces.Dict) and hasattr(env.unwrapped, '_observation_buffer')
+    if in_place:
+        env.unwrapped._observation_buffer = rows
+
+    def write(observation) -> None:
+        if in_place:
+            return
+        if None in rows:
+            observation = {None: observation}
+        for key, row in rows.items():
+            row[...] = observation[key]
+
+    reset_info: Optional[Dict[str, Any]] = {}
+    while True:
+        try:
+            cmd, data = remote.recv()
+            if cmd == "step":
+                observation, reward, terminated, truncated, info = env.step(data)
+                # convert to SB3 VecEnv api
+                done = terminated or truncated
+                info["TimeLimit.truncated"] = truncated and not terminated
+                if done:
+                    # save final observation where user can get it, then reset
+                    # (copied first when reset would overwrite it in place)
+                    if in_place:
+                        observation = {key: value.copy() for key, value in observation.items()}
+                    info["terminal_observation"] = observation
+                    observation, reset_info = env.reset()
+                write(observation)
+                remote.send((reward, done, info, reset_info))
+            elif cmd == "reset":
+                maybe_options = {"options": data[1]} if data[1] else {}
+                observation, reset_info = env.reset(seed=data[0], **maybe_options)
+                write(observation)
+                remote.send(reset_info)
+            elif cmd == "render":
+                remote.send(env.render())
+            elif cmd == "close":
+                env.close()
+                remote.close()
+                break
+            elif cmd == "get_spaces":
+                remote.send((env.observation_space, env.action_space))
+            elif cmd == "env_method":
+                method = env.get_wrapper_attr(data[0])
+                remote.send(method(*data[1], **data[2]))
+            elif cmd == "get_attr":
+                remote.send(env.get_wrapper_attr(data))
+            elif cmd == "has_attr":
+                try:
+                    env.get_wrapper_attr(data)
+                    remote.send(True)
+                except AttributeError:
+                    remote.send(False)
+            elif cmd == "set_attr":
+                remote.send(setattr(env, data[0], data[1]))
+            elif cmd == "is_wrapped":
+                remote.send(is_wrapped(env, data))
+            else:
+                raise NotImplementedError(f"`{cmd}` is not implemented in the worker")
+        except (EOFError, KeyboardInterrupt):
+            break
+
+
+class ShmemVecEnv(SubprocVecEnv):
+    """
+    SubprocVecEnv whose observations travel through shared memory.
+
+    One shared buffer per observation key holds every environment's row.
+    Workers write observations into their row and only send rewards, dones
+    and infos through the pipe, so the parent neither unpickles nor
+    re-stacks observation arrays each step. Returned observations are
+    copies, as SB3 keeps the previous observation while the next step runs.
+
+    Commands other than step/reset (get_attr, env_method, ...) behave as in
+    SubprocVecEnv.
+    """
+
+    def __init__(self, env_fns: List[Callable[[], gym.Env]], start_method: Optional[str] = None):
+        """
+        Start one worker process per environment.
+
+        Args:
+            env_fns: Environment constructors, one per worker
+            start_method: multiprocessing start method (default: forkserver
+                          where available, else spawn, as in SubprocVecEnv)
+        """
+        self.waiting = False
+        self.closed = False
+        num_envs = len(env_fns)
+
+        # Spaces are needed to size the shared buffers before any worker starts
+        probe_env = _patch_env(env_fns[0]())
+        observation_space, action_space = probe_env.observation_space, probe_env.action_space
+        probe_env.close()
+
+        if start_method is None:
+            start_method = "forkserver" if "forkserver" in mp.get_all_start_methods() else "spawn"
+        ctx = mp.get_context(start_method)
+
+        raw_buffers = {
+            key: ctx.RawArray('b', num_envs * int(np.prod(space.shape)) * np.dtype(space.dtype).itemsize)
+            for key, space in _subspaces(observation_space).items()
+        }
+        self._raw_buffers = raw_buffers  # Keeps the shared memory alive with the views below
+        self._observations = _shared_arrays(raw_buffers, observation_space, num_envs)
+
+        self.remotes, self.work_remotes = zip(*[ctx.Pipe() for _ in range(num_envs)])
+        self.processes = []
+        for index, (work_remote, remote, env_fn) in enumerate(zip(self.work_remotes, self.remotes, env_fns)):
+            args = (work_remote, remote, CloudpickleWrapper(env_fn), raw_buffers, observation_space, num_envs, index)
+            # daemon=True: if the main process crashes, we should not cause things to hang
+            process = ctx.Process(target=_worker, args=args, daemon=True)
+            process.start()
+            self.processes.append(process)
+            work_remote.close()
+
+        VecEnv.__init__(self, num_envs, observation_space, action_space)
+
+    def _copy_observations(self) -> VecEnvObs:
+        if None in self._observations:
+            return self._observations[None].copy()
+        return {key: array.copy() for key, array in self._observations.items()}
+
+    def step_wait(self) -> VecEnvStepReturn:
+        results = [remote.recv() for remote in self.remotes]
+        self.waiting = False
+        rewards, dones, infos, self.reset_infos = zip(*results)
+        return self._copy_observations(), np.stack(rewards), np.stack(dones), infos
+
+    def reset(self) -> VecEnvObs:
+        for env_idx, remote in enumerate(self.remotes):
+            remote.send(("reset", (self._seeds[env_idx], self._options[env_idx])))
+        self.reset_infos = [remote.recv() for remote in self.remotes]
+        # Seeds and options are only used once
+        self._reset_seeds()
+        self._reset_options()
+        return self._copy_observations()
@@ -0,0 +1,255 @@
+"""
+Vectorized MCI Environment
+
+Steps a batch of MCIResponseEnv episodes in lockstep behind a single
+gymnasium VectorEnv interface (VecMCIEnv) or Stable-Baselines3 VecEnv
+interface (BatchVecEnv).
+"""
+
+from copy import deepcopy
+from typing import Dict, List, Optional, Sequence, Tuple, Union, Any
+import sys
+import os
+
+import numpy as np
+from gymnasium import spaces
+from gymnasium.vector import VectorEnv, AutoresetMode
+from gymnasium.vector.utils import batch_space, create_empty_array
+from stable_baselines3.common.vec_env import DummyVecEnv
+from stable_baselines3.common.vec_env.base_vec_env import VecEnvObs, VecEnvStepReturn
+from stable_baselines3.common.vec_env.util import dict_to_obs
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from simulator.environment.mci_env import MCIResponseEnv
+
+
+class VecMCIEnv(VectorEnv):
+    """
+    Batch of MCI episodes stepped in lockstep.
+
+    Observations for all episodes live in stacked arrays with a leading batch
+    axis. Each sub-environment writes its observation straight into its own row,
+    so nothing is re-stacked per step and everything stays in NumPy until the
+    policy boundary.
+
+    Episodes reset automatically in the same step they end (as in
+    Stable-Baselines3): the returned row holds the first observation of the
+    next episode, and the last observation is in infos['final_obs'].
+
+    Attributes:
+        envs: Sub-environments, one per batch row
+        num_envs: Batch size
+    """
+
+    metadata = {'render_modes': [], 'autoreset_mode': AutoresetMode.SAME_STEP}
+
+    def __init__(self, num_envs: int, copy: bool = True, **env_kwargs):
+        """
+        Initialize the batch.
+
+        Args:
+            num_envs: Number of episodes stepped in lockstep
+            copy: Return copies of the batch observation arrays (set False to
+                  get the internal buffers, which are overwritten on the next step)
+            **env_kwargs: Keyword arguments passed to every MCIResponseEnv
+        """
+        self.envs = [MCIResponseEnv(**env_kwargs) for _ in range(num_envs)]
+        self.num_envs = num_envs
+        self.copy = copy
+
+        self.single_observation_space = self.envs[0].observation_space
+        self.single_action_space = self.envs[0].action_space
+        self.observation_space = batch_space(self.single_observation_space, num_envs)
+        self.action_space = batch_space(self.single_action_space, num_envs)
+
+        # Stacked observation buffers; sub-env i writes into row i
+        self._observations = create_empty_array(self.single_observation_space, n=num_envs, fn=np.zeros)
+        for i, env in enumerate(self.envs):
+            env._observation_buffer = {key: array[i] for key, array in self._observations.items()}
+
+        self._rewards = np.zeros(num_envs, dtype=np.float64)
+        self._terminations = np.zeros(num_envs, dtype=bool)
+        self._truncations = np.zeros(num_envs, dtype=bool)
+
+    def reset(
+        self,
+        *,
+        seed: Optional[Union[int, Sequence[Optional[int]]]] = None,
+        options: Optional[Dict[str, Any]] = None
+    ) -> Tuple[Dict[str, np.ndarray], Dict[str, Any]]:
+        """
+        Reset every episode in the batch.
+
+        Args:
+            seed: None, a base seed (episode i gets seed + i), or one seed per episode
+            options: Options passed to every sub-environment reset
+
+        Returns:
+            Batched observations and infos
+        """
+        if seed is None or isinstance(seed, int):
+            seeds: List[Optional[int]] = [
+                None if seed is None else seed + i for i in range(self.num_envs)
+            ]
+        else:
+            seeds = list(seed)
+            assert len(seeds) == self.num_envs, "Need one seed per environment"
+
+        self._terminations[:] = False
+        self._truncations[:] = False
+
+        infos: Dict[str, Any] = {}
+        for i, (env, env_seed) in enumerate(zip(self.envs, seeds)):
+            _, info = env.reset(seed=env_seed, options=options)
+            infos = self._add_info(infos, info, i)
+
+        return self._batch_observations(), infos
+
+    def step(
+        self,
+        actions: np.ndarray
+    ) -> Tuple[Dict[str, np.ndarray], np.ndarray, np.ndarray, np.ndarray, Dict[str, Any]]:
+        """
+        Step every episode in the batch with its row of actions.
+
+        Args:
+            actions: Array of shape (num_envs, 2 * max_ambulances)
+
+        Returns:
+            Batched observations, rewards, terminations, truncations and infos
+        """
+        actions = np.asarray(actions).reshape(self.num_envs, -1)
+
+        infos: Dict[str, Any] = {}
+        for i, env in enumerate(self.envs):
+            _, reward, terminated, truncated, info = env.step(actions[i])
+
+            self._rewards[i] = reward
+            self._terminations[i] = terminated
+            self._truncations[i] = truncated
+
+            if terminated or truncated:
+                final_obs = {key: array[i].copy() for key, array in self._observations.items()}
+                _, reset_info = env.reset()
+                info = dict(reset_info, final_obs=final_obs, final_info=info)
+
+            infos = self._add_info(infos, info, i)
+
+        return (
+            self._batch_observations(),
+            self._rewards.copy(),
+            self._terminations.copy(),
+            self._truncations.copy(),
+            infos
+        )
+
+    def _batch_observations(self) -> Dict[str, np.ndarray]:
+        return deepcopy(self._observations) if self.copy else self._observations
+
+    def close_extras(self, **kwargs) -> None:
+        for env in self.envs:
+            env.close()
+
+
+class BatchVecEnv(DummyVecEnv):
+    """
+    In-process Stable-Baselines3 VecEnv with observations batched in place.
+
+    As in VecMCIEnv, each MCIResponseEnv writes its observation straight into
+    its row of the stacked (num_envs, ...) arrays, so DummyVecEnv's per-step
+    copy of every observation into the batch is skipped. Infos are returned
+    as-is rather than deep-copied, since MCIResponseEnv builds fresh ones each
+    step; terminal observations are copied before the reset overwrites them.
+    Other environments are batched exactly as by DummyVecEnv.
+    """
+
+    def __init__(self, env_fns):
+        super().__init__(env_fns)
+        self._in_place = [
+            isinstance(env.observation_space, spaces.Dict) and hasattr(env.unwrapped, '_observation_buffer')
+            for env in self.envs
+        ]
+        for i, env in enumerate(self.envs):
+            if self._in_place[i]:
+                env.unwrapped._observation_buffer = {key: array[i] for key, array in self.buf_obs.items()}
+
+    def step_wait(self) -> VecEnvStepReturn:
+        for env_idx, env in enumerate(self.envs):
+            obs, self.buf_rews[env_idx], terminated, truncated, info = env.step(self.actions[env_idx])
+            # convert to SB3 VecEnv api
+            self.buf_dones[env_idx] = terminated or truncated
+            info["TimeLimit.truncated"] = truncated and not terminated
+
+            if self.buf_dones[env_idx]:
+                # save final observation where user can get it, then reset
+                info["terminal_observation"] = deepcopy(obs)
+                obs, self.reset_infos[env_idx] = env.reset()
+            self.buf_infos[env_idx] = info
+            self._save_obs(env_idx, obs)
+        return self._obs_from_buf(), np.copy(self.buf_rews), np.copy(self.buf_dones), list(self.buf_infos)
+
+    def _save_obs(self, env_idx: int, obs: VecEnvObs) -> None:
+        if not self._in_place[env_idx]:
+            super()._save_obs(env_idx, obs)
+
+    def _obs_from_buf(self) -> VecEnvObs:
+        return dict_to_obs(self.observation_space, {key: array.copy() for key, array in self.buf_obs.items()})
+
+
+if __name__ == '__main__':
+    print("Testing VecMCIEnv...")
+    print("=" * 60)
+
+    vec_env = VecMCIEnv(num_envs=4, region='CA', max_hospitals=20)
+    print(f"\nBatched observation space: {vec_env.observation_space['casualties']}")
+    print(f"Batched action space: {vec_env.action_space.shape}")
+
+    obs, infos = vec_env.reset(seed=42)
+    print(f"Casualties per episode: {infos['num_casualties']}")
+
+    for step_num in range(10):
+        obs, rewards, terminations, truncations, infos = vec_env.step(vec_env.action_space.sample())
+
+    print(f"Rewards after 10 steps: {rewards}")
+
+    # Rows must match a standalone environment stepped with the same seed and actions
+    single_env = MCIResponseEnv(region='CA', max_hospitals=20)
+    vec_env.envs[0].reset(seed=100)
+    single_env.reset(seed=100)
+
+    actions = vec_env.action_space.sample()
+    obs, rewards, _, _, _ = vec_env.step(actions)
+    single_obs, single_reward, _, _, _ = single_env.step(actions[0])
+
+    if all(np.array_equal(obs[key][0], single_obs[key]) for key in obs) and rewards[0] == single_reward:
+        print("✓ PASS: Batched rows match a standalone environment")
+    else:
+        print("✗ FAIL: Batched rows diverged from a standalone environment")
+
+    vec_env.close()
+
+    # BatchVecEnv must batch exactly as DummyVecEnv does
+    make_env = lambda: MCIResponseEnv(region='CA', max_hospitals=20)
+    batch_env, dummy_env = BatchVecEnv([make_env] * 2), DummyVecEnv([make_env] * 2)
+    batch_env.seed(7)
+    dummy_env.seed(7)
+    batch_obs, dummy_obs = batch_env.reset(), dummy_env.reset()
+    matches = all(np.array_equal(batch_obs[key], dummy_obs[key]) for key in batch_obs)
+    for step_num in range(10):
+        actions = np.stack([batch_env.action_space.sample() for _ in range(2)])
+        batch_obs, batch_rewards, _, _ = batch_env.step(actions)
+        dummy_obs, dummy_rewards, _, _ = dummy_env.step(actions)
+        matches &= all(np.array_equal(batch_obs[key], dummy_obs[key]) for key in batch_obs)
+        matches &= np.array_equal(batch_rewards, dummy_rewards)
+
+    if matches:
+        print("✓ PASS: BatchVecEnv matches DummyVecEnv")
+    else:
+        print("✗ FAIL: BatchVecEnv diverged from DummyVecEnv")
+
+    batch_env.close()
+    dummy_env.close()
+
+    print("\n" + "=" * 60)
+    print("✓ Vectorized environment test completed!")
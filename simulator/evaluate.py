@@ -6,13 +6,16 @@ Evaluate trained PPO agents and baseline policies on test scenarios.
 """
 
 import argparse
-import json
+import functools
 import os
+import pickle
 import sys
 import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 import numpy as np
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -20,6 +23,9 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import torch
 from stable_baselines3 import PPO
 from simulator.environment.mci_env import MCIResponseEnv
+from simulator.environment.vec_env import VecMCIEnv
+from simulator.train import vecnormalize_path
+from simulator.utils.json_utils import dumps
 from simulator.agents.baselines import (
     random_policy,
     nearest_hospital_policy,
@@ -28,27 +34,196 @@ from simulator.agents.baselines import (
     load_balancing_policy,
 )
 
+try:
+    import msgpack
+except ImportError:  # Optional dependency (only needed for .msgpack output)
+    msgpack = None
+
+try:
+    import intel_extension_for_pytorch as ipex
+except ImportError:  # Optional dependency (only used for CPU inference)
+    ipex = None
+
+# One row per 30-step progress window of a PPO evaluation episode
+TELEMETRY_WINDOW = 30
+TELEMETRY_DTYPE = np.dtype([
+    ("step", np.int32),
+    ("sim_time", np.int32),
+    ("waiting", np.int16),
+    ("deaths", np.int16),
+    ("inference_ms", np.float32),
+    ("step_ms", np.float32),
+    ("max_inference_ms", np.float32),
+    ("max_step_ms", np.float32),
+])
+
+
+class ResultsWriter:
+    """
+    Stream evaluation results to a JSON file as episodes complete.
+
+    Produces the same document as dumping {**header, "results": {...}} at the
+    end, without holding every episode in memory, and keeps finished episodes
+    on disk if a run is interrupted.
+    """
+
+    def __init__(self, filename: str, header: Dict):
+        Path(filename).parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(filename, "wb")
+        self._file.write(dumps(header)[:-1] + b', "results": {')
+        self._policy = None
+        self._num_policies = 0
+        self._num_records = 0
+
+    def _start_policy(self, policy_name: str) -> None:
+        if self._num_policies:
+            self._file.write(b",")
+        self._file.write(b"\n" + dumps(policy_name) + b': {"episodes": [')
+        self._policy = policy_name
+        self._num_policies += 1
+        self._num_records = 0
+
+    def write_record(self, policy_name: str, record: Dict) -> None:
+        """Append one episode record to a policy's episode list"""
+        if policy_name != self._policy:
+            self._start_policy(policy_name)
+        self._file.write((b",\n" if self._num_records else b"\n") + dumps(record))
+        self._file.flush()
+        self._num_records += 1
+
+    def end_policy(self, policy_name: str, fields: Dict) -> None:
+        """Close a policy's episode list and add its summary fields (e.g. statistics)"""
+        if policy_name != self._policy:
+            self._start_policy(policy_name)
+        self._file.write(b"\n]")
+        for key, value in fields.items():
+            self._file.write(b", " + dumps(key) + b": " + dumps(value))
+        self._file.write(b"}")
+        self._file.flush()
+        self._policy = None
+
+    def close(self) -> None:
+        self._file.write(b"\n}}\n")
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class MsgpackResultsWriter(ResultsWriter):
+    """
+    Write evaluation results as a MessagePack document instead of JSON.
+
+    Same interface and document layout as ResultsWriter, in a smaller
+    binary encoding. MessagePack needs container sizes up front, so episodes
+    are collected in memory and the file is written on close().
+    """
+
+    def __init__(self, filename: str, header: Dict):
+        if msgpack is None:
+            raise ImportError("Writing .msgpack results requires msgpack (pip install msgpack)")
+        Path(filename).parent.mkdir(parents=True, exist_ok=True)
+        self._filename = filename
+        self._data = {**header, "results": {}}
+
+    def _policy_entry(self, policy_name: str) -> Dict:
+        return self._data["results"].setdefault(policy_name, {"episodes": []})
+
+    def write_record(self, policy_name: str, record: Dict) -> None:
+        """Append one episode record to a policy's episode list"""
+        self._policy_entry(policy_name)["episodes"].append(record)
+
+    def end_policy(self, policy_name: str, fields: Dict) -> None:
+        """Add a policy's summary fields (e.g. statistics)"""
+        self._policy_entry(policy_name).update(fields)
+
+    def close(self) -> None:
+        with open(self._filename, "wb") as f:
+            msgpack.pack(self._data, f, use_bin_type=True, default=_msgpack_default)
+
+
+def _msgpack_default(obj):
+    """Convert NumPy scalars and arrays for msgpack."""
+    if isinstance(obj, (np.generic, np.ndarray)):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not MessagePack serializable")
+
 
 def evaluate_ppo_model(
-    model_path: str, env: MCIResponseEnv, num_episodes: int, device: str = "cuda"
+    model_path: str,
+    env: MCIResponseEnv,
+    num_episodes: int,
+    device: str = "cuda",
+    json_writer: Optional[ResultsWriter] = None,
+    n_envs: int = 1,
+    rng: Optional[np.random.Generator] = None,
+    compile_policy: bool = False,
+    cuda_graphs: bool = False,
+    use_ipex: bool = False,
+    quantize: bool = False,
+    use_fp16: bool = False,
 ) -> List[Dict]:
-    """Evaluate PPO model on environment"""
+    """Evaluate PPO model on environment (n_envs > 1 batches inference across episodes)"""
     print(f"Loading PPO model from {model_path}...")
     load_start = time.time()
     model = PPO.load(model_path, device=device)
     load_time = time.time() - load_start
     print(f"✓ Model loaded in {load_time:.2f}s (device: {device})")
+
+    # Observation statistics saved with a model trained with --normalize
+    obs_normalizer = None
+    if os.path.exists(vecnormalize_path(model_path)):
+        with open(vecnormalize_path(model_path), "rb") as f:
+            obs_normalizer = pickle.load(f)
+        print(f"✓ Observation normalization loaded from {vecnormalize_path(model_path)}")
+
+    # Intel Extension for PyTorch: oneDNN kernels with bfloat16 weights for CPU
+    # inference (the predictor then runs under CPU bfloat16 autocast)
+    cpu_bf16 = use_ipex and device == "cpu"
+    if cpu_bf16:
+        model.policy = ipex.optimize(model.policy.eval(), dtype=torch.bfloat16)
+        print("✓ Policy optimized with Intel Extension for PyTorch (bfloat16)")
+
+    # Dynamic int8 quantization of the policy MLPs (weights stored as int8,
+    # activations quantized per batch) for CPU inference
+    if quantize:
+        model.policy = torch.ao.quantization.quantize_dynamic(
+            model.policy.eval(), {torch.nn.Linear}, dtype=torch.qint8
+        )
+        print("✓ Policy linear layers quantized to int8")
+
+    # Half-precision autocast for CUDA inference (off by default: it can change
+    # near-tied argmax actions, and with them the reported metrics)
+    cuda_fp16 = use_fp16 and device == "cuda"
+
+    if compile_policy:
+        compile_start = time.time()
+        compile_policy_inference(model, env, n_envs, cpu_bf16, cuda_fp16)
+        print(f"✓ Policy compiled in {time.time() - compile_start:.2f}s")
+
+    # Seeds the first reset only; later episodes continue the environment's own RNG
+    seed = int(rng.integers(0, 2**31)) if rng is not None else None
+
+    if n_envs > 1:
+        return evaluate_ppo_model_vectorized(
+            model, env, num_episodes, n_envs, json_writer, seed, cuda_graphs, cpu_bf16, obs_normalizer, cuda_fp16
+        )
     print("Evaluating PPO model...")
 
+    predict = make_policy_predictor(model, cuda_graphs, cpu_bf16, obs_normalizer, cuda_fp16)
+
     results = []
     total_steps = 0
-    total_inference_time = 0
+    total_inference_ns = 0
     total_episode_time = 0
 
     for episode in range(num_episodes):
         episode_start = time.time()
 
-        obs, info = env.reset()
+        obs, info = env.reset(seed=seed if episode == 0 else None)
         episode_reward = 0
         done = False
         truncated = False
@@ -59,61 +234,85 @@ def evaluate_ppo_model(
               f"{info.get('num_ambulances', 'N/A')} ambulances, "
               f"{info.get('num_hospitals', 'N/A')} hospitals")
 
+        # Progress is recorded per 30-step window and printed after the episode,
+        # keeping formatting and stdout writes out of the step loop. Each step's
+        # inference and environment step are timed; windows keep their averages
+        # and maxima
+        telemetry = np.empty(env.max_time_minutes // TELEMETRY_WINDOW + 1, dtype=TELEMETRY_DTYPE)
+        num_windows = 0
+        episode_inference_ns = 0
+        window_inference_ns = window_step_ns = 0
+        max_inference_ns = max_step_ns = 0
+        step_end = time.perf_counter_ns()
+
         while not (done or truncated):
-            # Time model inference
-            inference_start = time.time()
-            action, _states = model.predict(obs, deterministic=True)
-            inference_time = time.time() - inference_start
-            total_inference_time += inference_time
-
-            # Time environment step
-            step_start = time.time()
+            inference_start = step_end
+            action, _states = predict(obs)
+            inference_end = time.perf_counter_ns()
+
             obs, reward, done, truncated, info = env.step(action)
-            step_time = time.time() - step_start
+            step_end = time.perf_counter_ns()
+
+            inference_ns = inference_end - inference_start
+            step_ns = step_end - inference_end
+            window_inference_ns += inference_ns
+            window_step_ns += step_ns
+            max_inference_ns = max(max_inference_ns, inference_ns)
+            max_step_ns = max(max_step_ns, step_ns)
 
             episode_reward += reward
             step_count += 1
 
-            # Progress indicator every 30 steps
-            if step_count % 30 == 0:
-                sim_time = info.get('current_time', step_count)
-                metrics = info.get('metrics', {})
-                casualties_waiting = metrics.get('casualties_waiting', 0)
-                deaths = metrics.get('deaths', 0)
-
-                # Warning for slow operations
-                warning = ""
-                if inference_time > 0.5:  # > 500ms
-                    warning = " [SLOW INFERENCE]"
-                elif step_time > 1.0:  # > 1000ms
-                    warning = " [SLOW STEP]"
+            # Progress record every 30 steps
+            if step_count % TELEMETRY_WINDOW == 0:
+                if num_windows == len(telemetry):
+                    telemetry = np.concatenate([telemetry, np.empty_like(telemetry)])
 
-                print(f"    Step {step_count:3d} | Sim time: {sim_time:3d}min | "
-                      f"Waiting: {casualties_waiting:2d} | Deaths: {deaths:2d} | "
-                      f"Inference: {inference_time*1000:.1f}ms | Step: {step_time*1000:.1f}ms{warning}")
+                metrics = info.get('metrics', {})
+                telemetry[num_windows] = (
+                    step_count,
+                    info.get('current_time', step_count),
+                    metrics.get('casualties_waiting', 0),
+                    metrics.get('deaths', 0),
+                    window_inference_ns / TELEMETRY_WINDOW / 1e6,
+                    window_step_ns / TELEMETRY_WINDOW / 1e6,
+                    max_inference_ns / 1e6,
+                    max_step_ns / 1e6,
+                )
+                num_windows += 1
+
+                episode_inference_ns += window_inference_ns
+                window_inference_ns = window_step_ns = 0
+                max_inference_ns = max_step_ns = 0
+
+        episode_inference_ns += window_inference_ns
+        total_inference_ns += episode_inference_ns
+        print_episode_telemetry(telemetry[:num_windows])
+        total_inference_time = total_inference_ns / 1e9
 
         episode_time = time.time() - episode_start
         total_episode_time += episode_time
         total_steps += step_count
 
         metrics = info["metrics"]
-        results.append(
-            {
-                "episode": episode + 1,
-                "reward": float(episode_reward),
-                "deaths": metrics["deaths"],
-                "transported": metrics["transported"],
-                "avg_response_time": metrics["avg_response_time"],
-                "casualties_waiting": metrics["casualties_waiting"],
-                "num_steps": step_count,
-                "episode_time_sec": episode_time,
-            }
-        )
+        record = {
+            "episode": episode + 1,
+            "reward": episode_reward,
+            "deaths": metrics["deaths"],
+            "transported": metrics["transported"],
+            "avg_response_time": metrics["avg_response_time"],
+            "casualties_waiting": metrics["casualties_waiting"],
+            "num_steps": step_count,
+            "episode_time_sec": episode_time,
+        }
+        results.append(record)
+        if json_writer is not None:
+            json_writer.write_record("ppo", record)
 
         print(f"    ✓ Episode {episode + 1} completed in {episode_time:.2f}s ({step_count} steps)")
         print(f"      Deaths: {metrics['deaths']}, Transported: {metrics['transported']}, Reward: {episode_reward:.1f}")
         print(f"      Avg time per step: {episode_time/step_count*1000:.1f}ms "
-              f"(inference: {total_inference_time/step_count*1000:.1f}ms)")
+              f"(inference: {episode_inference_ns/step_count/1e6:.1f}ms)")
 
     # Summary statistics
     print(f"\n{'=' * 70}")
@@ -131,59 +330,366 @@ def evaluate_ppo_model(
     return results
 
 
-def evaluate_baseline_policy(
-    policy_func, policy_name: str, env: MCIResponseEnv, num_episodes: int
-) -> List[Dict]:
-    """Evaluate baseline policy through simulation engine"""
+@functools.lru_cache(maxsize=8)
+def get_evaluation_generator(region: str, max_hospitals: int):
+    """
+    Scenario generator for a region, built once and shared by every baseline.
+
+    Loading hospitals, computing region bounds and the generator's hospital
+    caches (coordinate arrays, spatial index) only depend on the region.
+    Callers reseed the generator's RNG before generating scenarios.
+    """
     from simulator.environment.hospital_loader import load_hospitals
     from simulator.environment.scenario_generator import (
         ScenarioGenerator,
         calculate_region_bounds,
     )
-    from simulator.simulation_engine import SimulationEngine
 
-    print(f"Evaluating {policy_name} policy...")
+    hospitals = load_hospitals(region=region)
+    if len(hospitals) > max_hospitals:
+        hospitals = hospitals[:max_hospitals]
+
+    return ScenarioGenerator(hospitals, calculate_region_bounds(hospitals))
+
+
+def print_episode_telemetry(telemetry: np.ndarray) -> None:
+    """Print an episode's progress windows (TELEMETRY_DTYPE rows) in one write."""
+    lines = []
+    for step, sim_time, waiting, deaths, inference_ms, step_ms, max_inference_ms, max_step_ms in telemetry.tolist():
+        # Warning for slow operations (slowest single step in the window)
+        warning = ""
+        if max_inference_ms > 500:
+            warning = " [SLOW INFERENCE]"
+        elif max_step_ms > 1000:
+            warning = " [SLOW STEP]"
+
+        lines.append(f"    Step {step:3d} | Sim time: {sim_time:3d}min | "
+                     f"Waiting: {waiting:2d} | Deaths: {deaths:2d} | "
+                     f"Inference: {inference_ms:.1f}ms | Step: {step_ms:.1f}ms{warning}")
+
+    if lines:
+        print("\n".join(lines))
+
+
+def make_policy_predictor(
+    model, cuda_graphs: bool = False, cpu_bf16: bool = False, obs_normalizer=None, cuda_fp16: bool = False
+):
+    """
+    Deterministic policy inference under inference_mode (fp32 unless autocast is requested).
+
+    Equivalent to model.predict(obs, deterministic=True) for this environment's
+    Box observations and MultiDiscrete actions, but observations are copied
+    into tensors allocated once per observation key (page-locked on CUDA, so
+    the host-to-device copy is asynchronous) instead of converting each step.
+    inference_mode skips the autograd version counters and view tracking that
+    no_grad still keeps. The forward pass runs in fp32 unless cuda_fp16 is
+    set (FP16 autocast on CUDA) or cpu_bf16 is set (bfloat16 on CPU, for a
+    policy prepared with ipex.optimize).
+
+    With cuda_graphs (CUDA only), the forward pass over the device
+    observation tensors is captured once as a CUDA graph and replayed every
+    step, one launch instead of one per kernel. That relies on every
+    observation having the same shape, which MCIResponseEnv's padding to
+    max_casualties/ambulances/hospitals guarantees; a new batch shape is
+    recaptured.
+
+    obs_normalizer (a VecNormalize saved by train.py --normalize) scales
+    observations with the training statistics before inference.
+    """
+    use_cuda = model.device.type == "cuda"
+    cuda_graphs = cuda_graphs and use_cuda
+    if use_cuda:
+        autocast = dict(device_type="cuda", dtype=torch.float16, enabled=cuda_fp16)
+    else:
+        autocast = dict(device_type="cpu", dtype=torch.bfloat16, enabled=cpu_bf16)
+    graph_state = {"shapes": None, "graph": None, "actions": None}
+    obs_shapes = {key: space.shape for key, space in model.observation_space.spaces.items()}
+    buffers = {}  # key -> (host tensor, device tensor)
+    model.policy.set_training_mode(False)
+
+    def obs_to_device(obs: Dict[str, np.ndarray]) -> Tuple[Dict[str, torch.Tensor], bool]:
+        tensors = {}
+        vectorized = False
+        for key, value in obs.items():
+            host_value = torch.from_numpy(np.asarray(value))
+            if host_value.dim() == len(obs_shapes[key]):
+                host_value = host_value.unsqueeze(0)
+            else:
+                vectorized = True
+
+            if key not in buffers or buffers[key][0].shape != host_value.shape:
+                host = torch.empty(host_value.shape, dtype=host_value.dtype, pin_memory=use_cuda)
+                buffers[key] = (host, host.to(model.device) if use_cuda else host)
+            host, device_tensor = buffers[key]
+
+            host.copy_(host_value)
+            if use_cuda:
+                device_tensor.copy_(host, non_blocking=True)
+            tensors[key] = device_tensor
+        return tensors, vectorized
+
+    def run_policy(tensors: Dict[str, torch.Tensor]) -> torch.Tensor:
+        with torch.inference_mode(), torch.autocast(**autocast):
+            return model.policy._predict(tensors, deterministic=True)
+
+    def capture_graph(tensors: Dict[str, torch.Tensor]) -> None:
+        # Distribution argument checks synchronize with the host, which is not
+        # allowed during capture
+        torch.distributions.Distribution.set_default_validate_args(False)
+
+        # Warm up on a side stream before capturing, as CUDA graphs require
+        stream = torch.cuda.Stream()
+        stream.wait_stream(torch.cuda.current_stream())
+        with torch.cuda.stream(stream):
+            for _ in range(3):
+                run_policy(tensors)
+        torch.cuda.current_stream().wait_stream(stream)
+
+        graph = torch.cuda.CUDAGraph()
+        with torch.cuda.graph(graph):
+            graph_state["actions"] = run_policy(tensors)
+        graph_state["graph"] = graph
+
+    def predict(obs):
+        if obs_normalizer is not None:
+            obs = obs_normalizer.normalize_obs(obs)
+        tensors, vectorized = obs_to_device(obs)
+        if cuda_graphs:
+            shapes = tuple(tensor.shape for tensor in tensors.values())
+            if shapes != graph_state["shapes"]:
+                capture_graph(tensors)
+                graph_state["shapes"] = shapes
+            graph_state["graph"].replay()
+            actions = graph_state["actions"]
+        else:
+            actions = run_policy(tensors)
+        actions = actions.cpu().numpy().reshape((-1, *model.action_space.shape))
+        return (actions if vectorized else actions[0]), None
+
+    return predict
+
+
+def compile_policy_inference(
+    model, env: MCIResponseEnv, batch_size: int = 1, cpu_bf16: bool = False, cuda_fp16: bool = False
+) -> None:
+    """
+    torch.compile the policy's inference path and warm it up.
+
+    model.predict() calls policy._predict() rather than the module's forward(),
+    so the bound _predict is compiled (compiling the module would leave predict
+    eager). On CUDA, "reduce-overhead" mode replays the small MLP as a CUDA
+    graph instead of launching each op. The warm-up predict triggers
+    compilation for the evaluation batch size, so it is not counted in the
+    timed inference.
+    """
+    mode = "reduce-overhead" if model.device.type == "cuda" else "default"
+    model.policy._predict = torch.compile(model.policy._predict, mode=mode, fullgraph=False)
+
+    sample = env.observation_space.sample()
+    if batch_size > 1:
+        sample = {key: np.stack([value] * batch_size) for key, value in sample.items()}
+    make_policy_predictor(model, cpu_bf16=cpu_bf16, cuda_fp16=cuda_fp16)(sample)
+
+
+def evaluate_ppo_model_vectorized(
+    model,
+    env: MCIResponseEnv,
+    num_episodes: int,
+    n_envs: int,
+    json_writer: Optional[ResultsWriter] = None,
+    seed: Optional[int] = None,
+    cuda_graphs: bool = False,
+    cpu_bf16: bool = False,
+    obs_normalizer=None,
+    cuda_fp16: bool = False,
+) -> List[Dict]:
+    """
+    Evaluate PPO model on n_envs episodes stepped in lockstep.
+
+    One model.predict call covers every running episode, so inference runs as
+    a single batched forward pass per step. Each sub-environment runs a fixed
+    share of the episodes (as in SB3's evaluate_policy), so short episodes are
+    not over-represented in the results.
+    """
+    print(f"Evaluating PPO model ({n_envs} environments in lockstep)...")
+
+    predict = make_policy_predictor(model, cuda_graphs, cpu_bf16, obs_normalizer, cuda_fp16)
+
+    vec_env = VecMCIEnv(
+        num_envs=n_envs,
+        copy=False,
+        region=env.region,
+        max_casualties=env.max_casualties,
+        max_ambulances=env.max_ambulances,
+        max_hospitals=env.max_hospitals,
+        max_time_minutes=env.max_time_minutes,
+        num_casualties_range=env.num_casualties_range,
+        ambulances_per_hospital=env.ambulance_config["ambulances_per_hospital"],
+        ambulances_per_hospital_variation=env.ambulance_config["ambulances_per_hospital_variation"],
+        field_ambulances=env.ambulance_config["field_ambulances"],
+        field_ambulance_radius_km=env.ambulance_config["field_ambulance_radius_km"],
+    )
+
+    episode_targets = np.array([(num_episodes + i) // n_envs for i in range(n_envs)])
+    episode_counts = np.zeros(n_envs, dtype=np.int64)
+    episode_rewards = np.zeros(n_envs)
+    step_counts = np.zeros(n_envs, dtype=np.int64)
+    episode_starts = np.full(n_envs, time.time())
+
+    results = []
+    total_steps = 0
+    total_inference_ns = 0
+    eval_start = time.time()
+
+    obs, _ = vec_env.reset(seed=seed)
+
+    # Sub-environments that still owe episodes; per-step work stays in array ops and
+    # Python only runs per finished episode. Steps are counted when an episode ends
+    running = episode_counts < episode_targets
+    while running.any():
+        inference_start = time.perf_counter_ns()
+        actions, _states = predict(obs)
+        total_inference_ns += time.perf_counter_ns() - inference_start
+
+        obs, rewards, terminations, truncations, infos = vec_env.step(actions)
+
+        episode_rewards += rewards
+        step_counts += 1
+
+        for i in np.flatnonzero((terminations | truncations) & running):
+            # NumPy scalars are left as-is; both results writers encode them natively
+            metrics = {key: values[i] for key, values in infos["final_info"]["metrics"].items()}
+            episode_time = time.time() - episode_starts[i]
+            record = {
+                "episode": len(results) + 1,
+                "reward": episode_rewards[i],
+                "deaths": metrics["deaths"],
+                "transported": metrics["transported"],
+                "avg_response_time": metrics["avg_response_time"],
+                "casualties_waiting": metrics["casualties_waiting"],
+                "num_steps": step_counts[i],
+                "episode_time_sec": episode_time,
+            }
+            results.append(record)
+            if json_writer is not None:
+                json_writer.write_record("ppo", record)
+
+            print(f"  ✓ Episode {len(results)}/{num_episodes} (env {i}) completed in "
+                  f"{episode_time:.2f}s ({step_counts[i]} steps) | "
+                  f"Deaths: {record['deaths']}, Transported: {record['transported']}, "
+                  f"Reward: {episode_rewards[i]:.1f}")
+
+            total_steps += int(step_counts[i])
+            episode_counts[i] += 1
+            episode_rewards[i] = 0.0
+            step_counts[i] = 0
+            episode_starts[i] = time.time()
+
+        running = episode_counts < episode_targets
+
+    vec_env.close()
+    total_time = time.time() - eval_start
+    total_inference_time = total_inference_ns / 1e9
+
+    # Summary statistics
+    print(f"\n{'=' * 70}")
+    print("Performance Summary:")
+    print(f"  Total episodes: {num_episodes}")
+    print(f"  Parallel environments: {n_envs}")
+    print(f"  Total steps: {total_steps}")
+    print(f"  Total time: {total_time:.2f}s")
+    print(f"  Avg time per step: {total_time/max(total_steps, 1)*1000:.1f}ms")
+    print(f"  Model inference time: {total_inference_time:.2f}s ({total_inference_time/total_time*100:.1f}% of total)")
+    print("=" * 70)
+
+    return results
+
+
+def run_baseline_episode(
+    policy_func, scenario: Dict, max_time_minutes: int
+) -> Tuple[Dict, int, float]:
+    """
+    Run one baseline episode and return (metrics, num_ambulances, episode_time_sec).
 
-    hospitals = load_hospitals(region=env.region)
-    if len(hospitals) > env.max_hospitals:
-        hospitals = hospitals[: env.max_hospitals]
+    Thin wrapper over simulation_engine.simulate_episode() (same seeding and
+    pooled engine). Module-level so worker processes can run it; policy_func
+    must be picklable (the baselines are module-level functions).
+    """
+    from simulator.simulation_engine import pooled_engine, simulate_episode
 
-    region_bounds = calculate_region_bounds(hospitals)
-    generator = ScenarioGenerator(hospitals, region_bounds)
+    episode_start = time.time()
+    metrics = simulate_episode(policy_func, scenario, max_time_minutes)
+    episode_time = time.time() - episode_start
 
+    # simulate_episode() ran on this process's pooled engine for the policy
+    return metrics, len(pooled_engine(policy_func).ambulances), episode_time
+
+
+def generate_baseline_scenarios(
+    env: MCIResponseEnv,
+    num_episodes: int,
+    rng: Optional[np.random.Generator] = None,
+) -> List[Dict]:
+    """
+    Generate the test scenarios every baseline is evaluated on.
+
+    Built once and shared: the simulation engine does not modify scenarios,
+    so each baseline can run on the same list.
+    """
+    generator = get_evaluation_generator(env.region, env.max_hospitals)
+    generator.rng = rng if rng is not None else np.random.default_rng()
+
+    # Ambulance spawn seeds are the episode indices, whose RNG states the spawner caches
+    num_casualties = generator.rng.integers(
+        env.num_casualties_range[0], env.num_casualties_range[1] + 1, size=num_episodes
+    )
+    return generator.generate_scenarios_batch(
+        num_casualties,
+        ambulances_per_hospital=2,
+        ambulances_per_hospital_variation=1,
+        field_ambulances=5,
+        field_ambulance_radius_km=10.0,
+        seeds=list(range(num_episodes)),
+    )
+
+
+def evaluate_baseline_policy(
+    policy_func,
+    policy_name: str,
+    scenarios: List[Dict],
+    max_time_minutes: int,
+    json_writer: Optional[ResultsWriter] = None,
+    workers: int = 1,
+) -> List[Dict]:
+    """Evaluate baseline policy through simulation engine (workers > 1 runs episodes in parallel)"""
+    print(f"Evaluating {policy_name} policy...")
+
+    num_episodes = len(scenarios)
     results = []
     total_episode_time = 0
+    eval_start = time.time()
 
-    for episode in range(num_episodes):
-        episode_start = time.time()
-
-        num_casualties = np.random.randint(
-            env.num_casualties_range[0], env.num_casualties_range[1] + 1
-        )
+    # Episodes are independent, so they can run in worker processes; results
+    # still arrive in episode order
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    map_episodes = executor.map if executor is not None else map
 
-        scenario = generator.generate_scenario(
-            num_casualties=num_casualties,
-            ambulances_per_hospital=2,
-            ambulances_per_hospital_variation=1,
-            field_ambulances=5,
-            field_ambulance_radius_km=10.0,
-            seed=episode,
+    try:
+        outcomes = map_episodes(
+            run_baseline_episode, repeat(policy_func), scenarios, repeat(max_time_minutes)
         )
 
-        print(f"\n  Episode {episode + 1}/{num_episodes}:")
-        print(f"    Scenario: {num_casualties} casualties, "
-              f"{len(scenario['ambulances'])} ambulances, "
-              f"{len(scenario['hospitals'])} hospitals")
+        for episode, (scenario, (metrics, num_ambulances, episode_time)) in enumerate(
+            zip(scenarios, outcomes)
+        ):
+            total_episode_time += episode_time
 
-        engine = SimulationEngine(scenario, policy_func)
-        engine.run(max_time_minutes=env.max_time_minutes)
+            print(f"\n  Episode {episode + 1}/{num_episodes}:")
+            print(f"    Scenario: {scenario['num_casualties']} casualties, "
+                  f"{num_ambulances} ambulances, "
+                  f"{len(scenario['hospitals'])} hospitals")
 
-        episode_time = time.time() - episode_start
-        total_episode_time += episode_time
-
-        metrics = engine.get_metrics()
-        results.append(
-            {
+            record = {
                 "episode": episode + 1,
                 "reward": 0.0,  # Baselines don't have reward
                 "deaths": metrics["deaths"],
@@ -192,10 +698,17 @@ def evaluate_baseline_policy(
                 "casualties_waiting": metrics["casualties_waiting"],
                 "episode_time_sec": episode_time,
             }
-        )
+            results.append(record)
+            if json_writer is not None:
+                json_writer.write_record(policy_name, record)
 
-        print(f"    ✓ Episode {episode + 1} completed in {episode_time:.2f}s")
-        print(f"      Deaths: {metrics['deaths']}, Transported: {metrics['transported']}")
+            print(f"    ✓ Episode {episode + 1} completed in {episode_time:.2f}s")
+            print(f"      Deaths: {metrics['deaths']}, Transported: {metrics['transported']}")
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    wall_time = time.time() - eval_start
 
     # Summary statistics
     print(f"\n{'=' * 70}")
@@ -203,6 +716,8 @@ def evaluate_baseline_policy(
     print(f"  Total episodes: {num_episodes}")
     print(f"  Total time: {total_episode_time:.2f}s")
     print(f"  Avg time per episode: {total_episode_time/num_episodes:.2f}s")
+    if workers > 1:
+        print(f"  Wall time ({workers} workers): {wall_time:.2f}s")
     print("=" * 70)
 
     return results
@@ -210,29 +725,37 @@ def evaluate_baseline_policy(
 
 def calculate_statistics(results: List[Dict]) -> Dict:
     """Calculate summary statistics from results"""
-    deaths = [r["deaths"] for r in results]
-    transported = [r["transported"] for r in results]
-    response_times = [r["avg_response_time"] for r in results]
+    # One (episodes, 3) array filled straight from the records (no intermediate list);
+    # each statistic is then a single reduction over all three columns
+    values = np.fromiter(
+        ((r["deaths"], r["transported"], r["avg_response_time"]) for r in results),
+        dtype=np.dtype((np.float64, 3)),
+        count=len(results),
+    )
+    mean = values.mean(axis=0).tolist()
+    std = values.std(axis=0).tolist()
+    low = values.min(axis=0).tolist()
+    high = values.max(axis=0).tolist()
 
     return {
         "num_episodes": len(results),
         "deaths": {
-            "mean": float(np.mean(deaths)),
-            "std": float(np.std(deaths)),
-            "min": int(np.min(deaths)),
-            "max": int(np.max(deaths)),
+            "mean": mean[0],
+            "std": std[0],
+            "min": int(low[0]),
+            "max": int(high[0]),
         },
         "transported": {
-            "mean": float(np.mean(transported)),
-            "std": float(np.std(transported)),
-            "min": int(np.min(transported)),
-            "max": int(np.max(transported)),
+            "mean": mean[1],
+            "std": std[1],
+            "min": int(low[1]),
+            "max": int(high[1]),
         },
         "avg_response_time": {
-            "mean": float(np.mean(response_times)),
-            "std": float(np.std(response_times)),
-            "min": float(np.min(response_times)),
-            "max": float(np.max(response_times)),
+            "mean": mean[2],
+            "std": std[2],
+            "min": low[2],
+            "max": high[2],
         },
     }
 
@@ -303,11 +826,50 @@ Examples:
         "--output",
         type=str,
         default=None,
-        help="Output JSON file for results (default: None)",
+        help="Output file for results, JSON or MessagePack by extension (.json/.msgpack, default: None)",
     )
     parser.add_argument(
         "--seed", type=int, default=42, help="Random seed (default: 42)"
     )
+    parser.add_argument(
+        "--n-envs",
+        type=int,
+        default=1,
+        help="Episodes run in parallel for PPO evaluation, with batched inference (default: 1)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Worker processes for baseline episodes (0 = all CPUs, default: 1)",
+    )
+    parser.add_argument(
+        "--compile",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="torch.compile the policy for inference (default: on for CUDA, off for CPU)",
+    )
+    parser.add_argument(
+        "--cuda-graphs",
+        action="store_true",
+        help="Replay PPO inference as a captured CUDA graph (CUDA only; replaces --compile)",
+    )
+    parser.add_argument(
+        "--ipex",
+        action="store_true",
+        help="Optimize CPU inference with Intel Extension for PyTorch in bfloat16 "
+             "(CPU only; needs intel_extension_for_pytorch)",
+    )
+    parser.add_argument(
+        "--fp16",
+        action="store_true",
+        help="Run CUDA inference under FP16 autocast (CUDA only; default: fp32)",
+    )
+    parser.add_argument(
+        "--quantize-policy",
+        action="store_true",
+        help="Quantize the policy's linear layers to int8 for CPU inference (replaces --ipex)",
+    )
     parser.add_argument(
         "--device",
         type=str,
@@ -320,7 +882,9 @@ Examples:
     if not args.model and not args.baselines:
         parser.error("Must specify --model and/or --baselines")
 
-    np.random.seed(args.seed)
+    # All evaluation randomness flows from this generator (no legacy global np.random state)
+    rng = np.random.default_rng(args.seed)
+    scenario_seed = int(rng.integers(0, 2**31))
 
     # Check CUDA availability
     if args.device == "cuda" and not torch.cuda.is_available():
@@ -328,6 +892,39 @@ Examples:
         print(f"  This will be significantly slower for model inference.")
         args.device = "cpu"
 
+    # A captured CUDA graph already removes the launch overhead compiling targets,
+    # and capturing a compiled "reduce-overhead" policy would nest graphs
+    if args.cuda_graphs and args.device != "cuda":
+        print("\n⚠ WARNING: --cuda-graphs needs CUDA; running without graphs.")
+        args.cuda_graphs = False
+    if args.cuda_graphs and args.compile:
+        print("\n⚠ WARNING: --cuda-graphs replaces --compile; the policy will not be compiled.")
+    if args.cuda_graphs:
+        args.compile = False
+
+    # Compiling pays off for CUDA inference; on CPU the compile time usually outweighs it
+    if args.compile is None:
+        args.compile = args.device == "cuda"
+
+    # IPEX runs inference in bfloat16, which shifts reported metrics, so it is opt-in
+    if args.ipex and ipex is None:
+        print("\n⚠ WARNING: --ipex needs intel_extension_for_pytorch; running without it.")
+    elif args.ipex and args.device != "cpu":
+        print("\n⚠ WARNING: --ipex needs --device cpu; running without it.")
+    args.ipex = args.ipex and ipex is not None and args.device == "cpu"
+
+    # Quantized kernels are CPU-only, and replace IPEX's bfloat16 weights
+    if args.quantize_policy and args.device != "cpu":
+        print("\n⚠ WARNING: --quantize-policy needs --device cpu; running without quantization.")
+        args.quantize_policy = False
+    if args.quantize_policy:
+        args.ipex = False
+
+    # FP16 autocast can flip near-tied actions, which shifts reported metrics, so it is opt-in
+    if args.fp16 and args.device != "cuda":
+        print("\n⚠ WARNING: --fp16 needs CUDA; running in fp32.")
+        args.fp16 = False
+
     print("=" * 70)
     print("MCI Response Model Evaluation")
     print("=" * 70)
@@ -336,6 +933,20 @@ Examples:
     print(f"Region: {args.region}")
     print(f"Random seed: {args.seed}")
     print(f"Device: {args.device}")
+    if args.model:
+        print(f"Compiled policy: {args.compile}")
+        print(f"CUDA graphs: {args.cuda_graphs}")
+        print(f"IPEX (CPU bfloat16): {args.ipex}")
+        print(f"Quantized policy (int8): {args.quantize_policy}")
+        if args.quantize_policy:
+            precision = "int8 (dynamic quantization)"
+        elif args.ipex:
+            precision = "bfloat16 (IPEX autocast)"
+        elif args.fp16:
+            precision = "fp16 (CUDA autocast)"
+        else:
+            precision = "fp32"
+        print(f"Inference precision: {precision}")
     if args.device == "cuda":
         print(f"GPU: {torch.cuda.get_device_name(0)}")
 
@@ -347,6 +958,26 @@ Examples:
         max_casualties=args.max_casualties,
     )
 
+    # Episodes are streamed to the output file as they complete
+    # (.msgpack output is written as MessagePack instead of JSON)
+    json_writer = None
+    if args.output:
+        writer_class = MsgpackResultsWriter if Path(args.output).suffix == ".msgpack" else ResultsWriter
+        json_writer = writer_class(
+            args.output,
+            {
+                "timestamp": datetime.now().isoformat(),
+                "configuration": {
+                    "num_scenarios": args.num_scenarios,
+                    "region": args.region,
+                    "max_hospitals": args.max_hospitals,
+                    "max_ambulances": args.max_ambulances,
+                    "max_casualties": args.max_casualties,
+                    "seed": args.seed,
+                },
+            },
+        )
+
     all_results = {}
 
     # Evaluate PPO model
@@ -359,13 +990,27 @@ Examples:
             print(f"✗ Model file not found: {args.model}")
             sys.exit(1)
 
-        ppo_results = evaluate_ppo_model(args.model, env, args.num_scenarios, args.device)
+        ppo_results = evaluate_ppo_model(
+            args.model,
+            env,
+            args.num_scenarios,
+            args.device,
+            json_writer,
+            args.n_envs,
+            rng,
+            compile_policy=args.compile,
+            cuda_graphs=args.cuda_graphs,
+            use_ipex=args.ipex,
+            quantize=args.quantize_policy,
+            use_fp16=args.fp16,
+        )
         ppo_stats = calculate_statistics(ppo_results)
         all_results["ppo"] = {
             "model_path": args.model,
             "statistics": ppo_stats,
-            "episodes": ppo_results,
         }
+        if json_writer is not None:
+            json_writer.end_policy("ppo", all_results["ppo"])
 
         print(f"\nPPO Statistics:")
         print(
@@ -392,6 +1037,12 @@ Examples:
     else:
         baselines_to_eval = args.baselines
 
+    # Every baseline runs on the same scenarios, generated once
+    if baselines_to_eval:
+        baseline_scenarios = generate_baseline_scenarios(
+            env, args.num_scenarios, np.random.default_rng(scenario_seed)
+        )
+
     for baseline_name in baselines_to_eval:
         if baseline_name not in baseline_policies:
             print(f"✗ Unknown baseline: {baseline_name}")
@@ -402,13 +1053,19 @@ Examples:
         print("=" * 70)
 
         baseline_results = evaluate_baseline_policy(
-            baseline_policies[baseline_name], baseline_name, env, args.num_scenarios
+            baseline_policies[baseline_name],
+            baseline_name,
+            baseline_scenarios,
+            env.max_time_minutes,
+            json_writer,
+            workers=args.workers or os.cpu_count(),
         )
         baseline_stats = calculate_statistics(baseline_results)
         all_results[baseline_name] = {
             "statistics": baseline_stats,
-            "episodes": baseline_results,
         }
+        if json_writer is not None:
+            json_writer.end_policy(baseline_name, all_results[baseline_name])
 
         print(f"\n{baseline_name.upper()} Statistics:")
         print(
@@ -460,27 +1117,9 @@ Examples:
                         f"  vs {baseline_name.upper()}: {improvement:+.2f}% mortality reduction"
                     )
 
-    # Save results
-    if args.output:
-        output_data = {
-            "timestamp": datetime.now().isoformat(),
-            "configuration": {
-                "num_scenarios": args.num_scenarios,
-                "region": args.region,
-                "max_hospitals": args.max_hospitals,
-                "max_ambulances": args.max_ambulances,
-                "max_casualties": args.max_casualties,
-                "seed": args.seed,
-            },
-            "results": all_results,
-        }
-
-        output_path = Path(args.output)
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-
-        with open(args.output, "w") as f:
-            json.dump(output_data, f, indent=2)
-
+    # Finish results file
+    if json_writer is not None:
+        json_writer.close()
         print(f"\n✓ Results saved to {args.output}")
 
     print("\n" + "=" * 70)
@@ -10,10 +10,16 @@ import json
 import sys
 from pathlib import Path
 
+import numpy as np
+
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from simulator.environment.scenario_generator import ScenarioGenerator
+from simulator.environment.scenario_generator import (
+    ScenarioGenerator,
+    TRIAGE_NAMES,
+    casualty_arrays,
+)
 from simulator.environment.hospital_loader import load_hospitals
 
 
@@ -62,7 +68,8 @@ def generate_benchmark_scenarios(
     ambulances_per_hospital_variation: int = 1,
     field_ambulances: int = 5,
     field_ambulance_radius_km: float = 10.0,
-    seed: int = 42
+    seed: int = 42,
+    compress: bool = False
 ):
     """
     Generate benchmark scenarios for all defined locations.
@@ -75,31 +82,34 @@ def generate_benchmark_scenarios(
         field_ambulances: Number of field ambulance units
         field_ambulance_radius_km: Radius for field ambulance placement
         seed: Random seed for reproducibility
+        compress: Write compact Zstandard-compressed scenarios ('.json.zst',
+                  needs zstandard) instead of indented JSON
     """
+    extension = '.json.zst' if compress else '.json'
+
     # Create output directory
     os.makedirs(output_dir, exist_ok=True)
 
-    # Track scenarios across regions
-    scenarios_by_region = {}
+    # One scenario generator per region, shared by that region's locations
+    generators_by_region = {}
 
     for location_id, location_info in BENCHMARK_LOCATIONS.items():
         region = location_info['region']
 
-        # Load hospitals for this region (cache by region)
-        if region not in scenarios_by_region:
+        # Center region bounds on our specific location
+        lat, lon = location_info['lat'], location_info['lon']
+        region_bounds = (lat - 0.01, lat + 0.01, lon - 0.01, lon + 0.01)
+
+        # Load hospitals and build the generator once per region
+        if region not in generators_by_region:
             print(f"\nLoading hospitals for region: {region}")
             hospitals = load_hospitals(region=region)
             print(f"  Loaded {len(hospitals)} hospitals")
-            scenarios_by_region[region] = hospitals
-        else:
-            hospitals = scenarios_by_region[region]
-
-        # Create scenario generator with fixed incident location
-        # We override region_bounds to center on our specific location
-        lat, lon = location_info['lat'], location_info['lon']
-        region_bounds = (lat - 0.01, lat + 0.01, lon - 0.01, lon + 0.01)
+            generators_by_region[region] = ScenarioGenerator(hospitals, region_bounds, seed=seed)
 
-        generator = ScenarioGenerator(hospitals, region_bounds, seed=seed)
+        generator = generators_by_region[region]
+        generator.set_region_bounds(region_bounds)
+        generator.rng = np.random.default_rng(seed)  # Every location starts from the same seed
 
         # Generate scenario at exact location
         print(f"\nGenerating scenario: {location_info['name']}")
@@ -128,9 +138,10 @@ def generate_benchmark_scenarios(
         }
 
         # Save scenario
-        filename = f"{location_id}.json"
+        filename = f"{location_id}{extension}"
         filepath = os.path.join(output_dir, filename)
-        generator.save_scenario(scenario, filepath)
+        # Plain JSON is checked in and read by people
+        generator.save_scenario(scenario, filepath, indent=not compress)
 
         # Get file size
         file_size_kb = os.path.getsize(filepath) / 1024
@@ -142,14 +153,12 @@ def generate_benchmark_scenarios(
               f"{scenario['ambulance_config']['field_ambulances']} field units")
         print(f"  Saved to: {filepath} ({file_size_kb:.1f} KB)")
 
-        # Count triage distribution
-        triage_counts = {'RED': 0, 'YELLOW': 0, 'GREEN': 0, 'BLACK': 0}
-        for casualty in scenario['casualties']:
-            triage_counts[casualty['triage']] += 1
+        # Count triage distribution from the triage code array
+        triage_counts = np.bincount(casualty_arrays(scenario)['triage'], minlength=len(TRIAGE_NAMES))
+        triage_pcts = triage_counts / len(scenario['casualties']) * 100
 
         print(f"  Triage distribution:")
-        for triage, count in triage_counts.items():
-            pct = (count / len(scenario['casualties'])) * 100
+        for triage, count, pct in zip(TRIAGE_NAMES, triage_counts, triage_pcts):
             print(f"    {triage}: {count} ({pct:.1f}%)")
 
     # Create index file
@@ -170,7 +179,7 @@ def generate_benchmark_scenarios(
                 'description': info['description'],
                 'coordinates': [info['lat'], info['lon']],
                 'region': info['region'],
-                'filename': f"{location_id}.json"
+                'filename': f"{location_id}{extension}"
             }
             for location_id, info in BENCHMARK_LOCATIONS.items()
         }
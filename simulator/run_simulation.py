@@ -6,25 +6,52 @@ Run mass casualty incident simulations from the command line.
 """
 
 import argparse
-import json
+import contextlib
+import functools
+import io
 import sys
 import os
 from datetime import datetime
-from typing import Dict, List
+from typing import Callable, Dict, List, Optional, Tuple
 
 # Add project root to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from simulator.environment.hospital_loader import load_hospitals
-from simulator.environment.scenario_generator import ScenarioGenerator, calculate_region_bounds
-from simulator.simulation_engine import SimulationEngine
-from simulator.agents.baselines import (
-    random_policy,
-    nearest_hospital_policy,
-    triage_priority_policy,
-    trauma_matching_policy,
-    load_balancing_policy
-)
+# The simulator modules (NumPy, SciPy) are imported where they are used, so
+# --help and argument errors return without loading them
+
+# CLI policy names
+POLICY_NAMES = ('random', 'nearest', 'triage', 'trauma', 'load_balancing')
+
+# File names --dump-scenarios accepts (compressed by extension on write)
+SCENARIO_BUNDLE_SUFFIXES = ('.json', '.json.gz', '.json.zst')
+
+
+@functools.cache
+def _policies() -> Dict[str, Callable]:
+    """Policy functions by CLI name (imports the baselines on first use)."""
+    from simulator.agents.baselines import (
+        random_policy,
+        nearest_hospital_policy,
+        triage_priority_policy,
+        trauma_matching_policy,
+        load_balancing_policy
+    )
+
+    return dict(zip(POLICY_NAMES, (
+        random_policy,
+        nearest_hospital_policy,
+        triage_priority_policy,
+        trauma_matching_policy,
+        load_balancing_policy
+    )))
+
+
+def __getattr__(name: str):
+    # POLICIES stays available as a module attribute, built on first access
+    if name == 'POLICIES':
+        return _policies()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def get_policy_function(policy_name: str):
@@ -40,39 +67,108 @@ def get_policy_function(policy_name: str):
     Raises:
         ValueError: If policy name is unknown
     """
-    policies = {
-        'random': random_policy,
-        'nearest': nearest_hospital_policy,
-        'triage': triage_priority_policy,
-        'trauma': trauma_matching_policy,
-        'load_balancing': load_balancing_policy
-    }
+    try:
+        return _policies()[policy_name.lower()]
+    except KeyError:
+        available = ', '.join(POLICY_NAMES)
+        raise ValueError(f"Unknown policy '{policy_name}'. Available: {available}") from None
 
-    policy = policies.get(policy_name.lower())
-    if policy is None:
-        available = ', '.join(policies.keys())
-        raise ValueError(f"Unknown policy '{policy_name}'. Available: {available}")
 
-    return policy
+def load_region(region: str) -> Tuple[List[Dict], Tuple[float, float, float, float]]:
+    """
+    Load a region's hospitals and compute its bounds.
 
+    Args:
+        region: State code (e.g., 'CA')
 
-def run_single_simulation(args, scenario_num: int = 1) -> Dict:
+    Returns:
+        (hospitals, region_bounds)
+
+    Raises:
+        ValueError: If the region has no hospitals
+    """
+    from simulator.environment.hospital_loader import load_hospitals
+    from simulator.environment.scenario_generator import calculate_region_bounds
+
+    print(f"Loading hospitals for region: {region}...")
+    hospitals = load_hospitals(region=region)
+
+    if not hospitals:
+        raise ValueError(f"No hospitals found for region '{region}'")
+
+    print(f"  Loaded {len(hospitals)} hospitals")
+
+    return hospitals, calculate_region_bounds(hospitals)
+
+
+def load_scenarios(filename: str) -> List[Dict]:
+    """
+    Load pre-generated scenarios from a JSON file.
+
+    Accepts a single scenario (e.g., scenarios/benchmark/tampa_1.json) or a
+    bundle written by --dump-scenarios ({"num_scenarios": N, "scenarios": [...]}).
+
+    Args:
+        filename: Scenario file (.zst/.gz files are decompressed)
+
+    Returns:
+        List of scenario dictionaries
+    """
+    from simulator.utils.json_utils import load_json
+
+    data = load_json(filename)
+    return data['scenarios'] if 'scenarios' in data else [data]
+
+
+def save_scenarios(scenarios: List[Dict], filename: str) -> None:
+    """
+    Save scenarios as a bundle that load_scenarios() (and --scenario-file) replays.
+
+    Each scenario is written as ScenarioGenerator.save_scenario() would write
+    it, with its hospital list embedded.
+
+    Args:
+        scenarios: Scenario dictionaries from ScenarioGenerator
+        filename: Output file ('.zst'/'.gz' names are compressed)
+    """
+    from simulator.environment.scenario_generator import ScenarioGenerator
+    from simulator.utils.json_utils import dump_json
+
+    saved = [ScenarioGenerator._scenario_for_saving(scenario, include_hospitals=True) for scenario in scenarios]
+    dump_json({'num_scenarios': len(saved), 'scenarios': saved}, filename, indent=False)
+
+
+def run_single_simulation(
+    args,
+    scenario_num: int = 1,
+    hospitals: Optional[List[Dict]] = None,
+    region_bounds: Optional[Tuple[float, float, float, float]] = None,
+    scenario: Optional[Dict] = None
+) -> Dict:
     """
     Run a single simulation and return results.
 
     Args:
         args: Command-line arguments
         scenario_num: Scenario number for identification
+        hospitals: Hospitals for random scenarios (loaded for args.region if None)
+        region_bounds: Bounds for random scenarios (computed from hospitals if None)
+        scenario: Pre-generated scenario to run (read from args.scenario_file if None)
 
     Returns:
-        Results dictionary
+        Results dictionary (with the scenario under 'scenario_data' if
+        args.dump_scenarios is set)
     """
-    # Check if loading a pre-generated scenario
-    if hasattr(args, 'scenario_file') and args.scenario_file:
+    import numpy as np
+    from simulator.environment.scenario_generator import ScenarioGenerator, calculate_region_bounds
+    from simulator.simulation_engine import AmbulanceType, SimulationEngine
+
+    # Check if running a pre-generated scenario
+    if scenario is None and getattr(args, 'scenario_file', None):
         print(f"Loading scenario from file: {args.scenario_file}...")
-        with open(args.scenario_file, 'r') as f:
-            scenario = json.load(f)
+        scenario = load_scenarios(args.scenario_file)[scenario_num - 1]
 
+    if scenario is not None:
         hospitals = scenario['hospitals']
         print(f"  Loaded scenario with {scenario['num_casualties']} casualties")
         print(f"  Hospitals: {len(hospitals)}")
@@ -85,18 +181,11 @@ def run_single_simulation(args, scenario_num: int = 1) -> Dict:
         config = scenario['ambulance_config']
         print(f"  Ambulance config: {config['ambulances_per_hospital']}±{config['ambulances_per_hospital_variation']} per hospital + {config['field_ambulances']} field units")
     else:
-        # Generate random scenario
-        # Load hospitals
-        print(f"Loading hospitals for region: {args.region}...")
-        hospitals = load_hospitals(region=args.region)
-
-        if not hospitals:
-            raise ValueError(f"No hospitals found for region '{args.region}'")
-
-        print(f"  Loaded {len(hospitals)} hospitals")
-
-        # Calculate region bounds
-        region_bounds = calculate_region_bounds(hospitals)
+        # Generate random scenario (hospitals and bounds are shared across scenarios)
+        if hospitals is None:
+            hospitals, region_bounds = load_region(args.region)
+        elif region_bounds is None:
+            region_bounds = calculate_region_bounds(hospitals)
 
         # Create scenario generator
         seed = args.seed + scenario_num if args.seed is not None else None
@@ -122,7 +211,7 @@ def run_single_simulation(args, scenario_num: int = 1) -> Dict:
 
     # Run simulation
     print(f"\nRunning simulation (max {args.max_time} minutes)...")
-    engine = SimulationEngine(scenario, policy)
+    engine = SimulationEngine(scenario, policy, log_events=args.include_events)
     engine.run(max_time_minutes=args.max_time)
 
     # Get results
@@ -134,6 +223,9 @@ def run_single_simulation(args, scenario_num: int = 1) -> Dict:
     print(f"  Average response time: {metrics['avg_response_time']:.2f} minutes")
     print(f"  Casualties waiting: {metrics['casualties_waiting']}")
 
+    # Ambulances per AmbulanceType in one pass over the type array
+    type_counts = np.bincount(engine.ambulance_type, minlength=len(AmbulanceType))
+
     # Compile results
     results = {
         'scenario_num': scenario_num,
@@ -154,20 +246,89 @@ def run_single_simulation(args, scenario_num: int = 1) -> Dict:
             'incident_location': scenario['incident_location'],
             'num_hospitals': len(hospitals),
             'total_ambulances': len(engine.ambulances),
-            'hospital_based_ambulances': sum(1 for a in engine.ambulances if a['type'] == 'HOSPITAL_BASED'),
-            'field_unit_ambulances': sum(1 for a in engine.ambulances if a['type'] == 'FIELD_UNIT')
+            'hospital_based_ambulances': int(type_counts[AmbulanceType.HOSPITAL_BASED]),
+            'field_unit_ambulances': int(type_counts[AmbulanceType.FIELD_UNIT])
         },
         'metrics': metrics,
         'simulation_time': engine.current_time,
-        'event_count': len(engine.event_log)
+        'event_count': engine.event_count
     }
 
     if args.include_events:
-        results['events'] = engine.event_log
+        results['events'] = engine.event_log.to_list()
+
+    if getattr(args, 'dump_scenarios', None):
+        results['scenario_data'] = scenario
 
     return results
 
 
+class ResultsFile:
+    """
+    Stream scenario results to a JSON file as scenarios complete.
+
+    Writes the same {"num_scenarios": N, "results": [...]} document as a
+    single dump would, but one scenario at a time, so event logs
+    (--include-events) do not all have to be held in memory. With
+    jsonl=True, each scenario's results are written as one compact JSON
+    line instead (JSON Lines, for line-oriented tools such as jq -c).
+
+    Use as a context manager: the document is finalized on a clean exit,
+    and the partial file is removed if an exception escapes, so an
+    interrupted run never leaves an unterminated or truncated results file.
+    """
+
+    def __init__(self, filename: str, num_scenarios: int, jsonl: bool = False):
+        from simulator.utils.json_utils import dumps
+
+        self._filename = filename
+        self._file = open(filename, 'wb')
+        self._jsonl = jsonl
+        if not jsonl:
+            self._file.write(b'{\n"num_scenarios": ' + dumps(num_scenarios) + b',\n"results": [')
+        self._num_results = 0
+
+    def write(self, results: Dict) -> None:
+        """Append one scenario's results"""
+        from simulator.utils.json_utils import dumps
+
+        if self._jsonl:
+            self._file.write(dumps(results) + b'\n')
+        else:
+            self._file.write((b',\n' if self._num_results else b'\n') + dumps(results, indent=True))
+        self._num_results += 1
+
+    def close(self) -> None:
+        if not self._jsonl:
+            self._file.write(b'\n]\n}\n')
+        self._file.close()
+
+    def __enter__(self) -> 'ResultsFile':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            # Incomplete results are not written out
+            self._file.close()
+            os.remove(self._filename)
+
+
+def _run_scenario_captured(task: Tuple) -> Tuple[Dict, str]:
+    """
+    Run one scenario, returning (results, printed output).
+
+    Output is captured so each scenario's log is written in one block, in
+    scenario order, instead of line by line (or interleaved across workers).
+    """
+    args, scenario_num, hospitals, region_bounds, scenario = task
+    log = io.StringIO()
+    with contextlib.redirect_stdout(log):
+        results = run_single_simulation(args, scenario_num, hospitals, region_bounds, scenario)
+    return results, log.getvalue()
+
+
 def main():
     """Main CLI entry point."""
     parser = argparse.ArgumentParser(
@@ -197,6 +358,12 @@ Examples:
   python simulator/run_simulation.py --region CA --casualties 60 \\
       --policy load_balancing --num-scenarios 10 --output results.json
 
+  # Generate scenarios once, then compare policies on the same scenarios
+  # (.zst bundles need zstandard, from the fast-io extra; .gz needs nothing extra)
+  python simulator/run_simulation.py --region CA --num-scenarios 100 --seed 42 \\
+      --policy nearest --dump-scenarios ca_100.json.zst
+  python simulator/run_simulation.py --scenario-file ca_100.json.zst --policy triage
+
 Available policies:
   random           - Random dispatch (baseline)
   nearest          - Nearest hospital (greedy)
@@ -209,12 +376,13 @@ Available policies:
     # Scenario source (mutually exclusive)
     scenario_group = parser.add_mutually_exclusive_group(required=True)
     scenario_group.add_argument('--scenario-file', type=str,
-                        help='Load pre-generated scenario from JSON file (e.g., scenarios/benchmark/tampa_1.json)')
+                        help='Load pre-generated scenario(s) from JSON file (e.g., scenarios/benchmark/tampa_1.json '
+                             'or a --dump-scenarios bundle)')
     scenario_group.add_argument('--region', type=str,
                         help='Generate random scenario for state (e.g., CA, NY, TX)')
 
     # Policy (required)
-    parser.add_argument('--policy', type=str, required=True,
+    parser.add_argument('--policy', type=str.lower, required=True, choices=POLICY_NAMES,
                         help='Dispatch policy to use')
 
     # Scenario generation parameters (only for random scenarios)
@@ -234,16 +402,22 @@ Available policies:
     # Simulation parameters
     parser.add_argument('--max-time', type=int, default=400,
                         help='Maximum simulation time in minutes (default: 400)')
-    parser.add_argument('--num-scenarios', type=int, default=1,
-                        help='Number of scenarios to run (default: 1)')
+    parser.add_argument('--num-scenarios', type=int, default=None,
+                        help='Number of scenarios to run (default: 1, or all scenarios in --scenario-file)')
     parser.add_argument('--seed', type=int, default=None,
                         help='Random seed for reproducibility (default: None)')
+    parser.add_argument('--workers', type=int, default=0,
+                        help='Worker processes for multiple scenarios (0 = all CPUs, default: 0)')
 
     # Output options
     parser.add_argument('--output', type=str, default=None,
                         help='Output JSON file (default: print to console)')
+    parser.add_argument('--output-format', choices=('json', 'jsonl'), default='json',
+                        help='Output file format: one JSON document, or one JSON line per scenario (default: json)')
     parser.add_argument('--include-events', action='store_true',
                         help='Include detailed event log in output')
+    parser.add_argument('--dump-scenarios', type=str, default=None,
+                        help='Save the generated scenarios to a JSON bundle for reuse with --scenario-file')
     parser.add_argument('--verbose', action='store_true',
                         help='Verbose output')
 
@@ -252,54 +426,114 @@ Available policies:
     # Validate arguments
     if args.casualties < 1:
         parser.error("--casualties must be positive")
-    if args.num_scenarios < 1:
+    if args.num_scenarios is not None and args.num_scenarios < 1:
         parser.error("--num-scenarios must be positive")
+    if args.workers < 0:
+        parser.error("--workers must be non-negative")
 
     # Validate scenario file if provided
     if args.scenario_file and not os.path.exists(args.scenario_file):
         parser.error(f"Scenario file not found: {args.scenario_file}")
 
-    # Check that num_scenarios is 1 when using scenario file
-    if args.scenario_file and args.num_scenarios > 1:
-        parser.error("--num-scenarios must be 1 when using --scenario-file")
+    if args.scenario_file and args.dump_scenarios:
+        parser.error("--dump-scenarios only applies to generated scenarios (--region)")
 
-    try:
-        # Run simulations
-        all_results = []
+    # Check the bundle can be written before any scenario runs
+    if args.dump_scenarios:
+        from simulator.utils.json_utils import check_compression
+
+        if not args.dump_scenarios.endswith(SCENARIO_BUNDLE_SUFFIXES):
+            parser.error(f"--dump-scenarios must end with one of: {', '.join(SCENARIO_BUNDLE_SUFFIXES)}")
+        try:
+            check_compression(args.dump_scenarios)
+        except ImportError as e:
+            parser.error(str(e))
+        dump_dir = os.path.dirname(os.path.abspath(args.dump_scenarios))
+        if not os.path.isdir(dump_dir):
+            parser.error(f"Directory for --dump-scenarios not found: {dump_dir}")
 
-        for scenario_num in range(1, args.num_scenarios + 1):
-            if args.num_scenarios > 1:
-                print("\n" + "=" * 60)
-                print(f"SCENARIO {scenario_num}/{args.num_scenarios}")
-                print("=" * 60)
+    import numpy as np
+    from concurrent.futures import ProcessPoolExecutor
 
-            results = run_single_simulation(args, scenario_num)
+    try:
+        # Scenario files are read once; hospitals and region bounds are loaded
+        # once for all random scenarios
+        hospitals = region_bounds = None
+        if args.scenario_file:
+            print(f"Loading scenario from file: {args.scenario_file}...")
+            scenarios = load_scenarios(args.scenario_file)
+            if args.num_scenarios is None:
+                args.num_scenarios = len(scenarios)
+            elif args.num_scenarios > len(scenarios):
+                parser.error(f"--num-scenarios is {args.num_scenarios} but {args.scenario_file} "
+                             f"has {len(scenarios)} scenario(s)")
+        else:
+            if args.num_scenarios is None:
+                args.num_scenarios = 1
+            scenarios = [None] * args.num_scenarios
+            hospitals, region_bounds = load_region(args.region)
+
+        # Results are written out as each scenario finishes; only the summary
+        # fields (no event logs) are kept for the end-of-run averages
+        results_file = ResultsFile(args.output, args.num_scenarios, jsonl=args.output_format == 'jsonl') if args.output else None
+        all_results = []
+        dumped_scenarios = []
+
+        def record(results: Dict) -> None:
+            if args.dump_scenarios:
+                dumped_scenarios.append(results.pop('scenario_data'))
+            if results_file is not None:
+                results_file.write(results)
+                results.pop('events', None)
             all_results.append(results)
 
+        # Run simulations. Scenarios are independent (own seeds), so several run in
+        # worker processes; map keeps them in scenario order
+        workers = min(args.workers or os.cpu_count(), args.num_scenarios)
+        executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+        map_scenarios = executor.map if executor is not None else map
+
+        tasks = [(args, scenario_num, hospitals, region_bounds, scenario)
+                 for scenario_num, scenario in enumerate(scenarios[:args.num_scenarios], start=1)]
+        try:
+            # The results file is finalized once every scenario has been written
+            with results_file if results_file is not None else contextlib.nullcontext():
+                for (results, log), (_, scenario_num, _, _, _) in zip(map_scenarios(_run_scenario_captured, tasks), tasks):
+                    # Each scenario's output goes to stdout in a single write
+                    if args.num_scenarios > 1:
+                        log = f"\n{'=' * 60}\nSCENARIO {scenario_num}/{args.num_scenarios}\n{'=' * 60}\n{log}"
+                    sys.stdout.write(log)
+                    record(results)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
         # Summary for multiple scenarios
         if args.num_scenarios > 1:
             print("\n" + "=" * 60)
             print("SUMMARY")
             print("=" * 60)
 
-            avg_deaths = sum(r['metrics']['deaths'] for r in all_results) / len(all_results)
-            avg_transported = sum(r['metrics']['transported'] for r in all_results) / len(all_results)
-            avg_response_time = sum(r['metrics']['avg_response_time'] for r in all_results) / len(all_results)
-
-            print(f"Average deaths: {avg_deaths:.2f}")
-            print(f"Average transported: {avg_transported:.2f}")
-            print(f"Average response time: {avg_response_time:.2f} minutes")
+            # (scenarios, 3) array of deaths, transported, avg response time
+            values = np.fromiter(
+                ((r['metrics']['deaths'], r['metrics']['transported'], r['metrics']['avg_response_time'])
+                 for r in all_results),
+                dtype=np.dtype((np.float64, 3)),
+                count=len(all_results)
+            )
+            avg_deaths, avg_transported, avg_response_time = values.mean(axis=0)
+            std_deaths, std_transported, std_response_time = values.std(axis=0)
 
-        # Save results
-        if args.output:
-            output_data = {
-                'num_scenarios': args.num_scenarios,
-                'results': all_results
-            }
+            print(f"Average deaths: {avg_deaths:.2f} ± {std_deaths:.2f}")
+            print(f"Average transported: {avg_transported:.2f} ± {std_transported:.2f}")
+            print(f"Average response time: {avg_response_time:.2f} ± {std_response_time:.2f} minutes")
 
-            with open(args.output, 'w') as f:
-                json.dump(output_data, f, indent=2)
+        if args.dump_scenarios:
+            save_scenarios(dumped_scenarios, args.dump_scenarios)
+            print(f"\n✓ Scenarios saved to {args.dump_scenarios}")
 
+        # Save results
+        if results_file is not None:
             print(f"\n✓ Results saved to {args.output}")
         else:
             # Print results to console
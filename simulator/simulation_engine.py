@@ -5,17 +5,215 @@ Discrete-event simulator for mass casualty incident response.
 Time advances in 1-minute intervals.
 """
 
+from collections import OrderedDict
+from dataclasses import dataclass
+from enum import IntEnum
 from typing import Dict, List, Callable, Optional, Any
-import copy
+import math
+import random
 import sys
 import os
 
+import numpy as np
+
 # Add project root to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from simulator.environment.scenario_generator import ScenarioGenerator
-from simulator.environment.patient_model import PatientModel
-from simulator.environment.routing import euclidean_distance, euclidean_travel_time
+from simulator.environment.scenario_generator import ScenarioGenerator, CasualtyRecords, TRIAGE_NAMES
+from simulator.environment.patient_model import PatientBatch, PatientModel
+from simulator.environment.routing import euclidean_travel_time_array, haversine_array
+
+
+class CasualtyStatus(IntEnum):
+    """Casualty lifecycle states; names match the 'status' strings in state dicts."""
+    WAITING = 0
+    ASSIGNED = 1
+    ENROUTE = 2
+    DELIVERED = 3
+    DECEASED = 4
+
+
+class AmbulanceStatus(IntEnum):
+    """Ambulance states; names match the 'status' strings in state dicts."""
+    IDLE = 0
+    MOVING_TO_CASUALTY = 1
+    MOVING_TO_HOSPITAL = 2
+    MOVING_TO_LOCATION = 3
+    RETURNING_TO_BASE = 4
+
+
+class AmbulanceType(IntEnum):
+    """Ambulance unit types; names match the 'type' strings in state dicts."""
+    HOSPITAL_BASED = 0
+    FIELD_UNIT = 1
+
+
+class ActionType(IntEnum):
+    """Ambulance action types; names match the 'action_type' strings in action dicts."""
+    DISPATCH_TO_CASUALTY = 0
+    MOVE_TO_LOCATION = 1
+    RETURN_TO_BASE = 2
+    WAIT = 3
+
+
+# Action types by name and by code (IntEnum members hash like their values)
+_ACTION_TYPES = {**{action_type.name: action_type for action_type in ActionType},
+                 **{action_type: action_type for action_type in ActionType}}
+
+
+@dataclass(slots=True)
+class Casualty:
+    """Runtime casualty state."""
+    id: int
+    lat: float
+    lon: float
+    triage: str  # Initial triage level
+    patient: PatientModel
+    status: str = 'WAITING'  # WAITING, ASSIGNED, ENROUTE, DELIVERED, DECEASED
+    assigned_ambulance_id: Optional[int] = None
+    pickup_time: Optional[int] = None
+    delivery_time: Optional[int] = None
+
+    def to_dict(self, health: float, is_alive: bool) -> Dict:
+        """
+        State dict for this casualty (see SimulationEngine.get_state).
+
+        Health and alive flag are passed in, already read from the patient
+        batch, rather than read through the PatientView properties.
+        """
+        return {
+            'id': self.id,
+            'lat': self.lat,
+            'lon': self.lon,
+            'triage': self.triage,
+            'health': health,
+            'is_alive': is_alive,
+            'status': self.status,
+            'assigned_ambulance_id': self.assigned_ambulance_id
+        }
+
+
+@dataclass(slots=True)
+class Ambulance:
+    """Runtime ambulance state."""
+    id: int
+    lat: float
+    lon: float
+    base_hospital_id: Optional[Any]  # None for field units
+    type: str  # HOSPITAL_BASED or FIELD_UNIT
+    status: str = 'IDLE'
+    patient_onboard: Optional[int] = None  # None or casualty_id
+    target_lat: Optional[float] = None
+    target_lon: Optional[float] = None
+    destination_hospital_id: Optional[Any] = None
+    action_type: Optional[str] = None  # Current action being executed
+
+    def to_dict(self) -> Dict:
+        """State dict for this ambulance (see SimulationEngine.get_state)."""
+        return {
+            'id': self.id,
+            'lat': self.lat,
+            'lon': self.lon,
+            'status': self.status,
+            'base_hospital_id': self.base_hospital_id,
+            'type': self.type,
+            'patient_onboard': self.patient_onboard
+        }
+
+
+class EventType(IntEnum):
+    """Simulation event types; names match the 'type' strings in event dicts."""
+    DISPATCH = 0
+    PICKUP = 1
+    DELIVERY = 2
+    DEATH = 3
+    MOVE_TO_LOCATION = 4
+    REPOSITIONED = 5
+    RETURN_TO_BASE = 6
+    SIMULATION_END = 7
+
+
+EVENT_TYPE_NAMES = np.array([event_type.name for event_type in EventType])
+
+
+class EventLog:
+    """
+    Columnar simulation event log.
+
+    Event types and times are stored as integer arrays (grown by doubling)
+    and payloads in a plain list, instead of one {'type', 'time', 'data'}
+    dict per event. Indexing, slicing and iteration still yield event dicts,
+    so the log reads like a list of them; `types` and `times` give the
+    columns for vectorized analysis.
+    """
+
+    def __init__(self, capacity: int = 256):
+        self._types = np.empty(capacity, dtype=np.int8)
+        self._times = np.empty(capacity, dtype=np.int32)
+        self.data: List[Dict] = []
+
+    def append(self, event_type: EventType, time: int, data: Dict) -> None:
+        """Append one event."""
+        n = len(self.data)
+        if n == len(self._types):
+            self._types = np.resize(self._types, 2 * n)
+            self._times = np.resize(self._times, 2 * n)
+        self._types[n] = event_type
+        self._times[n] = time
+        self.data.append(data)
+
+    @property
+    def types(self) -> np.ndarray:
+        """EventType codes, one per event."""
+        return self._types[:len(self.data)]
+
+    @property
+    def times(self) -> np.ndarray:
+        """Simulation minute of each event."""
+        return self._times[:len(self.data)]
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self.data)))]
+        data = self.data[index]  # Raises IndexError / handles negative indices
+        index = index % len(self.data)
+        return {
+            'type': EVENT_TYPE_NAMES[self._types[index]].item(),
+            'time': self._times[index].item(),
+            'data': data
+        }
+
+    def __iter__(self):
+        return iter(self.to_list())
+
+    def to_list(self) -> List[Dict]:
+        """Events as a list of {'type', 'time', 'data'} dicts."""
+        return [
+            {'type': event_type, 'time': time, 'data': data}
+            for event_type, time, data in zip(
+                EVENT_TYPE_NAMES[self.types].tolist(), self.times.tolist(), self.data
+            )
+        ]
+
+    def to_dataframe(self):
+        """Events as a pandas DataFrame: type and time columns plus one column per payload field."""
+        import pandas as pd
+
+        return pd.concat([
+            pd.DataFrame({
+                'type': pd.Categorical.from_codes(self.types, categories=EVENT_TYPE_NAMES),
+                'time': self.times
+            }),
+            pd.DataFrame(self.data)
+        ], axis=1)
+
+
+# Shared spawner (no hospitals of its own) so its seeded-RNG cache persists across engines,
+# e.g. when the same scenario is replayed under several policies
+_AMBULANCE_SPAWNER = ScenarioGenerator([], (0, 0, 0, 0))
 
 
 class SimulationEngine:
@@ -24,39 +222,82 @@ class SimulationEngine:
 
     Manages ambulances, casualties, and hospital state over discrete time steps.
     Supports flexible ambulance actions: dispatch, reposition, return to base.
+
+    Casualty and ambulance records carry string statuses; the same
+    statuses are mirrored as integer codes in `casualty_status` and
+    `ambulance_status` arrays for vectorized filtering. Ambulance types
+    and positions are likewise mirrored in `ambulance_type` (AmbulanceType
+    codes), `ambulance_lat` and `ambulance_lon`. Remaining travel time
+    lives only in `ambulance_time_to_target` (whole minutes, rounded up
+    from the travel time and counted down each step while an ambulance is
+    moving).
+
+    `dirty` is set whenever a step changes observable state (health,
+    statuses, ambulance timers, events). Consumers that cache derived
+    views clear it after rebuilding them.
     """
 
-    def __init__(self, scenario: Dict, policy: Callable):
+    def __init__(self, scenario: Optional[Dict], policy: Callable, log_events: bool = True):
         """
         Initialize simulation with scenario and policy.
 
         Args:
-            scenario: Scenario dict from ScenarioGenerator (with ambulance_config)
+            scenario: Scenario dict from ScenarioGenerator (with ambulance_config),
+                      or None to load one later with reset()
             policy: Policy function that takes state dict and returns actions dict
+            log_events: Keep events in event_log (default True). When False, events
+                        are only counted (event_count) and sent to listeners
         """
-        self.scenario = scenario
         self.policy = policy
+        self.log_events = log_events
+
+        # Event listeners (for optional WebSocket integration later)
+        self.event_listeners = []
+
+        if scenario is not None:
+            self.reset(scenario)
+
+    def reset(self, scenario: Dict) -> None:
+        """
+        Start a new simulation of a scenario, reusing this engine.
+
+        Lets one engine (with its policy and listeners) run many episodes.
+        Event log and metrics of the previous episode are replaced, not
+        cleared in place, so references to them stay valid.
+
+        Args:
+            scenario: Scenario dict from ScenarioGenerator (with ambulance_config)
+        """
+        self.scenario = scenario
         self.current_time = 0
 
-        # Spawn ambulances lazily from config
-        generator = ScenarioGenerator([], (0, 0, 0, 0))  # Dummy init
-        self.ambulances = generator.spawn_ambulances(
+        # Spawn ambulances lazily from config, as columns (no per-ambulance dicts)
+        spawned_ambulances = _AMBULANCE_SPAWNER.spawn_ambulance_columns(
             scenario['incident_location'],
             scenario['ambulance_config'],
             scenario['hospitals']
         )
 
         # Convert ambulances to runtime state objects
-        self._initialize_ambulances()
+        self._initialize_ambulances(spawned_ambulances)
 
-        # Initialize casualties with PatientModel
+        # Initialize casualties with a shared PatientBatch
         self._initialize_casualties()
 
+        # Hospital lookup by id (first hospital wins if an id repeats). Scenarios
+        # from one generator share their hospital list, so an engine reset for
+        # episode after episode builds it only once per hospital list
+        if scenario['hospitals'] is not getattr(self, 'hospitals', None):
+            self._hospital_by_id = {}
+            for hospital in scenario['hospitals']:
+                self._hospital_by_id.setdefault(hospital['id'], hospital)
+
         # Copy hospitals reference
         self.hospitals = scenario['hospitals']
 
-        # Event log for analysis
-        self.event_log = []
+        # Event log for analysis (empty unless log_events); every event is counted
+        self.event_log = EventLog()
+        self.event_count = 0
 
         # Metrics tracking
         self.metrics = {
@@ -69,38 +310,96 @@ class SimulationEngine:
             'pickups': 0
         }
 
-        # Event listeners (for optional WebSocket integration later)
-        self.event_listeners = []
+        # Observable state changed since consumers last cleared the flag
+        self.dirty = True
+
+    def _initialize_ambulances(self, spawned_ambulances: Dict[str, np.ndarray]) -> None:
+        """Convert spawned ambulance columns to runtime state objects and arrays."""
+        self.ambulances = [
+            Ambulance(
+                id=ambulance_id,
+                lat=lat,
+                lon=lon,
+                base_hospital_id=base_hospital_id,
+                type=ambulance_type
+            )
+            for ambulance_id, lat, lon, base_hospital_id, ambulance_type in zip(
+                spawned_ambulances['id'].tolist(),
+                spawned_ambulances['lat'].tolist(),
+                spawned_ambulances['lon'].tolist(),
+                spawned_ambulances['base_hospital_id'].tolist(),
+                spawned_ambulances['type'].tolist()
+            )
+        ]
+
+        self.ambulance_status = np.full(len(self.ambulances), AmbulanceStatus.IDLE, dtype=np.int8)
+        self.ambulance_type = (spawned_ambulances['type'] == AmbulanceType.FIELD_UNIT.name).astype(np.int8)
+        self.ambulance_lat = spawned_ambulances['lat'].astype(np.float64)
+        self.ambulance_lon = spawned_ambulances['lon'].astype(np.float64)
+        self.ambulance_time_to_target = np.zeros(len(self.ambulances), dtype=np.int32)
+
+        # Casualty -> hospital travel time of each ambulance's current dispatch,
+        # timed at dispatch together with the trip to the casualty
+        self._delivery_travel_time = np.full(len(self.ambulances), np.nan)
+        self._ambulance_index = {amb.id: i for i, amb in enumerate(self.ambulances)}
 
-    def _initialize_ambulances(self) -> None:
-        """Convert spawned ambulances to runtime state objects."""
-        for amb in self.ambulances:
-            amb['status'] = 'IDLE'
-            amb['patient_onboard'] = None  # None or casualty_id
-            amb['target_lat'] = None
-            amb['target_lon'] = None
-            amb['time_to_target'] = 0.0
-            amb['destination_hospital_id'] = None
-            amb['action_type'] = None  # Current action being executed
+        # State dicts per ambulance, rebuilt only for ambulances that changed
+        # (every change to a dict field goes through _set_ambulance_status or
+        # _move_ambulance)
+        self._ambulance_states = [amb.to_dict() for amb in self.ambulances]
+        self._changed_ambulances = set()
 
     def _initialize_casualties(self) -> None:
-        """Initialize casualties with PatientModel instances."""
+        """Initialize casualties backed by a vectorized PatientBatch."""
         self.casualties = []
 
-        for casualty_data in self.scenario['casualties']:
-            casualty = {
-                'id': casualty_data['id'],
-                'lat': casualty_data['lat'],
-                'lon': casualty_data['lon'],
-                'triage': casualty_data['triage'],
-                'patient': PatientModel(casualty_data['triage']),
-                'status': 'WAITING',  # WAITING, ASSIGNED, ENROUTE, DELIVERED
-                'assigned_ambulance_id': None,
-                'pickup_time': None,
-                'delivery_time': None
-            }
+        casualties = self.scenario['casualties']
+        if isinstance(casualties, CasualtyRecords):
+            # Lazily generated scenario: read the columns instead of building casualty dicts
+            columns = casualties.columns
+            ids = columns['id'].tolist()
+            lats = columns['lat'].tolist()
+            lons = columns['lon'].tolist()
+            triage_levels = TRIAGE_NAMES[columns['triage']].tolist()
+        else:
+            ids = [c['id'] for c in casualties]
+            lats = [c['lat'] for c in casualties]
+            lons = [c['lon'] for c in casualties]
+            triage_levels = [c['triage'] for c in casualties]
+
+        # One batch for all patients so health updates run as a single array op
+        self.patients = PatientBatch(triage_levels)
+        self.casualty_triage = self.patients.triage.copy()  # Initial triage, not updated on deterioration
+        self.casualty_status = np.full(len(self.patients), CasualtyStatus.WAITING, dtype=np.int8)
+
+        # Casualties still alive and neither delivered nor deceased (see is_done),
+        # and those of them still waiting for an ambulance (see _update_metrics)
+        self._active_casualties = int(np.count_nonzero(self.patients.is_alive))
+        self._waiting_casualties = self._active_casualties
+        self._casualty_index = {casualty_id: i for i, casualty_id in enumerate(ids)}
+
+        for index, (casualty_id, lat, lon, triage) in enumerate(zip(ids, lats, lons, triage_levels)):
+            casualty = Casualty(
+                id=casualty_id,
+                lat=lat,
+                lon=lon,
+                triage=triage,
+                patient=self.patients[index]
+            )
             self.casualties.append(casualty)
 
+        # State dicts per casualty, rebuilt only for casualties whose health
+        # changed since the last get_state or that went through
+        # _set_casualty_status (which also covers assigned_ambulance_id)
+        self._state_health = self.patients.health.copy()
+        self._casualty_states = [
+            casualty.to_dict(health, is_alive)
+            for casualty, health, is_alive in zip(
+                self.casualties, self._state_health.tolist(), self.patients.is_alive.tolist()
+            )
+        ]
+        self._changed_casualties = set()
+
     def run(self, max_time_minutes: int = 180) -> None:
         """
         Run simulation until completion or max time.
@@ -137,11 +436,8 @@ class SimulationEngine:
         # 1. Update all patient health
         self._update_patient_health()
 
-        # 2. Update ambulance movements
-        self._update_ambulance_movements()
-
-        # 3. Check for arrivals
-        self._check_arrivals()
+        # 2-3. Update ambulance movements and handle arrivals (pickups/deliveries)
+        self._advance_movement_and_arrivals()
 
         # 4. Get actions from policy for IDLE ambulances
         state = self.get_state()
@@ -156,71 +452,114 @@ class SimulationEngine:
 
     def _update_patient_health(self) -> None:
         """Update health of all casualties."""
-        for casualty in self.casualties:
-            if casualty['patient'].is_alive:
-                casualty['patient'].update(1)  # 1 minute
-
-                # Check for death
-                if not casualty['patient'].is_alive:
-                    casualty['status'] = 'DECEASED'
-                    self.metrics['deaths'] += 1
-                    self._log_event('DEATH', {
-                        'casualty_id': casualty['id'],
-                        'triage': casualty['triage'],
-                        'time': self.current_time
-                    })
-
-    def _update_ambulance_movements(self) -> None:
-        """Update positions of moving ambulances."""
-        for amb in self.ambulances:
-            if amb['status'] in ['MOVING_TO_CASUALTY', 'MOVING_TO_HOSPITAL', 'MOVING_TO_LOCATION', 'RETURNING_TO_BASE']:
-                amb['time_to_target'] -= 1
-
-                # Update position (linear interpolation)
-                if amb['time_to_target'] > 0:
-                    # Still moving
-                    pass  # Position updates handled on arrival
-                elif amb['time_to_target'] <= 0:
-                    # Arrival handled in _check_arrivals
-                    amb['time_to_target'] = 0
-
-    def _check_arrivals(self) -> None:
-        """Check for ambulance arrivals at destinations."""
-        for amb in self.ambulances:
-            if amb['time_to_target'] <= 0 and amb['status'] != 'IDLE':
-
-                if amb['status'] == 'MOVING_TO_CASUALTY':
-                    # Arrived at casualty - pickup
-                    self._execute_pickup(amb)
-
-                elif amb['status'] == 'MOVING_TO_HOSPITAL':
-                    # Arrived at hospital - delivery
-                    self._execute_delivery(amb)
-
-                elif amb['status'] in ['MOVING_TO_LOCATION', 'RETURNING_TO_BASE']:
-                    # Arrived at repositioning target
-                    amb['lat'] = amb['target_lat']
-                    amb['lon'] = amb['target_lon']
-                    amb['status'] = 'IDLE'
-                    amb['target_lat'] = None
-                    amb['target_lon'] = None
-                    amb['action_type'] = None
-
-                    self._log_event('REPOSITIONED', {
-                        'ambulance_id': amb['id'],
-                        'location': (amb['lat'], amb['lon']),
-                        'time': self.current_time
-                    })
-
-    def _execute_pickup(self, ambulance: Dict) -> None:
+        died = self.patients.update(1)  # 1 minute
+        if self.patients.deteriorated:
+            self.dirty = True
+
+        if not len(died):
+            return
+
+        # Status codes and death count updated for all deaths at once; only
+        # the records and event log are touched per casualty
+        self._waiting_casualties -= int(np.count_nonzero(self.casualty_status[died] == CasualtyStatus.WAITING))
+        self.casualty_status[died] = CasualtyStatus.DECEASED
+        self._changed_casualties.update(died.tolist())
+        self.metrics['deaths'] += len(died)
+        self._active_casualties -= len(died)
+        self.dirty = True
+
+        for index in died.tolist():
+            casualty = self.casualties[index]
+            casualty.status = CasualtyStatus.DECEASED.name
+            self._log_event('DEATH', {
+                'casualty_id': casualty.id,
+                'triage': casualty.triage,
+                'time': self.current_time
+            })
+
+    def _advance_movement_and_arrivals(self) -> None:
+        """Count down travel time of moving ambulances and handle their arrivals."""
+        moving = self.ambulance_status != AmbulanceStatus.IDLE
+        if not moving.any():
+            return
+        self.dirty = True
+
+        # Positions are updated on arrival only
+        time_to_target = self.ambulance_time_to_target
+        np.subtract(time_to_target, 1, out=time_to_target, where=moving)
+        np.maximum(time_to_target, 0, out=time_to_target)
+
+        arrived = np.flatnonzero(moving & (time_to_target == 0))
+        for index, status in zip(arrived.tolist(), self.ambulance_status[arrived].tolist()):
+            amb = self.ambulances[index]
+
+            if status == AmbulanceStatus.MOVING_TO_CASUALTY:
+                # Arrived at casualty - pickup
+                self._execute_pickup(amb)
+
+            elif status == AmbulanceStatus.MOVING_TO_HOSPITAL:
+                # Arrived at hospital - delivery
+                self._execute_delivery(amb)
+
+            elif status in (AmbulanceStatus.MOVING_TO_LOCATION, AmbulanceStatus.RETURNING_TO_BASE):
+                # Arrived at repositioning target
+                self._move_ambulance(amb, amb.target_lat, amb.target_lon)
+                self._set_ambulance_status(amb, AmbulanceStatus.IDLE)
+                amb.target_lat = None
+                amb.target_lon = None
+                amb.action_type = None
+
+                self._log_event('REPOSITIONED', {
+                    'ambulance_id': amb.id,
+                    'location': (amb.lat, amb.lon),
+                    'time': self.current_time
+                })
+
+    def _set_casualty_status(self, casualty: Casualty, status: CasualtyStatus) -> None:
+        """Set casualty status on the record and in the status code array."""
+        index = self._casualty_index[casualty.id]
+        if self.casualty_status[index] == CasualtyStatus.WAITING and self.patients.is_alive[index]:
+            self._waiting_casualties -= 1
+        casualty.status = status.name
+        self.casualty_status[index] = status
+        self._changed_casualties.add(index)
+        self.dirty = True
+
+    def _set_ambulance_status(self, ambulance: Ambulance, status: AmbulanceStatus) -> None:
+        """Set ambulance status on the record and in the status code array."""
+        index = self._ambulance_index[ambulance.id]
+        ambulance.status = status.name
+        self.ambulance_status[index] = status
+        self._changed_ambulances.add(index)
+        self.dirty = True
+
+    def _move_ambulance(self, ambulance: Ambulance, lat: float, lon: float) -> None:
+        """Set ambulance position on the record and in the position arrays."""
+        index = self._ambulance_index[ambulance.id]
+        ambulance.lat = lat
+        ambulance.lon = lon
+        self.ambulance_lat[index] = lat
+        self.ambulance_lon[index] = lon
+        self._changed_ambulances.add(index)
+
+    def _set_time_to_target(self, ambulance: Ambulance, minutes: float) -> None:
+        """
+        Set an ambulance's remaining travel time.
+
+        Stored rounded up to whole minutes: a trip of 3.2 minutes arrives on
+        the 4th step either way, since steps are 1 minute.
+        """
+        self.ambulance_time_to_target[self._ambulance_index[ambulance.id]] = math.ceil(minutes)
+
+    def _execute_pickup(self, ambulance: Ambulance) -> None:
         """Execute casualty pickup."""
-        casualty_id = ambulance['patient_onboard']
-        casualty = next(c for c in self.casualties if c['id'] == casualty_id)
+        casualty_id = ambulance.patient_onboard
+        casualty = self.casualties[self._casualty_index[casualty_id]]
 
         # Apply ambulance treatment
-        casualty['patient'].apply_treatment('PICKUP')
-        casualty['status'] = 'ENROUTE'
-        casualty['pickup_time'] = self.current_time
+        casualty.patient.apply_treatment('PICKUP')
+        self._set_casualty_status(casualty, CasualtyStatus.ENROUTE)
+        casualty.pickup_time = self.current_time
 
         # Calculate response time (time from start to pickup)
         response_time = self.current_time
@@ -228,58 +567,58 @@ class SimulationEngine:
         self.metrics['pickups'] += 1
 
         # Update ambulance position
-        ambulance['lat'] = casualty['lat']
-        ambulance['lon'] = casualty['lon']
-
-        # Start moving to hospital
-        hospital = next(h for h in self.hospitals if h['id'] == ambulance['destination_hospital_id'])
-        travel_time = euclidean_travel_time(
-            ambulance['lat'], ambulance['lon'],
-            hospital['lat'], hospital['lon']
-        )
+        self._move_ambulance(ambulance, casualty.lat, casualty.lon)
+
+        # Start moving to hospital (travel time was computed at dispatch)
+        hospital = self._hospital_by_id[ambulance.destination_hospital_id]
+        travel_time = self._delivery_travel_time[self._ambulance_index[ambulance.id]].item()
 
-        ambulance['status'] = 'MOVING_TO_HOSPITAL'
-        ambulance['target_lat'] = hospital['lat']
-        ambulance['target_lon'] = hospital['lon']
-        ambulance['time_to_target'] = travel_time
+        self._set_ambulance_status(ambulance, AmbulanceStatus.MOVING_TO_HOSPITAL)
+        ambulance.target_lat = hospital['lat']
+        ambulance.target_lon = hospital['lon']
+        self._set_time_to_target(ambulance, travel_time)
 
         self._log_event('PICKUP', {
-            'ambulance_id': ambulance['id'],
+            'ambulance_id': ambulance.id,
             'casualty_id': casualty_id,
-            'triage': casualty['triage'],
+            'triage': casualty.triage,
             'response_time': response_time,
             'time': self.current_time
         })
 
-    def _execute_delivery(self, ambulance: Dict) -> None:
+    def _execute_delivery(self, ambulance: Ambulance) -> None:
         """Execute hospital delivery."""
-        casualty_id = ambulance['patient_onboard']
-        casualty = next(c for c in self.casualties if c['id'] == casualty_id)
-        hospital = next(h for h in self.hospitals if h['id'] == ambulance['destination_hospital_id'])
+        casualty_id = ambulance.patient_onboard
+        index = self._casualty_index[casualty_id]
+        casualty = self.casualties[index]
+        hospital = self._hospital_by_id[ambulance.destination_hospital_id]
+
+        # Casualties who died en route were already counted out at death
+        if self.patients.is_alive[index]:
+            self._active_casualties -= 1
 
         # Apply hospital treatment (stops deterioration)
-        casualty['patient'].apply_treatment('HOSPITAL')
-        casualty['status'] = 'DELIVERED'
-        casualty['delivery_time'] = self.current_time
+        casualty.patient.apply_treatment('HOSPITAL')
+        self._set_casualty_status(casualty, CasualtyStatus.DELIVERED)
+        casualty.delivery_time = self.current_time
 
         # Update metrics
         self.metrics['transported'] += 1
 
         # Update ambulance - stays at hospital, becomes IDLE
-        ambulance['lat'] = hospital['lat']
-        ambulance['lon'] = hospital['lon']
-        ambulance['status'] = 'IDLE'
-        ambulance['patient_onboard'] = None
-        ambulance['destination_hospital_id'] = None
-        ambulance['target_lat'] = None
-        ambulance['target_lon'] = None
-        ambulance['action_type'] = None
+        self._move_ambulance(ambulance, hospital['lat'], hospital['lon'])
+        self._set_ambulance_status(ambulance, AmbulanceStatus.IDLE)
+        ambulance.patient_onboard = None
+        ambulance.destination_hospital_id = None
+        ambulance.target_lat = None
+        ambulance.target_lon = None
+        ambulance.action_type = None
 
         self._log_event('DELIVERY', {
-            'ambulance_id': ambulance['id'],
+            'ambulance_id': ambulance.id,
             'casualty_id': casualty_id,
             'hospital_id': hospital['id'],
-            'triage': casualty['triage'],
+            'triage': casualty.triage,
             'time': self.current_time
         })
 
@@ -291,137 +630,176 @@ class SimulationEngine:
             actions: Dict mapping ambulance_id to action dict
                 Action dict format:
                 {
-                    'action_type': 'DISPATCH_TO_CASUALTY' | 'MOVE_TO_LOCATION' | 'RETURN_TO_BASE' | 'WAIT',
+                    'action_type': 'DISPATCH_TO_CASUALTY' | 'MOVE_TO_LOCATION' | 'RETURN_TO_BASE' | 'WAIT'
+                                   (or the matching ActionType code),
                     'casualty_id': int (for DISPATCH_TO_CASUALTY),
                     'hospital_id': str (for DISPATCH_TO_CASUALTY),
                     'target_lat': float (for MOVE_TO_LOCATION),
                     'target_lon': float (for MOVE_TO_LOCATION)
                 }
         """
+        # Validate every action and find its target first, so travel times
+        # for the whole batch come from one vectorized call
+        planned = []
+        claimed_casualties = set()
+
         for ambulance_id, action in actions.items():
-            ambulance = next((a for a in self.ambulances if a['id'] == ambulance_id), None)
+            index = self._ambulance_index.get(ambulance_id)
 
-            if ambulance is None or ambulance['status'] != 'IDLE':
+            if index is None or self.ambulance_status[index] != AmbulanceStatus.IDLE:
                 continue  # Invalid ambulance or not idle
 
-            action_type = action.get('action_type', 'WAIT')
+            # WAIT and unknown action types have no handlers: do nothing
+            action_type = _ACTION_TYPES.get(action.get('action_type', 'WAIT'))
+            if action_type not in self._ACTION_HANDLERS:
+                continue
+
+            ambulance = self.ambulances[index]
+            find_target, _ = self._ACTION_HANDLERS[action_type]
+            target = find_target(self, ambulance, action, claimed_casualties)
+            if target is not None:
+                planned.append((action_type, ambulance, action, target))
 
-            if action_type == 'DISPATCH_TO_CASUALTY':
-                self._action_dispatch(ambulance, action)
+        if not planned:
+            return
 
-            elif action_type == 'MOVE_TO_LOCATION':
-                self._action_move_to_location(ambulance, action)
+        # Legs: ambulance -> target for every action, then casualty -> hospital
+        # for each dispatch, all timed in one call
+        origins = [(ambulance.lat, ambulance.lon) for _, ambulance, _, _ in planned]
+        destinations = [target for _, _, _, target in planned]
+        delivery_legs = []
+
+        for position, (action_type, _, action, target) in enumerate(planned):
+            hospital = self._hospital_by_id.get(action.get('hospital_id')) if action_type == ActionType.DISPATCH_TO_CASUALTY else None
+            if hospital is not None:
+                delivery_legs.append(position)
+                origins.append(target)
+                destinations.append((hospital['lat'], hospital['lon']))
+
+        origins = np.array(origins, dtype=np.float64)
+        destinations = np.array(destinations, dtype=np.float64)
+        leg_times = euclidean_travel_time_array(
+            origins[:, 0], origins[:, 1], destinations[:, 0], destinations[:, 1]
+        ).tolist()
+
+        travel_times = leg_times[:len(planned)]
+        delivery_times = dict(zip(delivery_legs, leg_times[len(planned):]))
+
+        for position, ((action_type, ambulance, action, target), travel_time) in enumerate(zip(planned, travel_times)):
+            if action_type == ActionType.DISPATCH_TO_CASUALTY:
+                # Unknown hospitals keep NaN here and fail at pickup, as before
+                self._delivery_travel_time[self._ambulance_index[ambulance.id]] = delivery_times.get(position, np.nan)
+
+            _, execute = self._ACTION_HANDLERS[action_type]
+            execute(self, ambulance, action, target, travel_time)
+
+    # Action target handlers: validate an action for an idle ambulance and
+    # return its (lat, lon) target, or None if the action is invalid.
+    # claimed_casualties holds casualty indices already dispatched to in this
+    # batch (updated for valid dispatches)
+
+    def _dispatch_target(self, ambulance: Ambulance, action: Dict, claimed_casualties: set) -> Optional[tuple]:
+        """Target of a dispatch: the casualty, if it exists and is still waiting."""
+        index = self._casualty_index.get(action.get('casualty_id'))
+        if index is None or self.casualty_status[index] != CasualtyStatus.WAITING or index in claimed_casualties:
+            return None  # Invalid or already assigned
+
+        claimed_casualties.add(index)
+        casualty = self.casualties[index]
+        return casualty.lat, casualty.lon
+
+    def _move_to_location_target(self, ambulance: Ambulance, action: Dict, claimed_casualties: set) -> Optional[tuple]:
+        """Target of a reposition: the requested location."""
+        target_lat = action.get('target_lat')
+        target_lon = action.get('target_lon')
+
+        if target_lat is None or target_lon is None:
+            return None
+        return target_lat, target_lon
 
-            elif action_type == 'RETURN_TO_BASE':
-                self._action_return_to_base(ambulance)
+    def _return_to_base_target(self, ambulance: Ambulance, action: Dict, claimed_casualties: set) -> Optional[tuple]:
+        """Target of a return to base: the base hospital (none for field units)."""
+        if ambulance.base_hospital_id is None:
+            return None  # Field unit with no base
 
-            elif action_type == 'WAIT':
-                pass  # Do nothing
+        base_hospital = self._hospital_by_id.get(ambulance.base_hospital_id)
+        if base_hospital is None:
+            return None
+        return base_hospital['lat'], base_hospital['lon']
 
-    def _action_dispatch(self, ambulance: Dict, action: Dict) -> None:
+    def _action_dispatch(self, ambulance: Ambulance, action: Dict, target: tuple, travel_time: float) -> None:
         """Dispatch ambulance to pick up casualty and deliver to hospital."""
         casualty_id = action.get('casualty_id')
         hospital_id = action.get('hospital_id')
-
-        # Validate casualty
-        casualty = next((c for c in self.casualties if c['id'] == casualty_id), None)
-        if casualty is None or casualty['status'] != 'WAITING':
-            return  # Invalid or already assigned
+        casualty = self.casualties[self._casualty_index[casualty_id]]
 
         # Mark casualty as assigned
-        casualty['status'] = 'ASSIGNED'
-        casualty['assigned_ambulance_id'] = ambulance['id']
-
-        # Calculate travel time to casualty
-        travel_time = euclidean_travel_time(
-            ambulance['lat'], ambulance['lon'],
-            casualty['lat'], casualty['lon']
-        )
+        self._set_casualty_status(casualty, CasualtyStatus.ASSIGNED)
+        casualty.assigned_ambulance_id = ambulance.id
 
         # Update ambulance state
-        ambulance['status'] = 'MOVING_TO_CASUALTY'
-        ambulance['patient_onboard'] = casualty_id
-        ambulance['destination_hospital_id'] = hospital_id
-        ambulance['target_lat'] = casualty['lat']
-        ambulance['target_lon'] = casualty['lon']
-        ambulance['time_to_target'] = travel_time
-        ambulance['action_type'] = 'DISPATCH_TO_CASUALTY'
+        self._set_ambulance_status(ambulance, AmbulanceStatus.MOVING_TO_CASUALTY)
+        ambulance.patient_onboard = casualty_id
+        ambulance.destination_hospital_id = hospital_id
+        ambulance.target_lat = casualty.lat
+        ambulance.target_lon = casualty.lon
+        self._set_time_to_target(ambulance, travel_time)
+        ambulance.action_type = 'DISPATCH_TO_CASUALTY'
 
         self._log_event('DISPATCH', {
-            'ambulance_id': ambulance['id'],
+            'ambulance_id': ambulance.id,
             'casualty_id': casualty_id,
             'hospital_id': hospital_id,
             'travel_time': travel_time,
             'time': self.current_time
         })
 
-    def _action_move_to_location(self, ambulance: Dict, action: Dict) -> None:
+    def _action_move_to_location(self, ambulance: Ambulance, action: Dict, target: tuple, travel_time: float) -> None:
         """Reposition ambulance to strategic location."""
-        target_lat = action.get('target_lat')
-        target_lon = action.get('target_lon')
-
-        if target_lat is None or target_lon is None:
-            return
-
-        # Calculate travel time
-        travel_time = euclidean_travel_time(
-            ambulance['lat'], ambulance['lon'],
-            target_lat, target_lon
-        )
+        target_lat, target_lon = target
 
         # Update ambulance state
-        ambulance['status'] = 'MOVING_TO_LOCATION'
-        ambulance['target_lat'] = target_lat
-        ambulance['target_lon'] = target_lon
-        ambulance['time_to_target'] = travel_time
-        ambulance['action_type'] = 'MOVE_TO_LOCATION'
+        self._set_ambulance_status(ambulance, AmbulanceStatus.MOVING_TO_LOCATION)
+        ambulance.target_lat = target_lat
+        ambulance.target_lon = target_lon
+        self._set_time_to_target(ambulance, travel_time)
+        ambulance.action_type = 'MOVE_TO_LOCATION'
 
         self._log_event('MOVE_TO_LOCATION', {
-            'ambulance_id': ambulance['id'],
+            'ambulance_id': ambulance.id,
             'target': (target_lat, target_lon),
             'travel_time': travel_time,
             'time': self.current_time
         })
 
-    def _action_return_to_base(self, ambulance: Dict) -> None:
+    def _action_return_to_base(self, ambulance: Ambulance, action: Dict, target: tuple, travel_time: float) -> None:
         """Return ambulance to its base hospital."""
-        base_hospital_id = ambulance.get('base_hospital_id')
-
-        if base_hospital_id is None:
-            # Field unit with no base - do nothing
-            return
-
-        # Find base hospital
-        base_hospital = next((h for h in self.hospitals if h['id'] == base_hospital_id), None)
-        if base_hospital is None:
-            return
-
-        # Calculate travel time
-        travel_time = euclidean_travel_time(
-            ambulance['lat'], ambulance['lon'],
-            base_hospital['lat'], base_hospital['lon']
-        )
+        base_hospital_id = ambulance.base_hospital_id
 
         # Update ambulance state
-        ambulance['status'] = 'RETURNING_TO_BASE'
-        ambulance['target_lat'] = base_hospital['lat']
-        ambulance['target_lon'] = base_hospital['lon']
-        ambulance['time_to_target'] = travel_time
-        ambulance['action_type'] = 'RETURN_TO_BASE'
+        self._set_ambulance_status(ambulance, AmbulanceStatus.RETURNING_TO_BASE)
+        ambulance.target_lat, ambulance.target_lon = target
+        self._set_time_to_target(ambulance, travel_time)
+        ambulance.action_type = 'RETURN_TO_BASE'
 
         self._log_event('RETURN_TO_BASE', {
-            'ambulance_id': ambulance['id'],
+            'ambulance_id': ambulance.id,
             'base_hospital_id': base_hospital_id,
             'travel_time': travel_time,
             'time': self.current_time
         })
 
+    # (target, execute) handlers per action type; WAIT has none
+    _ACTION_HANDLERS = {
+        ActionType.DISPATCH_TO_CASUALTY: (_dispatch_target, _action_dispatch),
+        ActionType.MOVE_TO_LOCATION: (_move_to_location_target, _action_move_to_location),
+        ActionType.RETURN_TO_BASE: (_return_to_base_target, _action_return_to_base),
+    }
+
     def _update_metrics(self) -> None:
         """Update simulation metrics."""
-        self.metrics['casualties_waiting'] = sum(
-            1 for c in self.casualties
-            if c['status'] == 'WAITING' and c['patient'].is_alive
-        )
+        # Kept up to date by the status transitions instead of rescanning casualties
+        self.metrics['casualties_waiting'] = self._waiting_casualties
 
     def _calculate_final_metrics(self) -> None:
         """Calculate final metrics at simulation end."""
@@ -437,64 +815,62 @@ class SimulationEngine:
         Returns:
             True if all casualties are delivered or deceased
         """
-        for casualty in self.casualties:
-            if casualty['patient'].is_alive and casualty['status'] not in ['DELIVERED', 'DECEASED']:
-                return False
-        return True
+        return self._active_casualties == 0
 
     def get_state(self) -> Dict:
         """
         Get current simulation state for policy.
 
+        Casualty and ambulance dicts are reused between calls until that
+        casualty or ambulance changes, so treat state dicts as read-only. 'idle_ambulance_indices' lists the
+        positions of IDLE ambulances in 'ambulances', so policies need not
+        scan every ambulance.
+
         Returns:
-            State dict with casualties, ambulances, hospitals, time
+            State dict with casualties, ambulances, idle_ambulance_indices, hospitals, time
         """
+        # Health is compared as a whole array; only changed casualties are
+        # read back (not through PatientView properties) and rebuilt
+        health = self.patients.health
+        changed = self._changed_casualties
+        changed.update(np.flatnonzero(health != self._state_health).tolist())
+        if changed:
+            indices = list(changed)
+            for index, casualty_health, is_alive in zip(
+                indices, health[indices].tolist(), self.patients.is_alive[indices].tolist()
+            ):
+                self._casualty_states[index] = self.casualties[index].to_dict(casualty_health, is_alive)
+            np.copyto(self._state_health, health)
+            changed.clear()
+
+        for index in self._changed_ambulances:
+            self._ambulance_states[index] = self.ambulances[index].to_dict()
+        self._changed_ambulances.clear()
+
         return {
-            'casualties': [
-                {
-                    'id': c['id'],
-                    'lat': c['lat'],
-                    'lon': c['lon'],
-                    'triage': c['triage'],
-                    'health': c['patient'].health,
-                    'is_alive': c['patient'].is_alive,
-                    'status': c['status'],
-                    'assigned_ambulance_id': c['assigned_ambulance_id']
-                }
-                for c in self.casualties
-            ],
-            'ambulances': [
-                {
-                    'id': a['id'],
-                    'lat': a['lat'],
-                    'lon': a['lon'],
-                    'status': a['status'],
-                    'base_hospital_id': a['base_hospital_id'],
-                    'type': a['type'],
-                    'patient_onboard': a['patient_onboard']
-                }
-                for a in self.ambulances
-            ],
+            'casualties': list(self._casualty_states),
+            'ambulances': list(self._ambulance_states),
+            'idle_ambulance_indices': np.flatnonzero(self.ambulance_status == AmbulanceStatus.IDLE).tolist(),
             'hospitals': self.hospitals,
             'current_time': self.current_time,
             'incident_location': self.scenario['incident_location']
         }
 
     def get_metrics(self) -> Dict:
-        """Get current simulation metrics."""
-        return copy.deepcopy(self.metrics)
+        """Get current simulation metrics (a copy; values are all scalars)."""
+        return dict(self.metrics)
 
     def _log_event(self, event_type: str, data: Dict) -> None:
         """Log simulation event."""
-        event = {
-            'type': event_type,
-            'time': self.current_time,
-            'data': data
-        }
-        self.event_log.append(event)
+        self.event_count += 1
+        self.dirty = True
+
+        if self.log_events:
+            self.event_log.append(EventType[event_type], self.current_time, data)
 
         # Emit to listeners (for WebSocket integration later)
-        self.emit_event(event_type, data)
+        if self.event_listeners:
+            self.emit_event(event_type, data)
 
     def register_listener(self, callback: Callable) -> None:
         """Register event listener for WebSocket integration."""
@@ -506,6 +882,83 @@ class SimulationEngine:
             listener(event_type, data)
 
 
+# Most pooled engines kept per process; the least recently used one is dropped
+# beyond this, so policies built per call (closures, lambdas) do not accumulate
+POOLED_ENGINE_LIMIT = 8
+
+# Per-process engines for pooled_engine(), keyed by policy function (LRU order)
+_pooled_engines: "OrderedDict[Callable, SimulationEngine]" = OrderedDict()
+
+
+def pooled_engine(policy: Callable) -> SimulationEngine:
+    """
+    Engine for running many episodes of one policy in this process.
+
+    Created once per policy (without an event log) and reused: call reset()
+    with each scenario before run(). At most POOLED_ENGINE_LIMIT engines are
+    kept, least recently used first out.
+    """
+    engine = _pooled_engines.get(policy)
+    if engine is None:
+        engine = _pooled_engines[policy] = SimulationEngine(None, policy, log_events=False)
+        if len(_pooled_engines) > POOLED_ENGINE_LIMIT:
+            _pooled_engines.popitem(last=False)
+    else:
+        _pooled_engines.move_to_end(policy)
+    return engine
+
+
+def simulate_episode(policy: Callable, scenario: Dict, max_time_minutes: int = 180) -> Dict:
+    """
+    Run one episode of a scenario under a policy and return its metrics.
+
+    Module-level so worker processes can run it; the stdlib RNG (used by
+    random_policy) is seeded from the scenario's ambulance seed, so results
+    do not depend on which process runs the episode.
+    """
+    random.seed(scenario['ambulance_config']['seed'])
+
+    engine = pooled_engine(policy)
+    engine.reset(scenario)
+    engine.run(max_time_minutes=max_time_minutes)
+
+    return engine.get_metrics()
+
+
+def simulate_batch(
+    scenarios: List[Dict],
+    policy: Callable,
+    max_time_minutes: int = 180,
+    workers: int = 1
+) -> List[Dict]:
+    """
+    Run independent episodes, optionally across worker processes.
+
+    Args:
+        scenarios: Scenario dicts from ScenarioGenerator (with ambulance_config)
+        policy: Policy function; must be picklable when workers > 1
+                (module-level functions such as the baselines are)
+        max_time_minutes: Maximum simulation time per episode
+        workers: Worker processes (1 = run in this process, 0 = all CPUs)
+
+    Returns:
+        Metrics dict per scenario, in scenario order
+    """
+    workers = min(workers or os.cpu_count(), len(scenarios))
+    if workers <= 1:
+        return [simulate_episode(policy, scenario, max_time_minutes) for scenario in scenarios]
+
+    from concurrent.futures import ProcessPoolExecutor
+    from itertools import repeat
+
+    # Several episodes per task so scenario pickling is amortized
+    chunksize = max(1, len(scenarios) // (4 * workers))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(
+            simulate_episode, repeat(policy), scenarios, repeat(max_time_minutes), chunksize=chunksize
+        ))
+
+
 if __name__ == '__main__':
     # Test simulation engine
     print("Testing Simulation Engine...")
@@ -539,32 +992,29 @@ if __name__ == '__main__':
 
         idle_ambulances = [a for a in state['ambulances'] if a['status'] == 'IDLE']
         waiting_casualties = [c for c in state['casualties'] if c['status'] == 'WAITING' and c['is_alive']]
-
-        for amb in idle_ambulances[:min(len(idle_ambulances), len(waiting_casualties))]:
-            if not waiting_casualties:
-                break
-
-            # Find nearest waiting casualty
-            nearest_casualty = min(
-                waiting_casualties,
-                key=lambda c: euclidean_distance(amb['lat'], amb['lon'], c['lat'], c['lon'])
-            )
-
-            # Find nearest hospital
-            nearest_hospital = min(
-                state['hospitals'],
-                key=lambda h: euclidean_distance(nearest_casualty['lat'], nearest_casualty['lon'], h['lat'], h['lon'])
-            )
+        if not idle_ambulances or not waiting_casualties:
+            return actions
+
+        # Stack coordinates once per step; nearest hospital for every casualty in one pass
+        cas_ll = np.array([(c['lat'], c['lon']) for c in waiting_casualties])
+        hos_ll = np.array([(h['lat'], h['lon']) for h in state['hospitals']])
+        nearest_hospitals = haversine_array(
+            cas_ll[:, None, 0], cas_ll[:, None, 1], hos_ll[None, :, 0], hos_ll[None, :, 1]
+        ).argmin(axis=1)
+        available = np.ones(len(waiting_casualties), dtype=bool)
+
+        for amb in idle_ambulances[:len(waiting_casualties)]:
+            # Find nearest waiting casualty (taken ones masked out)
+            distances = haversine_array(amb['lat'], amb['lon'], cas_ll[:, 0], cas_ll[:, 1])
+            i = int(np.where(available, distances, np.inf).argmin())
+            available[i] = False
 
             actions[amb['id']] = {
                 'action_type': 'DISPATCH_TO_CASUALTY',
-                'casualty_id': nearest_casualty['id'],
-                'hospital_id': nearest_hospital['id']
+                'casualty_id': waiting_casualties[i]['id'],
+                'hospital_id': state['hospitals'][nearest_hospitals[i]]['id']
             }
 
-            # Remove from waiting list
-            waiting_casualties.remove(nearest_casualty)
-
         return actions
 
     # Run simulation
@@ -573,8 +1023,8 @@ if __name__ == '__main__':
 
     initial_ambulances = len(engine.ambulances)
     print(f"   Spawned {initial_ambulances} ambulances")
-    print(f"   Hospital-based: {sum(1 for a in engine.ambulances if a['type'] == 'HOSPITAL_BASED')}")
-    print(f"   Field units: {sum(1 for a in engine.ambulances if a['type'] == 'FIELD_UNIT')}")
+    print(f"   Hospital-based: {sum(1 for a in engine.ambulances if a.type == 'HOSPITAL_BASED')}")
+    print(f"   Field units: {sum(1 for a in engine.ambulances if a.type == 'FIELD_UNIT')}")
 
     engine.run(max_time_minutes=120)
 
@@ -596,6 +1046,13 @@ if __name__ == '__main__':
     for event_type, count in sorted(event_types.items()):
         print(f"   {event_type}: {count}")
 
+    # Columnar view agrees with the event dicts
+    type_counts = np.bincount(engine.event_log.types, minlength=len(EventType))
+    if {EventType(code).name: int(n) for code, n in enumerate(type_counts) if n} == event_types:
+        print("   ✓ Columnar event types match event dicts")
+    else:
+        print("   ✗ Columnar event types differ from event dicts")
+
     # Test strategic repositioning
     print("\n5. Testing strategic repositioning...")
 
@@ -636,5 +1093,28 @@ if __name__ == '__main__':
     else:
         print("   ⚠ WARNING: Repositioning may not have completed fully")
 
+    # Test parallel rollouts
+    print("\n6. Testing simulate_batch...")
+    from simulator.agents.baselines import nearest_hospital_policy as baseline_policy
+
+    batch_scenarios = [generator.generate_scenario(num_casualties=20, seed=seed) for seed in range(4)]
+    sequential = simulate_batch(batch_scenarios, baseline_policy, max_time_minutes=120)
+    parallel = simulate_batch(batch_scenarios, baseline_policy, max_time_minutes=120, workers=2)
+    print(f"   Deaths per episode: {[m['deaths'] for m in parallel]}")
+
+    if parallel == sequential:
+        print("   ✓ PASS: Parallel rollouts match sequential rollouts")
+    else:
+        print("   ✗ FAIL: Parallel rollouts differ from sequential rollouts")
+
+    # Policies built per call (e.g. closures) must not pile up pooled engines
+    for _ in range(2 * POOLED_ENGINE_LIMIT):
+        simulate_episode(lambda state: baseline_policy(state), batch_scenarios[0], max_time_minutes=10)
+
+    if len(_pooled_engines) <= POOLED_ENGINE_LIMIT:
+        print(f"   ✓ PASS: Engine pool bounded ({len(_pooled_engines)} engines)")
+    else:
+        print(f"   ✗ FAIL: Engine pool grew to {len(_pooled_engines)} engines")
+
     print("\n" + "=" * 60)
     print("✓ Simulation engine tests completed!")
@@ -6,22 +6,41 @@ Train a PPO agent to optimize ambulance dispatch during mass casualty incidents.
 """
 
 import argparse
+import copy
+import functools
+import multiprocessing as mp
 import os
+import pickle
+import queue
+import shutil
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+import numpy as np
+import torch
+from gymnasium import spaces
 from stable_baselines3 import PPO
-from stable_baselines3.common.env_util import make_vec_env
-from stable_baselines3.common.callbacks import CheckpointCallback, EvalCallback
-from stable_baselines3.common.monitor import Monitor
+from stable_baselines3.common.buffers import DictRolloutBuffer
+from stable_baselines3.common.vec_env import DummyVecEnv, SubprocVecEnv, VecMonitor, VecNormalize
+from stable_baselines3.common.callbacks import BaseCallback, CheckpointCallback, EvalCallback
+from stable_baselines3.common.evaluation import evaluate_policy
+from stable_baselines3.common.save_util import save_to_zip_file
+from stable_baselines3.common.logger import KVWriter, TensorBoardOutputFormat
+from stable_baselines3.common.utils import configure_logger, explained_variance
+from simulator.environment.hospital_loader import load_hospitals
 from simulator.environment.mci_env import MCIResponseEnv
+from simulator.environment.shmem_vec_env import ShmemVecEnv
+from simulator.environment.vec_env import BatchVecEnv
 
 
 def create_env(region='CA', max_hospitals=50, max_ambulances=100, max_casualties=80, **kwargs):
-    """Create and wrap environment"""
+    """Create environment (episode statistics are recorded by VecMonitor, see make_envs)"""
     env = MCIResponseEnv(
         region=region,
         max_hospitals=max_hospitals,
@@ -29,7 +48,665 @@ def create_env(region='CA', max_hospitals=50, max_ambulances=100, max_casualties
         max_casualties=max_casualties,
         **kwargs
     )
-    return Monitor(env)
+    return env
+
+
+def vecnormalize_path(model_path):
+    """Path of the VecNormalize statistics saved alongside a model (.zip optional)"""
+    return str(model_path).removesuffix('.zip') + '_vecnormalize.pkl'
+
+
+def _pinned_like(array):
+    """Zeroed array shaped like `array`, backed by pinned host memory"""
+    tensor = torch.zeros(array.shape, dtype=torch.from_numpy(array[:0]).dtype, pin_memory=True)
+    return tensor.numpy()
+
+
+class GAERolloutBuffer(DictRolloutBuffer):
+    """
+    DictRolloutBuffer with a leaner GAE pass.
+
+    TD errors and per-step decay factors are computed for the whole rollout
+    in a few array operations; the backward loop over n_steps then only
+    carries the running advantage (one multiply-add per step). Results are
+    identical to DictRolloutBuffer's.
+
+    When the device is CUDA, the arrays BatchedPPO uploads live in pinned
+    (page-locked) host memory, allocated once and reused across rollouts,
+    so the uploads can be issued with non_blocking=True.
+    """
+
+    _PINNED_ARRAYS = ('actions', 'values', 'log_probs', 'advantages', 'returns')
+
+    def __init__(self, *args, **kwargs):
+        self._pinned = None
+        super().__init__(*args, **kwargs)
+
+    def reset(self):
+        super().reset()
+        if self.device.type != 'cuda':
+            return
+        if self._pinned is None:
+            self._pinned = {
+                'observations': {key: _pinned_like(obs) for key, obs in self.observations.items()},
+                **{name: _pinned_like(getattr(self, name)) for name in self._PINNED_ARRAYS}
+            }
+        else:
+            for obs in self._pinned['observations'].values():
+                obs.fill(0)
+            for name in self._PINNED_ARRAYS:
+                self._pinned[name].fill(0)
+        self.observations = dict(self._pinned['observations'])
+        for name in self._PINNED_ARRAYS:
+            setattr(self, name, self._pinned[name])
+
+    def compute_returns_and_advantage(self, last_values, dones):
+        last_values = last_values.clone().cpu().numpy().flatten()
+
+        # Value and non-terminal flag of each step's successor
+        next_values = np.empty_like(self.values)
+        next_values[:-1] = self.values[1:]
+        next_values[-1] = last_values
+        next_non_terminal = np.empty_like(self.values)
+        next_non_terminal[:-1] = 1.0 - self.episode_starts[1:]
+        next_non_terminal[-1] = 1.0 - dones.astype(np.float32)
+
+        deltas = self.rewards + self.gamma * next_values * next_non_terminal - self.values
+        decay = self.gamma * self.gae_lambda * next_non_terminal
+
+        last_gae_lam = np.zeros(self.n_envs, dtype=np.float32)
+        for step in reversed(range(self.buffer_size)):
+            last_gae_lam *= decay[step]
+            last_gae_lam += deltas[step]
+            self.advantages[step] = last_gae_lam
+        np.add(self.advantages, self.values, out=self.returns)
+
+
+class BatchedPPO(PPO):
+    """
+    PPO whose update phase avoids per-minibatch overhead.
+
+    The rollout is moved to the device once per update, and each minibatch
+    is gathered there by index instead of being re-indexed in NumPy and
+    copied over. One minibatch's loss is a single function
+    (_minibatch_loss), which compile_policy() compiles as one graph with
+    the policy passes. Loss statistics stay on the device until the end of
+    the update rather than being synchronized with .item() per minibatch
+    (except for the KL early-stopping check when target_kl is set).
+
+    Minibatch order, updates and logged values are the same as PPO's.
+    """
+
+    def _excluded_save_params(self):
+        # compile_policy() may replace the bound loss method on the instance
+        return super()._excluded_save_params() + ["_minibatch_loss"]
+
+    def _minibatch_loss(self, observations, actions, old_values, old_log_prob, advantages, returns,
+                        clip_range, clip_range_vf):
+        """Total PPO loss of one minibatch and its statistics
+        (policy, clip fraction, value, entropy, approx. KL, total)"""
+        values, log_prob, entropy = self.policy.evaluate_actions(observations, actions)
+        values = values.flatten()
+        # Normalization does not make sense if mini batchsize == 1, see SB3 issue #325
+        if self.normalize_advantage and len(advantages) > 1:
+            advantages = (advantages - advantages.mean()) / (advantages.std() + 1e-8)
+
+        ratio = torch.exp(log_prob - old_log_prob)
+        policy_loss_1 = advantages * ratio
+        policy_loss_2 = advantages * torch.clamp(ratio, 1 - clip_range, 1 + clip_range)
+        policy_loss = -torch.min(policy_loss_1, policy_loss_2).mean()
+        clip_fraction = torch.mean((torch.abs(ratio - 1) > clip_range).float())
+
+        if clip_range_vf is None:
+            values_pred = values
+        else:
+            values_pred = old_values + torch.clamp(values - old_values, -clip_range_vf, clip_range_vf)
+        value_loss = torch.nn.functional.mse_loss(returns, values_pred)
+
+        if entropy is None:
+            entropy_loss = -torch.mean(-log_prob)
+        else:
+            entropy_loss = -torch.mean(entropy)
+
+        loss = policy_loss + self.ent_coef * entropy_loss + self.vf_coef * value_loss
+
+        with torch.no_grad():
+            log_ratio = log_prob - old_log_prob
+            approx_kl_div = torch.mean((torch.exp(log_ratio) - 1) - log_ratio)
+            stats = torch.stack([policy_loss, clip_fraction, value_loss, entropy_loss, approx_kl_div, loss])
+        return loss, stats
+
+    def _flattened_rollout(self):
+        """
+        Rollout buffer contents as flat device tensors, in the buffer's
+        step-major order (row step * n_envs + env; no transposed copy).
+
+        From pinned host memory (GAERolloutBuffer on CUDA) the uploads are
+        asynchronous; they are ordered before the update's kernels on the
+        same stream, and train() synchronizes on its statistics before the
+        next rollout writes to the buffer again.
+        """
+        buffer = self.rollout_buffer
+        non_blocking = self.device.type == 'cuda'
+
+        def flat(array):
+            array = array.reshape(buffer.buffer_size * buffer.n_envs, *array.shape[2:])
+            return torch.as_tensor(array).to(self.device, non_blocking=non_blocking, copy=True)
+
+        if isinstance(buffer.observations, dict):
+            observations = {key: flat(obs) for key, obs in buffer.observations.items()}
+        else:
+            observations = flat(buffer.observations)
+        actions = flat(buffer.actions)
+        if isinstance(self.action_space, spaces.Discrete):
+            # Convert discrete action from float to long
+            actions = actions.long().flatten()
+        return (
+            observations,
+            actions,
+            flat(buffer.values).flatten(),
+            flat(buffer.log_probs).flatten(),
+            flat(buffer.advantages).flatten(),
+            flat(buffer.returns).flatten(),
+        )
+
+    def train(self) -> None:
+        self.policy.set_training_mode(True)
+        self._update_learning_rate(self.policy.optimizer)
+        clip_range = self.clip_range(self._current_progress_remaining)
+        clip_range_vf = None
+        if self.clip_range_vf is not None:
+            clip_range_vf = self.clip_range_vf(self._current_progress_remaining)
+
+        observations, *fields = self._flattened_rollout()
+        n_steps, n_envs = self.rollout_buffer.buffer_size, self.rollout_buffer.n_envs
+        n_samples = n_steps * n_envs
+
+        stats = []
+        continue_training = True
+        for epoch in range(self.n_epochs):
+            # Same permutation (and NumPy RNG draws) as RolloutBuffer.get(), which
+            # indexes env-major rows (env * n_steps + step); mapped to step-major rows
+            indices = np.random.permutation(n_samples)
+            indices = torch.as_tensor((indices % n_steps) * n_envs + indices // n_steps, device=self.device)
+            epoch_start = len(stats)
+            for start in range(0, n_samples, self.batch_size):
+                batch = indices[start:start + self.batch_size]
+                loss, minibatch_stats = self._minibatch_loss(
+                    {key: obs[batch] for key, obs in observations.items()}
+                    if isinstance(observations, dict) else observations[batch],
+                    *(field[batch] for field in fields),
+                    clip_range,
+                    clip_range_vf
+                )
+                stats.append(minibatch_stats)
+
+                if self.target_kl is not None and minibatch_stats[4].item() > 1.5 * self.target_kl:
+                    continue_training = False
+                    if self.verbose >= 1:
+                        print(f"Early stopping at step {epoch} due to reaching max kl: "
+                              f"{minibatch_stats[4].item():.2f}")
+                    break
+
+                self.policy.optimizer.zero_grad()
+                loss.backward()
+                torch.nn.utils.clip_grad_norm_(self.policy.parameters(), self.max_grad_norm)
+                self.policy.optimizer.step()
+
+            self._n_updates += 1
+            if not continue_training:
+                break
+
+        # One device-to-host transfer for the whole update
+        stats = torch.stack(stats).cpu().numpy()
+        pg_losses, clip_fractions, value_losses, entropy_losses = (stats[:, column].tolist() for column in range(4))
+        approx_kl_divs = list(stats[epoch_start:, 4])  # Last epoch only, as in PPO
+        explained_var = explained_variance(self.rollout_buffer.values.flatten(), self.rollout_buffer.returns.flatten())
+
+        self.logger.record("train/entropy_loss", np.mean(entropy_losses))
+        self.logger.record("train/policy_gradient_loss", np.mean(pg_losses))
+        self.logger.record("train/value_loss", np.mean(value_losses))
+        self.logger.record("train/approx_kl", np.mean(approx_kl_divs))
+        self.logger.record("train/clip_fraction", np.mean(clip_fractions))
+        self.logger.record("train/loss", stats[-1, 5].item())
+        self.logger.record("train/explained_variance", explained_var)
+        if hasattr(self.policy, "log_std"):
+            self.logger.record("train/std", torch.exp(self.policy.log_std).mean().item())
+
+        self.logger.record("train/n_updates", self._n_updates, exclude="tensorboard")
+        self.logger.record("train/clip_range", clip_range)
+        if clip_range_vf is not None:
+            self.logger.record("train/clip_range_vf", clip_range_vf)
+
+
+def configure_cuda():
+    """Let float32 matmuls use TF32 tensor cores and cuDNN pick the fastest kernels."""
+    torch.set_float32_matmul_precision("high")
+    torch.backends.cuda.matmul.allow_tf32 = True
+    torch.backends.cudnn.allow_tf32 = True
+    torch.backends.cudnn.benchmark = True
+
+
+def enable_amp(model):
+    """
+    Run the policy passes of PPO updates under bfloat16 autocast (CUDA).
+
+    Only evaluate_actions is wrapped, and its outputs are cast back to
+    float32: losses (and the PPO ratio) are formed in float32, and
+    parameters, gradients and the optimizer step stay float32. bfloat16 has
+    float32's range, so no gradient scaling is needed.
+    """
+    evaluate_actions = model.policy.evaluate_actions
+
+    def evaluate_actions_amp(obs, actions):
+        with torch.autocast(device_type="cuda", dtype=torch.bfloat16):
+            values, log_prob, entropy = evaluate_actions(obs, actions)
+        return values.float(), log_prob.float(), entropy.float() if entropy is not None else None
+
+    model.policy.evaluate_actions = evaluate_actions_amp
+
+
+def enable_bf16_rollout(model):
+    """
+    Run the policy forward pass of rollout collection under bfloat16 autocast (CUDA).
+
+    Weights stay float32 and updates are unaffected; the values and log
+    probabilities stored in the rollout buffer are cast back to float32.
+    """
+    forward = model.policy.forward
+
+    def forward_bf16(obs, deterministic=False):
+        with torch.autocast(device_type="cuda", dtype=torch.bfloat16):
+            actions, values, log_prob = forward(obs, deterministic)
+        return actions, values.float(), log_prob.float()
+
+    model.policy.forward = forward_bf16
+
+
+def compile_policy(model):
+    """
+    torch.compile the policy passes PPO runs during training.
+
+    Rollouts call the policy module (forward) and updates call
+    evaluate_actions, so both bound methods are compiled rather than the
+    module, whose wrapper would also rename the saved parameters. For
+    BatchedPPO the minibatch loss around evaluate_actions is compiled. On CUDA,
+    "reduce-overhead" mode replays the MLP as a CUDA graph.
+    """
+    mode = "reduce-overhead" if model.device.type == "cuda" else "default"
+    policy = model.policy
+    policy.forward = torch.compile(policy.forward, mode=mode, fullgraph=False)
+    if isinstance(model, BatchedPPO):
+        # The whole minibatch loss (evaluate_actions included) as one graph
+        model._minibatch_loss = torch.compile(model._minibatch_loss, mode=mode, fullgraph=False)
+    else:
+        policy.evaluate_actions = torch.compile(policy.evaluate_actions, mode=mode, fullgraph=False)
+
+
+def warmup(model):
+    """
+    Run the rollout and update passes of a BatchedPPO model once before training.
+
+    Compilation (torch.compile, CUDA graph capture, cuDNN autotuning) then
+    happens here instead of inside the first rollout and update. The
+    environments are reset and stepped once (VecNormalize statistics are
+    not updated); the update pass computes gradients on mock minibatches
+    built from the reset observations and discards them without an
+    optimizer step, so the weights are unchanged. The mock minibatches have
+    the shapes and dtypes of real ones (including a smaller last minibatch
+    when batch_size does not divide the rollout), so the first update does
+    not recompile. Returns the seconds taken.
+    """
+    start = time.perf_counter()
+    env = model.env
+    vec_normalize = model.get_vec_normalize_env()
+    if vec_normalize is not None:
+        training, vec_normalize.training = vec_normalize.training, False
+
+    obs = env.reset()
+    model.policy.set_training_mode(False)
+    with torch.no_grad():
+        obs_tensor, _ = model.policy.obs_to_tensor(obs)
+        actions, _, _ = model.policy(obs_tensor)
+    env.step(actions.cpu().numpy())
+
+    # Actions in the rollout buffer's dtype, as _flattened_rollout() passes them
+    actions = actions.to(torch.as_tensor(model.rollout_buffer.actions[:0]).dtype)
+    if isinstance(model.action_space, spaces.Discrete):
+        actions = actions.long().flatten()
+
+    # Mock minibatches drawn from the reset observations: a full one and, when
+    # the rollout does not split evenly, one of the last minibatch's size
+    n_samples = model.n_steps * env.num_envs
+    batch_sizes = {model.batch_size, n_samples % model.batch_size} - {0}
+    model.policy.set_training_mode(True)
+    clip_range_vf = model.clip_range_vf(1.0) if model.clip_range_vf is not None else None
+    for batch_size in sorted(batch_sizes, reverse=True):
+        rows = torch.arange(batch_size, device=model.device) % env.num_envs
+        zeros = torch.zeros(batch_size, device=model.device)
+        loss, _ = model._minibatch_loss(
+            {key: obs[rows] for key, obs in obs_tensor.items()} if isinstance(obs_tensor, dict) else obs_tensor[rows],
+            actions[rows], zeros, zeros, zeros, zeros,
+            model.clip_range(1.0),
+            clip_range_vf
+        )
+        loss.backward()
+        model.policy.optimizer.zero_grad()
+
+    if vec_normalize is not None:
+        vec_normalize.training = training
+    if model.device.type == 'cuda':
+        torch.cuda.synchronize()
+    return time.perf_counter() - start
+
+
+def _detached_copy(value):
+    """Copy of a (nested) state dict with every tensor copied to the CPU."""
+    if isinstance(value, torch.Tensor):
+        return value.detach().to('cpu', copy=True)
+    if isinstance(value, dict):
+        return {key: _detached_copy(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return type(value)(_detached_copy(item) for item in value)
+    return copy.deepcopy(value)
+
+
+class AsyncCheckpointCallback(CheckpointCallback):
+    """
+    CheckpointCallback that writes model checkpoints on a background thread.
+
+    At each checkpoint the model's attributes and parameters are copied
+    (tensors to the CPU) on the training thread, which is quick; serializing
+    and writing the zip file then overlaps with training. One checkpoint is
+    in flight at a time, and the last one is finished when training ends.
+    VecNormalize statistics are small and saved synchronously as before.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._pending = None
+
+    def _snapshot(self):
+        """(data, params, pytorch_variables) as BaseAlgorithm.save() would write them, copied"""
+        model = self.model
+        exclude = set(model._excluded_save_params())
+        state_dicts_names, torch_variable_names = model._get_torch_save_params()
+        exclude.update(name.split('.')[0] for name in state_dicts_names + torch_variable_names)
+
+        data = {key: copy.deepcopy(value) for key, value in model.__dict__.items() if key not in exclude}
+        params = _detached_copy(model.get_parameters())
+        pytorch_variables = {
+            name: _detached_copy(functools.reduce(getattr, name.split('.'), model))
+            for name in torch_variable_names
+        }
+        return data, params, pytorch_variables
+
+    def _wait(self):
+        if self._pending is not None:
+            self._pending.result()  # Re-raises a failed write
+            self._pending = None
+
+    def _on_step(self) -> bool:
+        if self.n_calls % self.save_freq == 0:
+            model_path = self._checkpoint_path(extension="zip")
+            data, params, pytorch_variables = self._snapshot()
+            self._wait()
+            self._pending = self._executor.submit(
+                save_to_zip_file, model_path, data=data, params=params, pytorch_variables=pytorch_variables
+            )
+            if self.verbose >= 2:
+                print(f"Saving model checkpoint to {model_path}")
+
+            if self.save_vecnormalize and self.model.get_vec_normalize_env() is not None:
+                vec_normalize_path = self._checkpoint_path("vecnormalize_", extension="pkl")
+                self.model.get_vec_normalize_env().save(vec_normalize_path)
+                if self.verbose >= 2:
+                    print(f"Saving model VecNormalize to {vec_normalize_path}")
+
+        return True
+
+    def _on_training_end(self) -> None:
+        self._wait()
+        self._executor.shutdown()
+
+
+def _evaluate_snapshot(model_path, env_fn, normalizer, n_eval_episodes, deterministic, results):
+    """Worker process of AsyncEvalCallback: evaluate a saved model and put
+    its (episode rewards, episode lengths) on the results queue"""
+    torch.set_num_threads(1)
+    eval_env = VecMonitor(BatchVecEnv([env_fn] * n_eval_episodes))
+    if normalizer is not None:
+        # Training statistics, frozen, applied to observations only
+        vec_normalize = pickle.loads(normalizer)
+        vec_normalize.set_venv(eval_env)
+        vec_normalize.training = False
+        vec_normalize.norm_reward = False
+        eval_env = vec_normalize
+
+    model = BatchedPPO.load(model_path, device='cpu')
+    episode_rewards, episode_lengths = evaluate_policy(
+        model,
+        eval_env,
+        n_eval_episodes=n_eval_episodes,
+        deterministic=deterministic,
+        return_episode_rewards=True,
+        warn=False
+    )
+    eval_env.close()
+    results.put((episode_rewards, episode_lengths))
+
+
+class AsyncEvalCallback(BaseCallback):
+    """
+    EvalCallback counterpart that evaluates in a separate process.
+
+    Every eval_freq calls the model is saved (with the current VecNormalize
+    statistics) and a worker process evaluates that snapshot on a fresh
+    environment while training continues. Results are logged on the first
+    step after they arrive, against the timesteps of the snapshot, and
+    written to evaluations.npz / best_model.zip as EvalCallback does. One
+    evaluation runs at a time; a due evaluation is skipped while the
+    previous one is still running, and the last one is waited for when
+    training ends.
+    """
+
+    def __init__(
+        self,
+        env_fn,
+        eval_freq=10000,
+        n_eval_episodes=5,
+        best_model_save_path=None,
+        log_path=None,
+        deterministic=True,
+        start_method=None,
+        verbose=1
+    ):
+        super().__init__(verbose=verbose)
+        self.env_fn = env_fn
+        self.eval_freq = eval_freq
+        self.n_eval_episodes = n_eval_episodes
+        self.best_model_save_path = best_model_save_path
+        self.log_path = os.path.join(log_path, "evaluations") if log_path is not None else None
+        self.deterministic = deterministic
+        if start_method is None:
+            start_method = "forkserver" if "forkserver" in mp.get_all_start_methods() else "spawn"
+        self._ctx = mp.get_context(start_method)
+
+        self.best_mean_reward = -np.inf
+        self.evaluations_timesteps = []
+        self.evaluations_results = []
+        self.evaluations_length = []
+        self._process = None
+        self._results = None
+        self._snapshot_timesteps = 0
+
+    def _init_callback(self) -> None:
+        for path in (self.best_model_save_path, self.log_path and os.path.dirname(self.log_path)):
+            if path:
+                os.makedirs(path, exist_ok=True)
+        snapshot_dir = self.best_model_save_path or (self.log_path and os.path.dirname(self.log_path)) or '.'
+        self._snapshot_path = os.path.join(snapshot_dir, 'eval_snapshot.zip')
+
+    def _on_step(self) -> bool:
+        self._collect()
+        if self.eval_freq > 0 and self.n_calls % self.eval_freq == 0:
+            if self._process is None:
+                self._launch()
+            elif self.verbose >= 1:
+                print(f"Eval at num_timesteps={self.num_timesteps} skipped: previous evaluation still running")
+        return True
+
+    def _launch(self):
+        self.model.save(self._snapshot_path)
+        vec_normalize = self.model.get_vec_normalize_env()
+        normalizer = pickle.dumps(vec_normalize) if vec_normalize is not None else None
+
+        self._snapshot_timesteps = self.num_timesteps
+        self._results = self._ctx.Queue()
+        self._process = self._ctx.Process(
+            target=_evaluate_snapshot,
+            args=(self._snapshot_path, self.env_fn, normalizer, self.n_eval_episodes,
+                  self.deterministic, self._results),
+            daemon=True
+        )
+        self._process.start()
+
+    def _collect(self, wait=False):
+        """Log the running evaluation's results if available (or, with wait, once they are)"""
+        if self._process is None:
+            return
+        while True:
+            try:
+                episode_rewards, episode_lengths = self._results.get(timeout=1.0) if wait else self._results.get_nowait()
+                break
+            except queue.Empty:
+                if self._process.is_alive():
+                    if wait:
+                        continue
+                    return
+                print(f"Warning: evaluation at num_timesteps={self._snapshot_timesteps} failed "
+                      f"(exit code {self._process.exitcode})")
+                self._process = None
+                return
+        self._process.join()
+        self._process = None
+
+        mean_reward, std_reward = np.mean(episode_rewards), np.std(episode_rewards)
+        mean_ep_length, std_ep_length = np.mean(episode_lengths), np.std(episode_lengths)
+        if self.log_path is not None:
+            self.evaluations_timesteps.append(self._snapshot_timesteps)
+            self.evaluations_results.append(episode_rewards)
+            self.evaluations_length.append(episode_lengths)
+            np.savez(
+                self.log_path,
+                timesteps=self.evaluations_timesteps,
+                results=self.evaluations_results,
+                ep_lengths=self.evaluations_length,
+            )
+
+        if self.verbose >= 1:
+            print(f"Eval num_timesteps={self._snapshot_timesteps}, "
+                  f"episode_reward={mean_reward:.2f} +/- {std_reward:.2f}")
+            print(f"Episode length: {mean_ep_length:.2f} +/- {std_ep_length:.2f}")
+        self.logger.record("eval/mean_reward", float(mean_reward))
+        self.logger.record("eval/mean_ep_length", mean_ep_length)
+        self.logger.record("eval/timesteps", self._snapshot_timesteps, exclude="tensorboard")
+
+        if mean_reward > self.best_mean_reward:
+            if self.verbose >= 1:
+                print("New best mean reward!")
+            if self.best_model_save_path is not None:
+                shutil.copyfile(self._snapshot_path, os.path.join(self.best_model_save_path, "best_model.zip"))
+            self.best_mean_reward = float(mean_reward)
+
+    def _on_training_end(self) -> None:
+        if self._process is not None:
+            self._collect(wait=True)
+            self.logger.dump(self.num_timesteps)
+        if os.path.exists(self._snapshot_path):
+            os.remove(self._snapshot_path)
+
+
+class AsyncKVWriter(KVWriter):
+    """
+    KVWriter that hands records to another writer on a background thread.
+
+    write() only queues a copy of the record; the wrapped writer (TensorBoard
+    here, which serializes events and flushes the file on every write) runs
+    on the thread. close() writes what is still queued, then closes it.
+    """
+
+    def __init__(self, writer: KVWriter):
+        self.writer = writer
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._drain, daemon=True)
+        self._thread.start()
+
+    def _drain(self):
+        while True:
+            record = self._queue.get()
+            if record is None:
+                return
+            self.writer.write(*record)
+
+    def write(self, key_values, key_excluded, step=0):
+        self._queue.put((dict(key_values), dict(key_excluded), step))
+
+    def close(self):
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+            self.writer.close()
+
+
+def async_tensorboard_logger(verbose, tensorboard_log, tb_log_name="PPO"):
+    """Logger as PPO.learn() would configure it, with TensorBoard written by an AsyncKVWriter"""
+    logger = configure_logger(verbose, tensorboard_log, tb_log_name)
+    logger.output_formats = [
+        AsyncKVWriter(output) if isinstance(output, TensorBoardOutputFormat) else output
+        for output in logger.output_formats
+    ]
+    return logger
+
+
+VEC_ENV_CLASSES = {'dummy': DummyVecEnv, 'batch': BatchVecEnv, 'subproc': SubprocVecEnv, 'shmem': ShmemVecEnv}
+
+
+def make_env_fn(args):
+    """
+    Environment constructor for the command-line environment options.
+
+    create_env is passed by reference with keyword arguments (no closure over
+    args), so subprocess workers can rebuild it. The region's hospitals are
+    loaded here once and passed along, so environments share one list (and
+    workers receive it pickled) instead of each parsing the dataset.
+    """
+    return functools.partial(
+        create_env,
+        region=args.region,
+        max_hospitals=args.max_hospitals,
+        max_ambulances=args.max_ambulances,
+        max_casualties=args.max_casualties,
+        hospitals=load_hospitals(region=args.region)[:args.max_hospitals]
+    )
+
+
+def make_envs(args, n_envs, vec_env='dummy', monitor_file=None):
+    """
+    Create a monitored vectorized environment from the command-line environment options.
+
+    Episode statistics are tracked once for all environments by VecMonitor
+    (optionally written to <monitor_file>.monitor.csv) rather than by a
+    Monitor inside each one.
+    """
+    env_fn = make_env_fn(args)
+    vec_env_kwargs = {}
+    if vec_env in ('subproc', 'shmem'):
+        # The env function pickles small, so workers can be started fresh
+        # (forkserver/spawn) rather than forked from the training process
+        vec_env_kwargs['start_method'] = args.start_method
+    return VecMonitor(VEC_ENV_CLASSES[vec_env]([env_fn] * n_envs, **vec_env_kwargs), filename=monitor_file)
 
 
 def main():
@@ -58,6 +735,9 @@ Examples:
                         help='Output path for saved model (default: models/ppo_mci)')
     parser.add_argument('--load', type=str, default=None,
                         help='Load existing model to continue training (default: None)')
+    parser.add_argument('--normalize', action='store_true',
+                        help='Normalize observations and rewards with running statistics '
+                             '(VecNormalize); saved next to the model as <output>_vecnormalize.pkl')
 
     # Environment parameters
     parser.add_argument('--region', type=str, default='CA',
@@ -70,6 +750,14 @@ Examples:
                         help='Max casualties in environment (default: 80)')
     parser.add_argument('--n-envs', type=int, default=4,
                         help='Number of parallel environments (default: 4)')
+    parser.add_argument('--vec-env', choices=sorted(VEC_ENV_CLASSES), default=None,
+                        help='Run environments in one process (dummy; batch writes observations '
+                             'in place) or one process each, '
+                             'observations sent through pipes (subproc) or shared memory (shmem) '
+                             '(default: shmem when --n-envs > 1)')
+    parser.add_argument('--start-method', choices=mp.get_all_start_methods(), default=None,
+                        help='multiprocessing start method of subproc/shmem workers '
+                             '(default: forkserver where available, else spawn)')
 
     # PPO hyperparameters
     parser.add_argument('--learning-rate', type=float, default=3e-4,
@@ -88,12 +776,23 @@ Examples:
     # Training options
     parser.add_argument('--device', type=str, default='auto',
                         help='Device to use: cpu, cuda, auto (default: auto)')
+    parser.add_argument('--compile', action='store_true',
+                        help='Compile the policy with torch.compile (first updates are slower)')
+    parser.add_argument('--amp', action='store_true',
+                        help='Mixed precision (bfloat16) policy updates on CUDA')
+    parser.add_argument('--bf16-rollout', action='store_true',
+                        help='bfloat16 policy forward passes during rollout collection on CUDA')
+    parser.add_argument('--warmup', action='store_true',
+                        help='Run one rollout step and one update pass before training, so '
+                             'compilation is not counted in training time')
     parser.add_argument('--checkpoint-freq', type=int, default=50000,
                         help='Save checkpoint every N steps (default: 50000)')
     parser.add_argument('--eval-freq', type=int, default=10000,
                         help='Evaluate every N steps (default: 10000)')
     parser.add_argument('--n-eval-episodes', type=int, default=5,
                         help='Number of episodes for evaluation (default: 5)')
+    parser.add_argument('--async-eval', action='store_true',
+                        help='Evaluate in a background process while training continues')
     parser.add_argument('--tensorboard-log', type=str, default='./logs/tensorboard',
                         help='TensorBoard log directory (default: ./logs/tensorboard)')
     parser.add_argument('--verbose', type=int, default=1,
@@ -101,6 +800,12 @@ Examples:
 
     args = parser.parse_args()
 
+    if args.vec_env is None:
+        args.vec_env = 'shmem' if args.n_envs > 1 else 'dummy'
+    if args.vec_env in ('subproc', 'shmem') and args.n_envs > (os.cpu_count() or 1):
+        print(f"Warning: {args.n_envs} environment processes on {os.cpu_count()} CPUs; "
+              f"each step waits for the slowest one, so fewer --n-envs may train faster")
+
     # Create output directories
     output_dir = Path(args.output).parent
     output_dir.mkdir(parents=True, exist_ok=True)
@@ -117,11 +822,12 @@ Examples:
     print(f"\nTimestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print(f"\nConfiguration:")
     print(f"  Total timesteps: {args.timesteps:,}")
-    print(f"  Parallel environments: {args.n_envs}")
+    print(f"  Parallel environments: {args.n_envs} ({args.vec_env})")
     print(f"  Region: {args.region}")
     print(f"  Max hospitals: {args.max_hospitals}")
     print(f"  Max ambulances: {args.max_ambulances}")
     print(f"  Max casualties: {args.max_casualties}")
+    print(f"  Normalize obs/rewards: {args.normalize}")
     print(f"\nHyperparameters:")
     print(f"  Learning rate: {args.learning_rate}")
     print(f"  Batch size: {args.batch_size}")
@@ -135,41 +841,41 @@ Examples:
 
     # Create vectorized training environment
     print("\nCreating training environments...")
-    env = make_vec_env(
-        lambda: create_env(
-            region=args.region,
-            max_hospitals=args.max_hospitals,
-            max_ambulances=args.max_ambulances,
-            max_casualties=args.max_casualties
-        ),
-        n_envs=args.n_envs
-    )
-
-    # Create evaluation environment
-    print("Creating evaluation environment...")
-    eval_env = make_vec_env(
-        lambda: create_env(
-            region=args.region,
-            max_hospitals=args.max_hospitals,
-            max_ambulances=args.max_ambulances,
-            max_casualties=args.max_casualties
-        ),
-        n_envs=1
-    )
+    env = make_envs(args, args.n_envs, args.vec_env, monitor_file=str(output_dir / 'train'))
+
+    # Create evaluation environments, one per evaluation episode so they run
+    # in lockstep (built by the evaluation worker with --async-eval)
+    eval_env = None
+    if not args.async_eval:
+        print("Creating evaluation environments...")
+        eval_env = make_envs(args, args.n_eval_episodes, args.vec_env)
+
+    if args.normalize:
+        # Running mean/std of observations (and of returns, for reward scaling).
+        # EvalCallback copies the training statistics into the evaluation env
+        # before each evaluation, which itself never updates them
+        if args.load and os.path.exists(vecnormalize_path(args.load)):
+            print(f"Loading normalization statistics from {vecnormalize_path(args.load)}...")
+            env = VecNormalize.load(vecnormalize_path(args.load), env)
+        else:
+            env = VecNormalize(env, norm_obs=True, norm_reward=True, clip_obs=10.0)
+        if eval_env is not None:
+            eval_env = VecNormalize(eval_env, norm_obs=True, norm_reward=False, clip_obs=10.0, training=False)
 
     # Create or load model
     if args.load:
         print(f"\nLoading model from {args.load}...")
-        model = PPO.load(
+        model = BatchedPPO.load(
             args.load,
             env=env,
             device=args.device,
-            tensorboard_log=args.tensorboard_log
+            tensorboard_log=args.tensorboard_log,
+            rollout_buffer_class=GAERolloutBuffer
         )
         print("Model loaded successfully")
     else:
         print("\nCreating new PPO model...")
-        model = PPO(
+        model = BatchedPPO(
             "MultiInputPolicy",
             env,
             learning_rate=args.learning_rate,
@@ -180,11 +886,33 @@ Examples:
             ent_coef=args.ent_coef,
             verbose=args.verbose,
             device=args.device,
-            tensorboard_log=args.tensorboard_log
+            tensorboard_log=args.tensorboard_log,
+            rollout_buffer_class=GAERolloutBuffer
         )
 
+    if model.device.type == 'cuda':
+        configure_cuda()
+        if args.amp:
+            enable_amp(model)
+            print("Policy updates use bfloat16 autocast")
+        if args.bf16_rollout:
+            enable_bf16_rollout(model)
+            print("Rollout collection uses bfloat16 autocast")
+    elif args.amp or args.bf16_rollout:
+        print("Warning: --amp and --bf16-rollout only apply on CUDA; training in float32")
+
+    if args.compile:
+        compile_policy(model)
+        print("Policy compiled with torch.compile")
+
+    if args.warmup:
+        print(f"Warm-up pass done in {warmup(model):.1f}s")
+
+    if args.tensorboard_log:
+        model.set_logger(async_tensorboard_logger(model.verbose, args.tensorboard_log))
+
     # Setup callbacks
-    checkpoint_callback = CheckpointCallback(
+    checkpoint_callback = AsyncCheckpointCallback(
         save_freq=args.checkpoint_freq // args.n_envs,
         save_path=str(checkpoint_dir),
         name_prefix='ppo_mci_checkpoint',
@@ -192,15 +920,27 @@ Examples:
         save_vecnormalize=True
     )
 
-    eval_callback = EvalCallback(
-        eval_env,
-        best_model_save_path=str(eval_dir),
-        log_path=str(eval_dir),
-        eval_freq=args.eval_freq // args.n_envs,
-        n_eval_episodes=args.n_eval_episodes,
-        deterministic=True,
-        render=False
-    )
+    if args.async_eval:
+        eval_callback = AsyncEvalCallback(
+            make_env_fn(args),
+            best_model_save_path=str(eval_dir),
+            log_path=str(eval_dir),
+            eval_freq=args.eval_freq // args.n_envs,
+            n_eval_episodes=args.n_eval_episodes,
+            deterministic=True,
+            start_method=args.start_method
+        )
+    else:
+        eval_callback = EvalCallback(
+            eval_env,
+            best_model_save_path=str(eval_dir),
+            log_path=str(eval_dir),
+            eval_freq=args.eval_freq // args.n_envs,
+            n_eval_episodes=args.n_eval_episodes,
+            deterministic=True,
+            render=False,
+            warn=False
+        )
 
     # Train
     print("\n" + "=" * 70)
@@ -222,6 +962,8 @@ Examples:
         # Save final model
         print(f"\nSaving final model to {args.output}.zip...")
         model.save(args.output)
+        if args.normalize:
+            env.save(vecnormalize_path(args.output))
 
         print("\n" + "=" * 70)
         print("Training completed successfully!")
@@ -236,6 +978,8 @@ Examples:
         print("\n\nTraining interrupted by user")
         print(f"Saving current model to {args.output}_interrupted.zip...")
         model.save(f"{args.output}_interrupted")
+        if args.normalize:
+            env.save(vecnormalize_path(f"{args.output}_interrupted"))
         sys.exit(1)
 
     except Exception as e:
@@ -244,6 +988,11 @@ Examples:
         traceback.print_exc()
         sys.exit(1)
 
+    finally:
+        if args.tensorboard_log:
+            # Flush log records still queued for the TensorBoard writer thread
+            model.logger.close()
+
 
 if __name__ == '__main__':
     main()
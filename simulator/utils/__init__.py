@@ -0,0 +1,14 @@
+"""
+Utilities package for RLRapidResponse simulator.
+
+Contains shared helpers for file I/O.
+"""
+
+from simulator.utils.json_utils import dumps, loads, dump_json, load_json
+
+__all__ = [
+    'dumps',
+    'loads',
+    'dump_json',
+    'load_json'
+]
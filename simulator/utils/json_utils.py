@@ -0,0 +1,129 @@
+"""
+JSON helpers for simulator file I/O.
+
+Uses orjson when it is installed (serializes in C and handles NumPy arrays
+and scalars natively) and falls back to the standard library json module
+otherwise. Both paths produce equivalent JSON.
+
+Files ending in .zst (Zstandard, needs the zstandard package) or .gz (gzip)
+are compressed transparently by dump_json() and load_json().
+"""
+
+import gzip
+import json
+import numpy as np
+from typing import Any, BinaryIO
+
+try:
+    import orjson
+except ImportError:  # Optional dependency
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:  # Optional dependency (only needed for .zst files)
+    zstandard = None
+
+# Fast compression levels: files are written often and mostly read locally
+ZSTD_LEVEL = 3
+GZIP_LEVEL = 6
+
+
+def _default(obj: Any) -> Any:
+    """Convert NumPy types for the stdlib encoder."""
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj: Any, indent: bool = False) -> bytes:
+    """
+    Serialize an object to JSON bytes.
+
+    Args:
+        obj: Object to serialize (may contain NumPy arrays and scalars)
+        indent: Pretty-print with 2-space indentation
+
+    Returns:
+        UTF-8 encoded JSON
+    """
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=_default, option=option)
+
+    return json.dumps(obj, indent=2 if indent else None, default=_default).encode('utf-8')
+
+
+def loads(data: bytes) -> Any:
+    """
+    Deserialize JSON bytes or str.
+
+    Args:
+        data: JSON document
+
+    Returns:
+        Deserialized object
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def check_compression(filename: str) -> None:
+    """
+    Check that the compression a filename's extension implies is available.
+
+    Lets callers reject an unusable output path up front instead of after
+    the work whose result it would hold.
+
+    Args:
+        filename: Path passed to dump_json() / load_json()
+
+    Raises:
+        ImportError: A .zst file without the zstandard package installed
+    """
+    if str(filename).endswith('.zst') and zstandard is None:
+        raise ImportError("Reading or writing .zst files requires zstandard "
+                          "(pip install zstandard, or the fast-io extra)")
+
+
+def _open_binary(filename: str, mode: str) -> BinaryIO:
+    """Open a file for binary reading/writing, (de)compressing by extension."""
+    filename = str(filename)
+    check_compression(filename)
+    if filename.endswith('.zst'):
+        return zstandard.open(filename, mode, cctx=zstandard.ZstdCompressor(level=ZSTD_LEVEL))
+    if filename.endswith('.gz'):
+        return gzip.open(filename, mode, compresslevel=GZIP_LEVEL)
+    return open(filename, mode)
+
+
+def dump_json(obj: Any, filename: str, indent: bool = True) -> None:
+    """
+    Write an object to a JSON file.
+
+    Args:
+        obj: Object to serialize
+        filename: Output path (.zst/.gz suffix writes a compressed file)
+        indent: Pretty-print with 2-space indentation (default True)
+    """
+    with _open_binary(filename, 'wb') as f:
+        f.write(dumps(obj, indent=indent))
+
+
+def load_json(filename: str) -> Any:
+    """
+    Read a JSON file.
+
+    Args:
+        filename: Input path (.zst/.gz suffix reads a compressed file)
+
+    Returns:
+        Deserialized object
+    """
+    with _open_binary(filename, 'rb') as f:
+        return loads(f.read())